@@ -0,0 +1,41 @@
+import threading
+
+from .models import Department
+
+# Departments are a handful of fixed rows, so they are loaded once per process
+# and kept in memory until a Department save/delete signal clears the cache.
+_lock = threading.Lock()
+_departments = None
+
+
+def _load():
+    global _departments
+    with _lock:
+        if _departments is None:
+            _departments = {department.pk: department for department in Department.objects.order_by('id')}
+        return _departments
+
+
+def get_departments():
+    """Return all departments ordered by id."""
+    return list(_load().values())
+
+
+def get_department(pk):
+    """Return the cached department for ``pk`` or ``None`` if it does not exist."""
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    return _load().get(pk)
+
+
+def get_display_name(pk):
+    department = get_department(pk)
+    return department.get_name_display() if department else None
+
+
+def invalidate(**kwargs):
+    global _departments
+    with _lock:
+        _departments = None
@@ -1,5 +1,7 @@
 from django.db import models
 
+from settings.versioning import ChangeTrackingMixin
+
 class Department(models.Model):
     DEPARTMENT_CHOICES = [
         ("academic", "Academic Department"),
@@ -14,7 +16,9 @@ class Department(models.Model):
         return self.get_name_display()
 
 
-class Employee(models.Model):
+class Employee(ChangeTrackingMixin, models.Model):
+    version_name = 'employees'
+
     STATUS_CHOICES = [
         ("active", "Active"),
         ("on_leave", "On Leave"),
@@ -34,6 +38,9 @@ class Employee(models.Model):
     address = models.CharField(max_length=255, blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="active")
     date_joined = models.DateField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Position in the collection's change feed, stamped on save and by settings.versioning.record_change
+    change_seq = models.BigIntegerField(default=0, editable=False, db_index=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
     is_deleted = models.BooleanField(default=False)
     def save(self, *args, **kwargs):
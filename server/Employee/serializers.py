@@ -1,5 +1,23 @@
 from rest_framework import serializers
 from .models import Employee, Department
+from . import cache
+
+
+class CachedDepartmentField(serializers.PrimaryKeyRelatedField):
+    """Resolves ``department_id`` from the in-process department cache instead of the database."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        department = cache.get_department(data)
+        if department is None:
+            try:
+                int(data)
+            except (TypeError, ValueError):
+                self.fail('incorrect_type', data_type=type(data).__name__)
+            self.fail('does_not_exist', pk_value=data)
+        return department
+
 
 class DepartmentSerializer(serializers.ModelSerializer):
     display_name = serializers.CharField(source='get_name_display', read_only=True)
@@ -10,14 +28,18 @@ class DepartmentSerializer(serializers.ModelSerializer):
 
 
 class EmployeeSerializer(serializers.ModelSerializer):
-    department = DepartmentSerializer(read_only=True)
-    department_id = serializers.PrimaryKeyRelatedField(
+    department = serializers.SerializerMethodField()
+    department_id = CachedDepartmentField(
         queryset=Department.objects.all(),
         source="department",
         write_only=True
     )
     avatar_url = serializers.SerializerMethodField()
 
+    def get_department(self, obj):
+        department = cache.get_department(obj.department_id)
+        return DepartmentSerializer(department).data if department else None
+
     def get_avatar_url(self, obj):
         if obj.avatar:
             return obj.avatar.url
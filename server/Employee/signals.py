@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from settings.versioning import record_change, track_changes
+
+from . import cache
+from .models import Department, Employee
+
+# Data version and change feed of the employee collection
+EMPLOYEES_VERSION = Employee.version_name
+
+track_changes(Employee, EMPLOYEES_VERSION)
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_department_cache(sender, **kwargs):
+    cache.invalidate()
+
+
+@receiver(post_save, sender=Department)
+def touch_department_employees(sender, instance, created, **kwargs):
+    # Employees are serialized with their department's name
+    if not created:
+        record_change(EMPLOYEES_VERSION, Employee.objects.filter(department=instance), updated_at=timezone.now())
@@ -1,3 +1,69 @@
 from django.test import TestCase
 
-# Create your tests here.
+from ims_backend.testing import QueryBudgetTestCase
+from . import cache
+from .models import Department, Employee
+
+
+class DepartmentCacheTests(TestCase):
+    def setUp(self):
+        cache.invalidate()
+        self.addCleanup(cache.invalidate)
+        self.academic = Department.objects.create(name='academic')
+
+    def test_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get_departments(), [self.academic])
+            self.assertEqual(cache.get_department(str(self.academic.pk)), self.academic)
+            self.assertEqual(cache.get_display_name(self.academic.pk), 'Academic Department')
+            self.assertIsNone(cache.get_department('abc'))
+
+    def test_invalidated_on_save_and_delete(self):
+        cache.get_departments()
+        finance = Department.objects.create(name='finance')
+        self.assertEqual(cache.get_departments(), [self.academic, finance])
+        finance.delete()
+        self.assertEqual(cache.get_departments(), [self.academic])
+
+
+class EmployeeQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        response = self.assertBudget('get', '/api/employees/', 4)
+        self.assertEqual(len(response.json()), self.employees)
+
+    def test_list_filtered(self):
+        self.assertBudget('get', '/api/employees/?department=academic&status=active', 4)
+
+    def test_list_not_modified(self):
+        etag = self.request('get', '/api/employees/')['ETag']
+        self.assertBudget('get', '/api/employees/', 1, status=304, HTTP_IF_NONE_MATCH=etag)
+
+    def test_create(self):
+        data = {
+            'name': 'Budget Employee', 'email': 'budget.employee@example.com', 'position': 'Instructor',
+            'department_id': Department.objects.get(name='academic').pk, 'salary': '450000.00',
+        }
+        self.assertBudget('post', '/api/employees/', 7, status=201, data=data)
+
+    def test_detail(self):
+        employee = Employee.objects.first()
+        path = f'/api/employees/{employee.pk}/'
+        self.assertBudget('get', path, 4)
+        data = {
+            'name': employee.name, 'email': employee.email, 'position': 'Senior Instructor',
+            'department_id': employee.department_id, 'salary': '500000.00',
+        }
+        self.assertBudget('put', path, 5, data=data)
+        self.assertBudget('delete', path, 5, status=204)
+        self.assertBudget('patch', f'/api/employees/{employee.pk}/restore/', 5)
+
+    def test_changes(self):
+        self.assertBudget('get', '/api/employees/changes/', 3)
+        self.assertBudget('get', '/api/employees/changes/?since=0', 2)
+
+    def test_export(self):
+        self.assertBudget('get', '/api/employees/export/', 2)
+        self.assertBudget('get', '/api/employees/export/?file_format=xlsx', 1, ms=1500)
+
+    def test_departments(self):
+        self.assertBudget('get', '/api/departments/', 2)
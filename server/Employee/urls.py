@@ -5,6 +5,8 @@ app_name = "employees"
 
 urlpatterns = [
     path('employees/', views.employee_list, name="employee_list"),
+    path('employees/changes/', views.employee_changes, name="employee_changes"),
+    path('employees/export/', views.employee_export, name="employee_export"),
     path('employees/<int:pk>/', views.employee_detail, name="employee_detail"),
     path('employees/<int:pk>/restore/', views.restore_employee, name="restore_employee"),
     path('departments/', views.department_list, name="department_list"),
@@ -2,17 +2,55 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Employee, Department
+from .models import Employee
 from .serializers import EmployeeSerializer, DepartmentSerializer
-from settings.models import ActivityLog, TrashBin
+from . import cache
+from settings.models import TrashBin
+from settings.activity import log_activity
+from settings.changes import ChangeFeedView
+from settings.conditional import versioned_response
+from .signals import EMPLOYEES_VERSION
+from ims_backend.db_router import replica_reads
+from ims_backend.exports import export_response
+
+EMPLOYEE_EXPORT_COLUMNS = {
+    'id': 'id',
+    'employeeId': 'employeeId',
+    'idNumber': 'idNumber',
+    'name': 'name',
+    'email': 'email',
+    'phone': 'phone',
+    'position': 'position',
+    'department': 'department__name',
+    'salary': 'salary',
+    'address': 'address',
+    'status': 'status',
+    'date_joined': 'date_joined',
+}
+
+
+def filter_employees(queryset, params):
+    """Filters shared by the employee list and export: ``?department=<id or name>&status=``."""
+    department = params.get('department')
+    if department:
+        if department.isdigit():
+            queryset = queryset.filter(department_id=int(department))
+        else:
+            queryset = queryset.filter(department__name=department)
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    return queryset
+
 
 # GET all employees / POST new employee
 @api_view(['GET', 'POST'])
 def employee_list(request):
     if request.method == 'GET':
-        employees = Employee.objects.filter(is_deleted=False).order_by("id")
-        serializer = EmployeeSerializer(employees, many=True)
-        return Response(serializer.data)
+        def render():
+            employees = filter_employees(Employee.objects.filter(is_deleted=False), request.query_params).order_by("id")
+            serializer = EmployeeSerializer(employees, many=True)
+            return Response(serializer.data)
+        return versioned_response(request, EMPLOYEES_VERSION, render)
 
     elif request.method == 'POST':
         serializer = EmployeeSerializer(data=request.data)
@@ -20,7 +58,7 @@ def employee_list(request):
             employee = serializer.save()
 
             # Log activity
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user if request.user.is_authenticated else None,
                 activity_type='create',
                 description=f"Created new employee: {employee.name}",
@@ -29,7 +67,7 @@ def employee_list(request):
                 metadata={
                     'name': employee.name,
                     'position': employee.position,
-                    'department': employee.department.get_name_display(),
+                    'department': cache.get_display_name(employee.department_id),
                     'email': employee.email
                 }
             )
@@ -41,22 +79,27 @@ def employee_list(request):
 # GET single / PUT / DELETE
 @api_view(['GET', 'PUT', 'DELETE'])
 def employee_detail(request, pk):
+    if request.method == 'GET':
+        def render():
+            try:
+                employee = Employee.objects.get(pk=pk)
+            except Employee.DoesNotExist:
+                return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response(EmployeeSerializer(employee).data)
+        return versioned_response(request, EMPLOYEES_VERSION, render)
+
     try:
         employee = Employee.objects.get(pk=pk)
     except Employee.DoesNotExist:
         return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.method == 'GET':
-        serializer = EmployeeSerializer(employee)
-        return Response(serializer.data)
-
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         serializer = EmployeeSerializer(employee, data=request.data)
         if serializer.is_valid():
             updated_employee = serializer.save()
 
             # Log activity
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user if request.user.is_authenticated else None,
                 activity_type='update',
                 description=f"Updated employee: {updated_employee.name}",
@@ -65,7 +108,7 @@ def employee_detail(request, pk):
                 metadata={
                     'name': updated_employee.name,
                     'position': updated_employee.position,
-                    'department': updated_employee.department.get_name_display(),
+                    'department': cache.get_display_name(updated_employee.department_id),
                     'email': updated_employee.email
                 }
             )
@@ -79,7 +122,7 @@ def employee_detail(request, pk):
             'id': employee.id,
             'name': employee.name,
             'position': employee.position,
-            'department': employee.department.get_name_display(),
+            'department': cache.get_display_name(employee.department_id),
             'email': employee.email,
             'salary': str(employee.salary) if employee.salary else None,
             'date_joined': employee.date_joined.strftime('%Y-%m-%d') if employee.date_joined else None,
@@ -94,7 +137,7 @@ def employee_detail(request, pk):
         )
 
         # Log activity
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user if request.user.is_authenticated else None,
             activity_type='delete',
             description=f"Deleted employee: {employee.name}",
@@ -108,10 +151,22 @@ def employee_detail(request, pk):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+# GET employees changed since a cursor
+employee_changes = ChangeFeedView.as_view(model=Employee, serializer_class=EmployeeSerializer, version_name=EMPLOYEES_VERSION)
+
+
+# Export employees as CSV/XLSX
+@api_view(['GET'])
+@replica_reads()
+def employee_export(request):
+    employees = filter_employees(Employee.objects.filter(is_deleted=False), request.query_params).order_by("id")
+    return export_response(request, employees, EMPLOYEE_EXPORT_COLUMNS, EMPLOYEE_EXPORT_COLUMNS, 'employees')
+
+
 # GET all departments
 @api_view(['GET'])
 def department_list(request):
-    departments = Department.objects.all()
+    departments = cache.get_departments()
     serializer = DepartmentSerializer(departments, many=True)
     return Response(serializer.data)
 
@@ -128,7 +183,7 @@ def restore_employee(request, pk):
         TrashBin.objects.filter(item_type='employee', item_id=str(pk)).delete()
 
         # Log activity
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user if request.user.is_authenticated else None,
             activity_type='restore',
             description=f"Restored employee: {employee.name}",
@@ -137,7 +192,7 @@ def restore_employee(request, pk):
             metadata={
                 'name': employee.name,
                 'position': employee.position,
-                'department': employee.department.get_name_display(),
+                'department': cache.get_display_name(employee.department_id),
                 'email': employee.email
             }
         )
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Requests/second with and without persistent or pooled database connections.
+
+Each configuration runs in its own process (DATABASES is read once at
+startup) and serves requests through Django's WSGI handler from a pool of
+threads, so connections are opened and closed exactly as under a threaded
+WSGI server. Point it at a migrated local PostgreSQL database:
+
+    DB_ENGINE=postgresql DB_NAME=ims DB_USER=postgres DB_PASSWORD=... \\
+        python benchmarks/db_pool.py --requests 2000 --concurrency 8
+
+Modes: "none" opens a connection per request (CONN_MAX_AGE=0), "persistent"
+keeps one per thread (CONN_MAX_AGE=60) and "pool" uses psycopg's pool
+(DB_POOL=true, PostgreSQL only).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    'none': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'false'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'false'},
+    'pool': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'true'},
+}
+
+
+def serve(args):
+    """Child process: replay ``args.requests`` GETs against the WSGI handler and print the result as JSON."""
+    sys.path.append(SERVER_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ims_backend.settings')
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    statuses = {}
+
+    def request(index):
+        environ = {'PATH_INFO': args.path[index % len(args.path)], 'REQUEST_METHOD': 'GET'}
+        setup_testing_defaults(environ)
+        started = []
+        response = application(environ, lambda status, headers: started.append(status))
+        try:
+            for _ in response:
+                pass
+        finally:
+            # Fires request_finished, which closes or returns the connection
+            response.close()
+        return started[0].split()[0]
+
+    # Warm up imports, URL resolution and the pool
+    for index in range(args.concurrency):
+        request(index)
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for status in executor.map(request, range(args.requests)):
+            statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - begin
+
+    print(json.dumps({
+        'requests': args.requests,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(args.requests / elapsed, 1),
+        'statuses': statuses,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--path', action='append', help='Endpoint to request (repeatable, default /finance/api/summary/)')
+    parser.add_argument('--mode', action='append', choices=sorted(MODES), help='Modes to compare (default: all that apply)')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.path = args.path or ['/finance/api/summary/']
+
+    if args.child:
+        serve(args)
+        return
+
+    engine = os.environ.get('DB_ENGINE', 'sqlite')
+    modes = args.mode or [mode for mode in MODES if mode != 'pool' or engine != 'sqlite']
+    results = []
+    for mode in modes:
+        command = [sys.executable, os.path.abspath(__file__), '--child',
+                   '--requests', str(args.requests), '--concurrency', str(args.concurrency)]
+        for path in args.path:
+            command += ['--path', path]
+        output = subprocess.run(
+            command, env={**os.environ, **MODES[mode]}, cwd=SERVER_DIR,
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append({'engine': engine, 'mode': mode, **json.loads(output.strip().splitlines()[-1])})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+HTTP load benchmark for the main API endpoints.
+
+Drives each endpoint in turn with --concurrency keep-alive clients for
+--requests requests (after a short warm-up) and prints throughput and latency
+percentiles per endpoint as JSON. Run it against a server started the way it
+runs in production, with data from `manage.py seed_benchmark_data`:
+
+    DB_NAME=/tmp/bench.sqlite3 python manage.py seed_benchmark_data
+    DB_NAME=/tmp/bench.sqlite3 gunicorn ims_backend.wsgi -w 4 --threads 4
+    python benchmarks/load.py --url http://127.0.0.1:8000 --token <token> \\
+        --concurrency 16 --requests 1000 --output baseline.json
+
+Compare runs by keeping the JSON of each. Only the standard library is used,
+so the client can run on a machine without the project installed.
+"""
+import argparse
+import http.client
+import json
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ENDPOINTS = {
+    'students': '/student/api/students/',
+    'student-summary': '/student/api/students/summary/',
+    'student-changes': '/student/api/students/changes/?limit=500',
+    'employees': '/api/employees/',
+    'departments': '/api/departments/',
+    'transactions': '/finance/api/transactions/?type=Expense',
+    'finance-summary': '/finance/api/summary/',
+    'reports': '/finance/api/reports/?start_date=2024-01-01&end_date=2024-03-31',
+    'dashboard': '/dashboard/api/summary/',
+    'notifications': '/api/settings/notifications/',
+    'activities': '/api/settings/activities/?user=all',
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0
+    index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Client:
+    """One keep-alive HTTP connection per worker thread."""
+
+    def __init__(self, url, headers, timeout):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.headers = headers
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(self.netloc, timeout=self.timeout)
+        return connection
+
+    def get(self, path):
+        """Return ``(status, body bytes, seconds)``; status is 0 when the request failed."""
+        started = time.perf_counter()
+        try:
+            connection = self._connection()
+            connection.request('GET', self.prefix + path, headers=self.headers)
+            response = connection.getresponse()
+            body = response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+            return response.status, len(body), time.perf_counter() - started
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return 0, 0, time.perf_counter() - started
+
+    def close(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+
+def run_endpoint(executor, client, name, path, requests, concurrency, warmup):
+    list(executor.map(lambda _: client.get(path), range(warmup)))
+    begin = time.perf_counter()
+    results = list(executor.map(lambda _: client.get(path), range(requests)))
+    elapsed = time.perf_counter() - begin
+
+    statuses = {}
+    for status, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    latencies = sorted(seconds * 1000 for _, _, seconds in results)
+    ok = [size for status, size, _ in results if 200 <= status < 400]
+    return {
+        'endpoint': name,
+        'path': path,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': requests - len(ok),
+        'statuses': statuses,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(requests / elapsed, 1),
+        'latency_ms': {
+            **{f'p{percent}': round(percentile(latencies, percent), 2) for percent in PERCENTILES},
+            'mean': round(statistics.fmean(latencies), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'bytes_per_response': round(statistics.fmean(ok)) if ok else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test')
+    parser.add_argument('--token', help='API token (printed by seed_benchmark_data)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help='Measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per endpoint')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS), help='Endpoints to run (repeatable, default: all)')
+    parser.add_argument('--path', action='append', default=[], help='Extra path to run, as NAME=/path/ (repeatable)')
+    parser.add_argument('--compressed', action='store_true', help='Send Accept-Encoding: br, gzip')
+    parser.add_argument('--output', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    endpoints = {name: ENDPOINTS[name] for name in args.endpoint or ENDPOINTS}
+    for extra in args.path:
+        name, separator, path = extra.partition('=')
+        if not separator or not path.startswith('/'):
+            parser.error(f'--path must look like NAME=/path/, got {extra!r}')
+        endpoints[name] = path
+
+    headers = {'Accept': 'application/json'}
+    if args.token:
+        headers['Authorization'] = f'Token {args.token}'
+    if args.compressed:
+        headers['Accept-Encoding'] = 'br, gzip'
+    client = Client(args.url, headers, args.timeout)
+
+    started_at = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    # Worker threads, and so their connections, are shared by all endpoints
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = [
+            run_endpoint(executor, client, name, path, args.requests, args.concurrency, args.warmup)
+            for name, path in endpoints.items()
+        ]
+    output = json.dumps({'url': args.url, 'started_at': started_at, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
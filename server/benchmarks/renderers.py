@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Render/parse timings for DRF's JSONRenderer against the orjson and MessagePack
+renderers in ims_backend.renderers.
+
+Payloads mirror the largest endpoints: the student list (StudentSerializer
+output with its JSON columns and monthlyData), the report transaction list
+(TransactionSerializer output) and the report totals. Objects are built in
+memory, so no database is needed.
+
+    python benchmarks/renderers.py --students 2000 --transactions 20000 --repeat 5
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ims_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from finance.models import Transaction  # noqa: E402
+from finance.serializers import TransactionSerializer  # noqa: E402
+from ims_backend import renderers  # noqa: E402
+from student.models import Student  # noqa: E402
+from student.serializers import StudentSerializer  # noqa: E402
+
+
+def student_payload(count):
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    students = [
+        Student(
+            id=index, name=f'Student {index}', idNumber=f'ID{index:06d}', email=f'student{index}@example.com',
+            phone='0780000000', program='Software Development', enrollmentDate=date(2024, 1, 1) + timedelta(days=index % 300),
+            gpa=Decimal('3.25'), cumulative_gpa=Decimal('3.10'), totalFees=Decimal('1200.00'), paidAmount=Decimal('800.00'),
+            remainingAmount=Decimal('400.00'), courses=['Python', 'Django', 'React'],
+            grades={'Python': 'A', 'Django': 'B+', 'React': 'A-'},
+            assignments={'completed': 12, 'total': 15, 'averageScore': 86.5},
+            monthlyData={month: {'present': random.randint(10, 22), 'absent': random.randint(0, 5), 'late': random.randint(0, 3)} for month in months},
+            achievements=[{'title': 'Hackathon', 'date': '2024-05-01'}],
+            feedback=[{'author': 'Mentor', 'comment': 'Consistent progress on projects.', 'rating': 4}],
+            created_at=timezone.now(),
+        )
+        for index in range(count)
+    ]
+    return StudentSerializer(students, many=True).data
+
+
+def transaction_payload(count):
+    transactions = [
+        Transaction(
+            id=index, type='Income' if index % 3 else 'Expense', status='Completed', category='Education',
+            description=f'Tuition payment {index}', amount=Decimal(f'{index % 5000}.75'),
+            date=date(2024, 1, 1) + timedelta(days=index % 365), method='Bank Transfer', created_at=timezone.now(),
+        )
+        for index in range(count)
+    ]
+    return {
+        'report_type': 'basic',
+        'period': 'All Time',
+        'total_income': 123456.75,
+        'total_expenses': 65432.25,
+        'net_profit': 58024.5,
+        'transactions': TransactionSerializer(transactions, many=True).data,
+        'income_by_category': {'Education': 123456.75},
+        'expenses_by_category': {'Rent': 65432.25},
+    }
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def bench(name, data, repeat):
+    cases = [
+        ('drf-json', JSONRenderer(), JSONParser()),
+        ('orjson', renderers.ORJSONRenderer(), renderers.ORJSONParser()),
+    ]
+    if renderers.msgpack is not None:
+        cases.append(('msgpack', renderers.MessagePackRenderer(), renderers.MessagePackParser()))
+
+    results = []
+    for label, renderer, parser in cases:
+        render_time, body = best_of(repeat, lambda: renderer.render(data, renderer.media_type, {}))
+        parse_time, _ = best_of(repeat, lambda: parser.parse(io.BytesIO(body), parser.media_type, {}))
+        results.append({
+            'payload': name,
+            'format': label,
+            'bytes': len(body),
+            'render_ms': round(render_time * 1000, 2),
+            'parse_ms': round(parse_time * 1000, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = bench('students', student_payload(args.students), args.repeat)
+    results += bench('report', transaction_payload(args.transactions), args.repeat)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Concurrent read/write benchmark for the SQLite connection settings.
+
+Runs writer and reader processes (standing in for gunicorn workers) against a
+scratch database file, once with SQLite's defaults (rollback journal, deferred
+transactions) and once with the pragmas and immediate transactions from
+ims_backend.db, then prints operations per second and lock errors for each.
+
+    python benchmarks/sqlite_concurrency.py --writers 4 --readers 8 --seconds 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ims_backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from ims_backend.db import apply_sqlite_pragmas, get_sqlite_pragmas  # noqa: E402
+
+SEED_ROWS = 20000
+
+
+def connect(path, tuned, timeout):
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+    if tuned:
+        apply_sqlite_pragmas(conn.cursor(), get_sqlite_pragmas())
+    return conn
+
+
+def create_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            present INTEGER NOT NULL
+        );
+        CREATE INDEX attendance_student ON attendance (student_id);
+        CREATE TABLE enrollment (
+            student_id INTEGER PRIMARY KEY,
+            attended INTEGER NOT NULL DEFAULT 0
+        );
+    ''')
+    conn.executemany('INSERT INTO enrollment (student_id) VALUES (?)', [(i,) for i in range(1000)])
+    conn.executemany(
+        'INSERT INTO attendance (student_id, day, present) VALUES (?, ?, ?)',
+        [(i % 1000, f'2024-01-{i % 28 + 1:02d}', i % 2) for i in range(SEED_ROWS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def writer(path, tuned, timeout, deadline, results):
+    conn = connect(path, tuned, timeout)
+    ops = errors = 0
+    begin = 'BEGIN IMMEDIATE' if tuned else 'BEGIN'
+    while time.time() < deadline:
+        student_id = random.randrange(1000)
+        try:
+            conn.execute(begin)
+            # Read-then-write, as a view checking the enrollment before marking attendance does
+            conn.execute('SELECT attended FROM enrollment WHERE student_id = ?', (student_id,)).fetchone()
+            conn.execute('INSERT INTO attendance (student_id, day, present) VALUES (?, ?, 1)', (student_id, '2024-02-01'))
+            conn.execute('UPDATE enrollment SET attended = attended + 1 WHERE student_id = ?', (student_id,))
+            conn.execute('COMMIT')
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+    conn.close()
+    results.put(('write', ops, errors))
+
+
+def reader(path, tuned, timeout, deadline, results):
+    conn = connect(path, tuned, timeout)
+    ops = errors = 0
+    while time.time() < deadline:
+        start = random.randrange(950)
+        try:
+            conn.execute(
+                'SELECT student_id, count(*), sum(present) FROM attendance '
+                'WHERE student_id BETWEEN ? AND ? GROUP BY student_id',
+                (start, start + 50),
+            ).fetchall()
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    results.put(('read', ops, errors))
+
+
+def run(tuned, writers, readers, seconds, timeout):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        create_database(path)
+        if tuned:
+            # journal_mode=WAL is stored in the file, so switch it before the workers start
+            connect(path, tuned, timeout).close()
+
+        results = multiprocessing.Queue()
+        deadline = time.time() + seconds
+        processes = [
+            multiprocessing.Process(target=writer, args=(path, tuned, timeout, deadline, results))
+            for _ in range(writers)
+        ] + [
+            multiprocessing.Process(target=reader, args=(path, tuned, timeout, deadline, results))
+            for _ in range(readers)
+        ]
+        for process in processes:
+            process.start()
+        totals = {'write': [0, 0], 'read': [0, 0]}
+        for _ in processes:
+            kind, ops, errors = results.get()
+            totals[kind][0] += ops
+            totals[kind][1] += errors
+        for process in processes:
+            process.join()
+
+    return {
+        'config': 'tuned' if tuned else 'default',
+        'writes_per_second': round(totals['write'][0] / seconds, 1),
+        'reads_per_second': round(totals['read'][0] / seconds, 1),
+        'write_errors': totals['write'][1],
+        'read_errors': totals['read'][1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--timeout', type=float, default=5, help='sqlite3 busy timeout in seconds for the default run (Django\'s default is 5)')
+    args = parser.parse_args()
+
+    results = [
+        run(False, args.writers, args.readers, args.seconds, args.timeout),
+        run(True, args.writers, args.readers, args.seconds, get_sqlite_pragmas().get('busy_timeout', 5000) / 1000),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
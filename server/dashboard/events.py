@@ -0,0 +1,77 @@
+import asyncio
+import json
+import logging
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One connected client: an asyncio queue owned by the event loop serving it."""
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _put(self, event):
+        # A client that stops reading loses its oldest events rather than growing without bound
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+
+class EventBus:
+    """
+    In-process fan-out of events to connected SSE clients. ``publish`` can be
+    called from any thread (request threads, the activity log writer); events
+    are handed to each subscriber's event loop.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def publish(self, event_type, data, user_id=None):
+        """Send an event to every subscriber, or only to ``user_id``'s connections."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        if not subscriptions:
+            return
+        event = format_event(event_type, data)
+        for subscription in subscriptions:
+            if user_id is not None and subscription.user_id != user_id:
+                continue
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The loop serving this client has shut down
+                self.unsubscribe(subscription)
+
+
+def format_event(event_type, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"event: {event_type}\ndata: {payload}\n\n"
+
+
+bus = EventBus()
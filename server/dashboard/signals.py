@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from student.models import Student
+from Employee.models import Employee
+from settings.models import ActivityLog, Notification
+from settings.serializers import NotificationSerializer
+from settings.signals import activities_logged, notifications_created, bulk_updated
+
+from . import summary
+from .events import bus
+
+
+def _refresh_kpis(refresh):
+    def run():
+        before = summary.get_kpis()
+        refresh()
+        after = summary.get_kpis()
+        if after != before:
+            bus.publish('kpis', after)
+    run.refresh = refresh
+    return run
+
+
+def _schedule_refresh(refresh):
+    """
+    Run ``refresh`` once the current transaction commits, once per
+    transaction however many rows it writes: a purge or an attendance loop
+    would otherwise recount the collection per row. Pending callbacks are
+    dropped with a rolled back savepoint, so one that is still queued is
+    always going to run.
+    """
+    if not summary.is_loaded():
+        return
+    connection = transaction.get_connection()
+    if connection.in_atomic_block and any(
+        getattr(callback, 'refresh', None) is refresh for _, callback, _ in connection.run_on_commit
+    ):
+        return
+    transaction.on_commit(_refresh_kpis(refresh))
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(bulk_updated, sender=Student)
+def update_student_kpis(sender, **kwargs):
+    _schedule_refresh(summary.refresh_students)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(bulk_updated, sender=Employee)
+def update_employee_kpis(sender, **kwargs):
+    _schedule_refresh(summary.refresh_employees)
+
+
+@receiver(activities_logged, sender=ActivityLog)
+def update_recent_activities(sender, activities, **kwargs):
+    summary.push_activities(activities)
+    if bus.has_subscribers():
+        for activity in activities:
+            bus.publish('activity', summary.format_activity(activity))
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    if created and bus.has_subscribers():
+        data = NotificationSerializer(instance).data
+        transaction.on_commit(lambda: bus.publish('notification', data, user_id=instance.user_id))
+
+
+@receiver(notifications_created, sender=Notification)
+def publish_notifications(sender, notifications, **kwargs):
+    if bus.has_subscribers():
+        for notification in notifications:
+            bus.publish('notification', NotificationSerializer(notification).data, user_id=notification.user_id)
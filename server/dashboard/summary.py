@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db.models import Count
+
+from student.models import Student
+from Employee.models import Employee
+from settings.activity import get_activity_icon
+from settings.models import ActivityLog
+
+RECENT_ACTIVITY_LIMIT = 10
+
+# Dashboard KPIs and the latest activities are kept in process memory and
+# updated by model signals, so a warm process answers the summary without
+# touching the database. Writes made by other processes (or through bulk
+# queries that skip signals) show up once the snapshot is older than
+# DASHBOARD_SUMMARY_TTL seconds and gets reloaded.
+_lock = threading.RLock()
+_kpis = {}
+_recent = deque(maxlen=RECENT_ACTIVITY_LIMIT)
+_loaded_at = None
+
+
+def _ttl():
+    return getattr(settings, 'DASHBOARD_SUMMARY_TTL', 60)
+
+
+def format_activity(activity):
+    return {
+        'id': activity.id,
+        'action': activity.description,
+        'user': activity.user.username if activity.user else 'System',
+        'timestamp': activity.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'icon': get_activity_icon(activity.activity_type),
+        'type': activity.item_type or 'system'
+    }
+
+
+def refresh_students():
+    program_counts = dict(
+        Student.objects.filter(is_deleted=False)
+        .values_list('program')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    with _lock:
+        _kpis.update({
+            'totalStudents': sum(program_counts.values()),
+            'iotStudents': program_counts.get('IoT Development', 0),
+            'sodStudents': program_counts.get('Software Development', 0),
+        })
+
+
+def refresh_employees():
+    total_employees = Employee.objects.count()
+    with _lock:
+        _kpis['totalEmployees'] = total_employees
+
+
+def refresh_recent_activities():
+    activities = ActivityLog.objects.select_related('user').order_by('-created_at', '-id')[:RECENT_ACTIVITY_LIMIT]
+    formatted = [format_activity(activity) for activity in activities]
+    with _lock:
+        _recent.clear()
+        _recent.extend(formatted)
+
+
+def push_activities(activities):
+    """Prepend freshly written activity entries to the ring buffer."""
+    formatted = [format_activity(activity) for activity in activities if activity.pk]
+    with _lock:
+        for item in formatted:
+            _recent.appendleft(item)
+
+
+def reload():
+    global _loaded_at
+    refresh_students()
+    refresh_employees()
+    refresh_recent_activities()
+    with _lock:
+        _loaded_at = time.monotonic()
+
+
+def is_loaded():
+    return _loaded_at is not None
+
+
+def invalidate():
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+
+def get_kpis():
+    with _lock:
+        return dict(_kpis)
+
+
+def get_summary():
+    with _lock:
+        stale = _loaded_at is None or time.monotonic() - _loaded_at > _ttl()
+    if stale:
+        reload()
+    with _lock:
+        return {
+            'totalStudents': _kpis['totalStudents'],
+            'totalEmployees': _kpis['totalEmployees'],
+            'iotStudents': _kpis['iotStudents'],
+            'sodStudents': _kpis['sodStudents'],
+            'recentActivities': list(_recent),
+        }
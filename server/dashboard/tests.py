@@ -1,3 +1,113 @@
-from django.test import TestCase
+import asyncio
+import random
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from ims_backend import seeding
+from ims_backend.testing import QueryBudgetTestCase
+from settings.activity import log_activity
+from student.models import Student
+from . import summary
+from .events import SUBSCRIBER_QUEUE_SIZE, bus
+from .views import _event_stream
+
+
+@override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False}, DASHBOARD_SUMMARY_TTL=3600)
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        summary.invalidate()
+        self.addCleanup(summary.invalidate)
+        self.rng = random.Random(0)
+        seeding.seed_students(3, rng=self.rng)
+
+    def test_snapshot_follows_signals(self):
+        self.assertEqual(summary.get_summary()['totalStudents'], 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            seeding.build_student(10, self.rng).save()
+        with self.assertNumQueries(0):
+            self.assertEqual(summary.get_summary()['totalStudents'], 4)
+
+        log_activity(activity_type='create', description='Created a student', sync=True)
+        self.assertEqual(summary.get_summary()['recentActivities'][0]['action'], 'Created a student')
+
+    def test_writes_without_signals_show_after_reload(self):
+        summary.get_summary()
+        Student.objects.update(is_deleted=True)
+        self.assertEqual(summary.get_summary()['totalStudents'], 3)
+        summary.invalidate()
+        self.assertEqual(summary.get_summary()['totalStudents'], 0)
+
+
+class DashboardEventTests(TestCase):
+    def test_stream_delivers_snapshot_and_own_events(self):
+        async def read():
+            stream = _event_stream(SimpleNamespace(id=1))
+            chunks = [await anext(stream), await anext(stream)]
+            bus.publish('notification', {'id': 1}, user_id=2)
+            bus.publish('notification', {'id': 2}, user_id=1)
+            bus.publish('kpis', {'totalStudents': 5})
+            chunks += [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return chunks
+
+        with mock.patch.object(summary, 'get_summary', return_value={'totalStudents': 4}):
+            chunks = asyncio.run(read())
+        self.assertEqual(chunks, [
+            'retry: 5000\n\n',
+            'event: summary\ndata: {"totalStudents": 4}\n\n',
+            'event: notification\ndata: {"id": 2}\n\n',
+            'event: kpis\ndata: {"totalStudents": 5}\n\n',
+        ])
+        self.assertFalse(bus.has_subscribers())
+
+    def test_slow_subscriber_drops_oldest_events(self):
+        async def fill():
+            subscription = bus.subscribe(1)
+            try:
+                for index in range(SUBSCRIBER_QUEUE_SIZE + 5):
+                    bus.publish('activity', {'id': index})
+                await asyncio.sleep(0)
+                return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+            finally:
+                bus.unsubscribe(subscription)
+
+        events = asyncio.run(fill())
+        self.assertEqual(len(events), SUBSCRIBER_QUEUE_SIZE)
+        self.assertEqual(events[0], 'event: activity\ndata: {"id": 5}\n\n')
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+    def test_summary(self):
+        self.assertBudget('get', '/dashboard/api/summary/', 4)
+        # Served from the in-process snapshot once loaded
+        self.assertBudget('get', '/dashboard/api/summary/', 0)
+
+    def test_events(self):
+        # Outside ASGI the feed sends the current snapshot once and ends
+        response = self.assertBudget('get', '/dashboard/api/events/', 4)
+        self.assertIn(b'event: summary', response.body)
+
+    def test_events_unauthenticated(self):
+        self.assertBudget('get', '/dashboard/api/events/', 0, status=401, HTTP_AUTHORIZATION='')
+
+
+class DashboardSnapshotQueryBudgetTests(QueryBudgetTestCase):
+    """Writes with the dashboard snapshot loaded, so their KPI refreshes are counted."""
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(summary.invalidate)
+
+    def test_purge(self):
+        self.request('post', '/student/api/students/bulk/delete/', {'ids': self.student_ids[:50]})
+        summary.reload()
+        # One student recount for the whole purge, not one per deleted row
+        self.assertBudget('post', '/api/settings/trash/purge/', 11, data={'all': True}, commit=True)
+        self.assertEqual(summary.get_kpis()['totalStudents'], self.students - 50)
+
+    def test_mark_attendance(self):
+        summary.reload()
+        data = {'date': '2024-07-01', 'status': 'present', 'student_ids': self.student_ids[:10]}
+        self.assertBudget('post', '/student/api/students/attendance/', 35, data=data, commit=True)
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('api/summary/', views.DashboardSummaryView.as_view(), name='dashboard-summary'),
+    path('api/events/', views.event_stream, name='dashboard-events'),
 ]
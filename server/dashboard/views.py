@@ -1,58 +1,80 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Count
-from student.models import Student
-from Employee.models import Employee
+from settings.authentication import CachedTokenAuthentication
+from ims_backend.db_router import replica_reads
+from . import summary
+from .events import bus, format_event
+
 
 class DashboardSummaryView(APIView):
+    @replica_reads()
     def get(self, request):
-        # Get student statistics
-        students = Student.objects.filter(is_deleted=False)
-        total_students = students.count()
-
-        # Count students by program
-        program_counts = students.values('program').annotate(count=Count('id'))
-        iot_students = 0
-        sod_students = 0
-
-        for item in program_counts:
-            if item['program'] == 'IoT Development':
-                iot_students = item['count']
-            elif item['program'] == 'Software Development':
-                sod_students = item['count']
-
-        # Get employee count
-        total_employees = Employee.objects.count()
-
-        # Get recent activities from ActivityLog model
-        from settings.models import ActivityLog
-        recent_activities = []
-        activities = ActivityLog.objects.all().order_by('-created_at')[:10]
-
-        for activity in activities:
-            icon_map = {
-                'create': 'fas fa-plus text-green-600',
-                'update': 'fas fa-edit text-blue-600',
-                'delete': 'fas fa-trash text-red-600',
-                'restore': 'fas fa-undo text-yellow-600',
-                'login': 'fas fa-sign-in-alt text-green-600',
-                'logout': 'fas fa-sign-out-alt text-gray-600',
-                'other': 'fas fa-info-circle text-gray-600'
-            }
-
-            recent_activities.append({
-                'id': activity.id,
-                'action': activity.description,
-                'user': activity.user.username if activity.user else 'System',
-                'timestamp': activity.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'icon': icon_map.get(activity.activity_type, 'fas fa-info-circle text-gray-600'),
-                'type': activity.item_type or 'system'
-            })
-
-        return Response({
-            'totalStudents': total_students,
-            'totalEmployees': total_employees,
-            'iotStudents': iot_students,
-            'sodStudents': sod_students,
-            'recentActivities': recent_activities,
-        })
+        # KPIs and recent activities are served from the in-process snapshot
+        # kept up to date by model signals (see dashboard.summary)
+        return Response(summary.get_summary())
+
+
+async def _authenticate(request):
+    # EventSource cannot send headers, so the token may also come as ?token=
+    key = request.GET.get('token')
+    header = request.headers.get('Authorization', '')
+    if not key and header.startswith('Token '):
+        key = header.split(' ', 1)[1].strip()
+    if not key:
+        return None
+    try:
+        user, _ = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(key)
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+async def _event_stream(user):
+    subscription = bus.subscribe(user.id)
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_INTERVAL', 15)
+    try:
+        yield 'retry: 5000\n\n'
+        yield format_event('summary', await sync_to_async(summary.get_summary)())
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield event
+    finally:
+        bus.unsubscribe(subscription)
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events feed of ``summary``/``kpis`` updates, new ``activity``
+    entries and the user's ``notification``s.
+
+    Idle connections only cost a queue on the event loop when served over ASGI
+    (``ims_backend.asgi``). Under WSGI a streaming connection would pin a
+    worker thread, so the current snapshot is sent once and the client's
+    EventSource reconnects after the ``retry`` delay.
+    """
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(_event_stream(user), content_type='text/event-stream')
+    else:
+        snapshot = await sync_to_async(summary.get_summary)()
+        response = StreamingHttpResponse(
+            iter(['retry: 15000\n\n', format_event('summary', snapshot)]),
+            content_type='text/event-stream',
+        )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
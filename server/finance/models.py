@@ -1,6 +1,10 @@
 from django.db import models
 
-class Transaction(models.Model):
+from settings.versioning import ChangeTrackingMixin
+
+class Transaction(ChangeTrackingMixin, models.Model):
+    version_name = 'transactions'
+
     TYPE_CHOICES = [
         ('Income', 'Income'),
         ('Expense', 'Expense'),
@@ -33,6 +37,9 @@ class Transaction(models.Model):
     method = models.CharField(max_length=50)
     screenshot = models.ImageField(upload_to='transaction_screenshots/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Position in the collection's change feed, stamped on save and by settings.versioning.record_change
+    change_seq = models.BigIntegerField(default=0, editable=False, db_index=True)
 
     def __str__(self):
         return f"{self.category} - {self.description} - {self.amount}"
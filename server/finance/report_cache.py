@@ -0,0 +1,101 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from settings.versioning import get_version
+
+from .reports import get_report_queryset, render_report_pdf, render_report_to_tempfile
+from .signals import TRANSACTIONS_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Generated report PDFs are stored as "<sha256>.pdf" where the hash covers the
+# report parameters, the resolved period and the transactions data version, so
+# any Transaction write makes new requests miss and stale files simply age out.
+# File mtimes are bumped on every hit and the oldest files are evicted once
+# the directory grows past REPORT_CACHE_MAX_BYTES.
+
+
+def get_cache_dir():
+    return Path(getattr(settings, 'REPORT_CACHE_DIR', Path(settings.BASE_DIR) / 'report_cache'))
+
+
+def get_max_bytes():
+    return getattr(settings, 'REPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+
+
+def report_key(params):
+    """Content key for the report ``params`` describe against the current data. Raises ``ValueError`` on bad dates."""
+    _, period = get_report_queryset(params)
+    payload = {
+        'params': {key: str(value) for key, value in params.items()},
+        'period': period,
+        'version': get_version(TRANSACTIONS_VERSION),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def evict(cache_dir=None, max_bytes=None, keep=None):
+    """Delete the least recently used PDFs, other than ``keep``, until the cache fits in ``max_bytes``."""
+    cache_dir = cache_dir or get_cache_dir()
+    max_bytes = get_max_bytes() if max_bytes is None else max_bytes
+    entries = []
+    for path in cache_dir.glob('*.pdf'):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+            total -= size
+        except OSError:
+            pass
+
+
+def open_report_pdf(params, key=None):
+    """
+    Return ``(file, key)`` with the PDF for ``params`` opened for reading,
+    rendering it into the cache first on a miss. Concurrent misses render
+    separately and the last rename wins, which is harmless since both files
+    hold the same content. ``key`` skips recomputing an already known
+    ``report_key``. With ``REPORT_CACHE_MAX_BYTES = 0`` nothing is
+    cached and the PDF is rendered into a temporary file.
+    """
+    key = key or report_key(params)
+    if not get_max_bytes():
+        return render_report_to_tempfile(params), key
+
+    cache_dir = get_cache_dir()
+    path = cache_dir / f'{key}.pdf'
+    try:
+        os.utime(path)
+        return open(path, 'rb'), key
+    except FileNotFoundError:
+        pass
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fd, part = tempfile.mkstemp(dir=cache_dir, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            render_report_pdf(params, output)
+        os.replace(part, path)
+    except Exception:
+        Path(part).unlink(missing_ok=True)
+        raise
+    # Open before evicting so a concurrent eviction cannot pull the file away
+    report = open(path, 'rb')
+    evict(cache_dir, keep=path)
+    return report, key
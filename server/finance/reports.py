@@ -0,0 +1,298 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .models import Transaction
+
+logger = logging.getLogger(__name__)
+
+# Transactions are laid out in LongTables of this many rows, each repeating the header row
+TABLE_CHUNK_ROWS = 500
+
+
+def get_report_queryset(params):
+    """
+    Apply the report parameters (``report_type``, ``start_date``/``end_date``,
+    ``type``) shared by the JSON and PDF reports. Returns ``(queryset, period)``
+    and raises ``ValueError`` for malformed dates.
+    """
+    report_type = params.get('report_type', 'basic')
+    start_date_str = params.get('start_date')
+    end_date_str = params.get('end_date')
+    type_filter = params.get('type')
+
+    queryset = Transaction.objects.all()
+
+    if type_filter:
+        queryset = queryset.filter(type=type_filter)
+
+    period = 'All Time'
+    if start_date_str and end_date_str:
+        start_date = date.fromisoformat(start_date_str)
+        end_date = date.fromisoformat(end_date_str)
+        queryset = queryset.filter(date__range=[start_date, end_date])
+        period = f"{start_date_str} to {end_date_str}"
+    elif report_type == 'monthly':
+        now = timezone.now()
+        start_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_month = start_month + timedelta(days=32)
+        end_month = next_month.replace(day=1) - timedelta(seconds=1)
+        queryset = queryset.filter(date__range=[start_month.date(), end_month.date()])
+        period = start_month.strftime('%Y-%m')
+
+    return queryset, period
+
+
+def get_report_totals(queryset):
+    total_income = queryset.filter(type='Income').aggregate(Sum('amount'))['amount__sum'] or 0
+    total_expenses = queryset.filter(type='Expense').aggregate(Sum('amount'))['amount__sum'] or 0
+
+    # Category breakdowns
+    income_breakdown = (
+        queryset.filter(type='Income')
+        .values('category')
+        .annotate(total=Sum('amount'))
+        .order_by('-total')
+    )
+    expenses_breakdown = (
+        queryset.filter(type='Expense')
+        .values('category')
+        .annotate(total=Sum('amount'))
+        .order_by('-total')
+    )
+
+    return {
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'net_profit': total_income - total_expenses,
+        'income_by_category': {item['category']: float(item['total']) for item in income_breakdown if item['total']},
+        'expenses_by_category': {item['category']: float(item['total']) for item in expenses_breakdown if item['total']},
+    }
+
+
+class _StreamingStory(list):
+    """
+    Flowable list for ``doc.build`` that is refilled from ``source`` as the
+    document consumes it, so only a couple of table chunks exist at a time.
+    ``build`` checks ``len()`` before handling each flowable, which is where
+    the refill happens.
+    """
+
+    def __init__(self, flowables, source):
+        super().__init__(flowables)
+        self._source = source
+
+    def __len__(self):
+        while self._source is not None and super().__len__() < 2:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return super().__len__()
+
+
+def _summary_table(data, header_color, font_size, align='LEFT', header_padding=None):
+    table = Table(data)
+    style = [
+        ('BACKGROUND', (0, 0), (-1, 0), header_color),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), align),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), font_size),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]
+    if header_padding:
+        style += [
+            ('BOTTOMPADDING', (0, 0), (-1, 0), header_padding),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ]
+    table.setStyle(TableStyle(style))
+    return table
+
+
+TRANSACTION_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+])
+TRANSACTION_HEADER = ['Date', 'Type', 'Category', 'Description', 'Amount']
+TRANSACTION_COL_WIDTHS = [0.9 * inch, 0.8 * inch, 1.1 * inch, 2.7 * inch, inch]
+# Long descriptions wrap inside their cell instead of being cut off
+DESCRIPTION_STYLE = ParagraphStyle('TransactionDescription', fontName='Helvetica', fontSize=8, leading=10)
+
+
+def _transaction_row(row):
+    tx_date, tx_type, category, description, amount = row
+    description = Paragraph(escape(description), DESCRIPTION_STYLE)
+    return [tx_date.isoformat(), tx_type or '', category, description, f"${amount:.2f}"]
+
+
+def _transaction_tables(queryset):
+    rows = (
+        queryset.order_by('-date', '-id')
+        .values_list('date', 'type', 'category', 'description', 'amount')
+        .iterator(chunk_size=TABLE_CHUNK_ROWS)
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(_transaction_row(row))
+        if len(chunk) == TABLE_CHUNK_ROWS:
+            yield _transaction_table(chunk)
+            chunk = []
+    if chunk:
+        yield _transaction_table(chunk)
+
+
+def _transaction_table(rows):
+    table = LongTable([TRANSACTION_HEADER] + rows, colWidths=TRANSACTION_COL_WIDTHS, repeatRows=1)
+    table.setStyle(TRANSACTION_TABLE_STYLE)
+    return table
+
+
+def render_report_pdf(params, output):
+    """
+    Write the financial report for ``params`` as a PDF into the binary file
+    ``output``. Every matching transaction is listed; rows are read with an
+    iterator and laid out a chunk at a time.
+    """
+    report_type = params.get('report_type', 'basic')
+    queryset, period = get_report_queryset(params)
+    totals = get_report_totals(queryset)
+
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Title
+    story.append(Paragraph(f"{report_type.upper().replace('_', ' ')} Report", styles['Title']))
+    story.append(Spacer(1, 12))
+
+    # Period
+    story.append(Paragraph(f"Period: {period}", styles['Heading2']))
+    story.append(Spacer(1, 6))
+
+    # Totals
+    story.append(_summary_table([
+        ['Metric', 'Amount'],
+        ['Total Income', f"${totals['total_income']:.2f}"],
+        ['Total Expenses', f"${totals['total_expenses']:.2f}"],
+        ['Net Profit', f"${totals['net_profit']:.2f}"],
+    ], colors.grey, 14, align='CENTER', header_padding=12))
+    story.append(Spacer(1, 12))
+
+    # Income Breakdown
+    if totals['income_by_category']:
+        story.append(Paragraph("Income by Category", styles['Heading2']))
+        income_data = [['Category', 'Amount']] + [[cat, f"${amt:.2f}"] for cat, amt in totals['income_by_category'].items()]
+        story.append(_summary_table(income_data, colors.green, 12))
+        story.append(Spacer(1, 12))
+
+    # Expenses Breakdown
+    if totals['expenses_by_category']:
+        story.append(Paragraph("Expenses by Category", styles['Heading2']))
+        expenses_data = [['Category', 'Amount']] + [[cat, f"${amt:.2f}"] for cat, amt in totals['expenses_by_category'].items()]
+        story.append(_summary_table(expenses_data, colors.red, 12))
+        story.append(Spacer(1, 12))
+
+    # Transactions
+    if queryset.exists():
+        story.append(Paragraph("Transactions", styles['Heading2']))
+
+    doc.build(_StreamingStory(story, _transaction_tables(queryset)))
+
+
+def render_report_to_tempfile(params):
+    """Render into an anonymous temporary file (not RAM) and return it rewound."""
+    output = tempfile.TemporaryFile()
+    try:
+        render_report_pdf(params, output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
+
+# Background report jobs
+#
+# Jobs are tracked on disk so any worker process can answer a status request:
+# "<id>.part" while rendering, "<id>.pdf" when done and "<id>.error" on failure.
+
+def get_job_dir():
+    return Path(getattr(settings, 'REPORT_JOB_DIR', Path(settings.BASE_DIR) / 'report_jobs'))
+
+
+def _cleanup_jobs(job_dir):
+    max_age = getattr(settings, 'REPORT_JOB_TTL', 24 * 60 * 60)
+    cutoff = time.time() - max_age
+    for path in job_dir.glob('*'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def _run_job(job_id, params):
+    job_dir = get_job_dir()
+    part = job_dir / f'{job_id}.part'
+    try:
+        with open(part, 'wb') as output:
+            render_report_pdf(params, output)
+        os.replace(part, job_dir / f'{job_id}.pdf')
+    except Exception:
+        # The details go to the log only; clients are told the job failed
+        logger.exception('Report job %s failed', job_id)
+        (job_dir / f'{job_id}.error').touch()
+        part.unlink(missing_ok=True)
+    finally:
+        connection.close()
+
+
+def start_report_job(params):
+    """Render the report in a background thread and return the job id."""
+    job_dir = get_job_dir()
+    job_dir.mkdir(parents=True, exist_ok=True)
+    _cleanup_jobs(job_dir)
+    job_id = uuid.uuid4().hex
+    (job_dir / f'{job_id}.part').touch()
+    threading.Thread(target=_run_job, args=(job_id, dict(params)), name=f'report-job-{job_id}', daemon=True).start()
+    return job_id
+
+
+def get_job_status(job_id):
+    """
+    Return ``(status, path)`` where status is pending, done, failed or None
+    for unknown jobs, and path is the rendered PDF once done.
+    """
+    if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+        return None, None
+    job_dir = get_job_dir()
+    if (job_dir / f'{job_id}.pdf').exists():
+        return 'done', job_dir / f'{job_id}.pdf'
+    if (job_dir / f'{job_id}.error').exists():
+        return 'failed', None
+    if (job_dir / f'{job_id}.part').exists():
+        return 'pending', None
+    return None, None
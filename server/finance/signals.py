@@ -0,0 +1,8 @@
+from settings.versioning import track_changes
+
+from .models import Transaction
+
+# Data version and change feed of the transaction collection, also used for report caching
+TRANSACTIONS_VERSION = Transaction.version_name
+
+track_changes(Transaction, TRANSACTIONS_VERSION)
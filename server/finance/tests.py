@@ -1,3 +1,198 @@
-from django.test import TestCase
+import csv
+import io
+import tempfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.test import TestCase, override_settings
+
+from ims_backend.testing import QueryBudgetTestCase
+from . import report_cache, reports
+from .models import Transaction
+
+
+class TransactionExportTests(TestCase):
+    descriptions = ['=HYPERLINK("http://evil.example","x")', '+1+2', '-2+3', '@SUM(A1)', '\tTabbed', 'Plain - text']
+
+    def setUp(self):
+        for index, description in enumerate(self.descriptions):
+            Transaction.objects.create(
+                type='Expense', status='Completed', category='Other', description=description,
+                amount=Decimal('10.50'), date=date(2024, 1, index + 1), method='Cash',
+            )
+
+    def test_csv_escapes_formulas(self):
+        response = self.client.get('/finance/api/transactions/export/?columns=date,description,amount')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="transactions.csv"')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['date', 'description', 'amount'])
+        self.assertEqual(
+            [row[1] for row in rows[1:]],
+            ['Plain - text', "'\tTabbed", "'@SUM(A1)", "'-2+3", "'+1+2", '\'=HYPERLINK("http://evil.example","x")'],
+        )
+        self.assertEqual((rows[-1][0], rows[-1][2]), ('2024-01-01', '10.50'))
+
+    def test_xlsx_escapes_formulas(self):
+        response = self.client.get('/finance/api/transactions/export/?file_format=xlsx&columns=description')
+        workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        values = [row[0] for row in workbook.active.iter_rows(min_row=2, values_only=True)]
+        self.assertEqual(values[-1], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertTrue(all(value == 'Plain - text' or value.startswith("'") for value in values))
+
+    def test_invalid_options(self):
+        for query in ('file_format=pdf', 'columns=description,secret'):
+            self.assertEqual(self.client.get(f'/finance/api/transactions/export/?{query}').status_code, 400, query)
+
+
+class ReportPDFTests(TestCase):
+    def setUp(self):
+        job_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(job_dir.cleanup)
+        self.job_dir = Path(job_dir.name)
+        override = self.settings(REPORT_JOB_DIR=self.job_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_long_descriptions_wrap(self):
+        description = 'Quarterly maintenance of the <lab> & workshop equipment, ' * 4
+        row = reports._transaction_row((date(2024, 1, 2), 'Expense', 'Other', description, Decimal('12.5')))
+        self.assertEqual(row[3].getPlainText(), description.strip())
+        self.assertEqual(row[4], '$12.50')
+
+        Transaction.objects.create(type='Expense', category='Other', description=description, amount=Decimal('12.50'),
+                                   date=date(2024, 1, 2), method='Cash')
+        output = io.BytesIO()
+        reports.render_report_pdf({}, output)
+        self.assertTrue(output.getvalue().startswith(b'%PDF'))
+
+    def test_failed_job_hides_the_error(self):
+        job_id = 'a' * 32
+        (self.job_dir / f'{job_id}.part').touch()
+        with mock.patch.object(reports, 'render_report_pdf', side_effect=OSError('/srv/secret/path is full')), \
+                mock.patch.object(reports, 'connection'), self.assertLogs('finance.reports', 'ERROR') as logs:
+            reports._run_job(job_id, {})
+        self.assertIn('/srv/secret/path is full', logs.output[0])
+
+        response = self.client.get(f'/finance/api/reports/pdf/jobs/{job_id}/')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()['status'], 'failed')
+        self.assertNotIn('secret', response.json()['error'])
+        self.assertFalse((self.job_dir / f'{job_id}.part').exists())
+
+    def test_job_states(self):
+        job_id = 'b' * 32
+        (self.job_dir / f'{job_id}.part').touch()
+        self.assertEqual(self.client.get(f'/finance/api/reports/pdf/jobs/{job_id}/').status_code, 202)
+        (self.job_dir / f'{job_id}.pdf').write_bytes(b'%PDF-1.4')
+        response = self.client.get(f'/finance/api/reports/pdf/jobs/{job_id}/')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4')
+        self.assertEqual(self.client.get('/finance/api/reports/pdf/jobs/not-a-job/').status_code, 404)
+
+
+class ReportCacheTests(TestCase):
+    path = '/finance/api/reports/pdf/?start_date=2024-01-01&end_date=2024-12-31'
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = Path(cache_dir.name)
+        override = self.settings(REPORT_CACHE_DIR=self.cache_dir, REPORT_CACHE_MAX_BYTES=10 * 1024 * 1024)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.create_transaction()
+        render = mock.patch.object(report_cache, 'render_report_pdf', side_effect=reports.render_report_pdf)
+        self.render = render.start()
+        self.addCleanup(render.stop)
+
+    def create_transaction(self):
+        Transaction.objects.create(type='Income', category='Education', description='Tuition', amount=Decimal('100.00'),
+                                   date=date(2024, 3, 1), method='Cash')
+
+    def download(self, **headers):
+        response = self.client.get(self.path, **headers)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+        return response
+
+    def test_revalidation(self):
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(response.body.startswith(b'%PDF'))
+
+        self.assertEqual(self.download(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.download(HTTP_IF_MATCH=etag).status_code, 200)
+        self.assertEqual(self.download(HTTP_IF_MATCH='"stale"').status_code, 412)
+        self.assertEqual(self.render.call_count, 1)
+
+        # Any transaction write changes the key
+        self.create_transaction()
+        response = self.download(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_eviction_keeps_the_newest(self):
+        self.download()
+        first = set(self.cache_dir.glob('*.pdf'))
+        size = sum(path.stat().st_size for path in first)
+        self.create_transaction()
+        with self.settings(REPORT_CACHE_MAX_BYTES=size):
+            self.download()
+        remaining = set(self.cache_dir.glob('*.pdf'))
+        self.assertEqual(len(remaining), 1)
+        self.assertFalse(remaining & first)
+
+    def test_disabled_cache_renders_every_time(self):
+        with self.settings(REPORT_CACHE_MAX_BYTES=0):
+            self.assertEqual(self.download().status_code, 200)
+        self.assertFalse(list(self.cache_dir.iterdir()))
+
+
+@override_settings(REPORT_CACHE_MAX_BYTES=0)
+class FinanceQueryBudgetTests(QueryBudgetTestCase):
+    def test_list(self):
+        response = self.assertBudget('get', '/finance/api/transactions/', 3)
+        self.assertEqual(len(response.json()), self.transactions)
+
+    def test_list_not_modified(self):
+        etag = self.request('get', '/finance/api/transactions/')['ETag']
+        self.assertBudget('get', '/finance/api/transactions/', 1, status=304, HTTP_IF_NONE_MATCH=etag)
+
+    def test_create(self):
+        data = {'category': 'Education', 'description': 'Tuition payment', 'amount': '250.00', 'date': '2024-09-02', 'method': 'Bank Transfer'}
+        response = self.assertBudget('post', '/finance/api/transactions/', 3, status=201, data=data)
+        self.assertEqual(response.json()['type'], 'Income')
+
+    def test_detail(self):
+        transaction = Transaction.objects.first()
+        path = f'/finance/api/transactions/{transaction.pk}/'
+        self.assertBudget('get', path, 3)
+        self.assertBudget('patch', path, 3, data={'status': 'Pending'})
+        self.assertBudget('delete', path, 4, status=204)
+
+    def test_changes(self):
+        self.assertBudget('get', '/finance/api/transactions/changes/', 2)
+        self.assertBudget('get', '/finance/api/transactions/changes/?since=0&limit=200', 2)
+
+    def test_export(self):
+        self.assertBudget('get', '/finance/api/transactions/export/?type=Expense', 2)
+        self.assertBudget('get', '/finance/api/transactions/export/?file_format=xlsx', 1, ms=1500)
+
+    def test_summary(self):
+        self.assertBudget('get', '/finance/api/summary/', 3)
+
+    def test_reports(self):
+        self.assertBudget('get', '/finance/api/reports/', 6)
+        self.assertBudget('get', '/finance/api/reports/?report_type=detailed&start_date=2024-03-01&end_date=2024-06-30', 5)
+
+    def test_report_pdf(self):
+        response = self.assertBudget('get', '/finance/api/reports/pdf/?start_date=2024-01-01&end_date=2024-12-31', 8, ms=2000)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+    def test_report_pdf_job_unknown(self):
+        self.assertBudget('get', f'/finance/api/reports/pdf/jobs/{"0" * 32}/', 1, status=404)
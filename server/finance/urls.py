@@ -3,8 +3,11 @@ from . import views
 
 urlpatterns = [
     path('api/transactions/', views.TransactionListCreateView.as_view(), name='transaction-list'),
+    path('api/transactions/changes/', views.TransactionChangesView.as_view(), name='transaction-changes'),
+    path('api/transactions/export/', views.TransactionExportView.as_view(), name='transaction-export'),
     path('api/transactions/<int:pk>/', views.TransactionDetailView.as_view(), name='transaction-detail'),
     path('api/summary/', views.SummaryView.as_view(), name='summary'),
     path('api/reports/', views.ReportView.as_view(), name='reports'),
     path('api/reports/pdf/', views.ReportPDFView.as_view(), name='report-pdf'),
+    path('api/reports/pdf/jobs/<str:job_id>/', views.ReportPDFJobView.as_view(), name='report-pdf-job'),
 ]
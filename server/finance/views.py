@@ -1,26 +1,51 @@
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.db.models import Sum, Q
-from django.utils import timezone
-from datetime import datetime, timedelta, date
+from django.urls import reverse
+from datetime import date
 from .models import Transaction
 from .serializers import TransactionSerializer
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
+from .reports import get_report_queryset, get_report_totals, start_report_job, get_job_status
+from .report_cache import open_report_pdf, report_key
 from django.http import FileResponse
-from io import BytesIO
-from django.conf import settings
+from django.utils.cache import get_conditional_response
 from .ai_service import TransactionAIClassifier
-
-class TransactionListCreateView(generics.ListCreateAPIView):
+from ims_backend.db_router import replica_reads
+from settings.changes import ChangeFeedView
+from settings.conditional import VersionedGetMixin
+from .signals import TRANSACTIONS_VERSION
+from ims_backend.exports import export_response
+
+TRANSACTION_EXPORT_COLUMNS = {field.name: field.name for field in Transaction._meta.concrete_fields}
+TRANSACTION_EXPORT_DEFAULT = ['id', 'date', 'type', 'status', 'category', 'description', 'amount', 'method']
+REPORT_PARAMS = ('report_type', 'start_date', 'end_date', 'type')
+
+
+def filter_transactions(queryset, params):
+    """Filters shared by the transaction list and export: type, status, category and a start_date/end_date range."""
+    for field in ('type', 'status', 'category'):
+        if params.get(field):
+            queryset = queryset.filter(**{field: params[field]})
+    try:
+        if params.get('start_date'):
+            queryset = queryset.filter(date__gte=date.fromisoformat(params['start_date']))
+        if params.get('end_date'):
+            queryset = queryset.filter(date__lte=date.fromisoformat(params['end_date']))
+    except ValueError:
+        raise ValidationError({'error': 'Invalid date format. Use YYYY-MM-DD.'})
+    return queryset
+
+
+class TransactionListCreateView(VersionedGetMixin, generics.ListCreateAPIView):
+    version_name = TRANSACTIONS_VERSION
     queryset = Transaction.objects.all().order_by('-date')
     serializer_class = TransactionSerializer
 
+    def get_queryset(self):
+        return filter_transactions(super().get_queryset(), self.request.query_params)
+
     def get_serializer(self, *args, **kwargs):
         if self.request.method == 'POST':
             kwargs['data'] = self.request.data.copy()
@@ -37,7 +62,8 @@ class TransactionListCreateView(generics.ListCreateAPIView):
         })
         serializer.save(type=classification['type'], status=classification['status'])
 
-class TransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TransactionDetailView(VersionedGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    version_name = TRANSACTIONS_VERSION
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
 
@@ -46,6 +72,20 @@ class TransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
             kwargs['data'] = self.request.data.copy()
         return super().get_serializer(*args, **kwargs)
 
+class TransactionChangesView(ChangeFeedView):
+    model = Transaction
+    serializer_class = TransactionSerializer
+    version_name = TRANSACTIONS_VERSION
+    soft_delete = False
+
+class TransactionExportView(APIView):
+    """Stream transactions as CSV (or XLSX with ``?file_format=xlsx``), honouring the list filters."""
+
+    @replica_reads()
+    def get(self, request):
+        transactions = filter_transactions(Transaction.objects.all(), request.query_params).order_by('-date', '-id')
+        return export_response(request, transactions, TRANSACTION_EXPORT_COLUMNS, TRANSACTION_EXPORT_DEFAULT, 'transactions')
+
 class SummaryView(APIView):
     def get(self, request):
         total_income = Transaction.objects.filter(type='Income').aggregate(Sum('amount'))['amount__sum'] or 0
@@ -59,55 +99,15 @@ class SummaryView(APIView):
         })
 
 class ReportView(APIView):
+    @replica_reads()
     def get(self, request):
         report_type = request.query_params.get('report_type', 'basic')
-        start_date_str = request.query_params.get('start_date')
-        end_date_str = request.query_params.get('end_date')
-        type_filter = request.query_params.get('type')
-
-        queryset = Transaction.objects.all()
-
-        if type_filter:
-            queryset = queryset.filter(type=type_filter)
-
-        period = 'All Time'
-        if start_date_str and end_date_str:
-            try:
-                start_date = date.fromisoformat(start_date_str)
-                end_date = date.fromisoformat(end_date_str)
-                queryset = queryset.filter(date__range=[start_date, end_date])
-                period = f"{start_date_str} to {end_date_str}"
-            except ValueError:
-                return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
-        elif report_type == 'monthly':
-            now = timezone.now()
-            start_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month = start_month + timedelta(days=32)
-            end_month = next_month.replace(day=1) - timedelta(seconds=1)
-            queryset = queryset.filter(date__range=[start_month.date(), end_month.date()])
-            period = start_month.strftime('%Y-%m')
-
-        # Compute aggregates
-        total_income = queryset.filter(type='Income').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        total_expenses = queryset.filter(type='Expense').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        net_profit = total_income - total_expenses
+        try:
+            queryset, period = get_report_queryset(request.query_params)
+        except ValueError:
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
 
-        # Category breakdowns
-        income_breakdown = list(
-            queryset.filter(type='Income')
-            .values('category')
-            .annotate(total=Sum('amount'))
-            .order_by('-total')
-        )
-        expenses_breakdown = list(
-            queryset.filter(type='Expense')
-            .values('category')
-            .annotate(total=Sum('amount'))
-            .order_by('-total')
-        )
-
-        income_by_category = {item['category']: float(item['total']) for item in income_breakdown if item['total']}
-        expenses_by_category = {item['category']: float(item['total']) for item in expenses_breakdown if item['total']}
+        totals = get_report_totals(queryset)
 
         # Serialize transactions
         transactions = TransactionSerializer(queryset.order_by('-date'), many=True).data
@@ -115,158 +115,75 @@ class ReportView(APIView):
         response_data = {
             'report_type': report_type,
             'period': period,
-            'total_income': float(total_income),
-            'total_expenses': float(total_expenses),
-            'net_profit': float(net_profit),
+            'total_income': float(totals['total_income']),
+            'total_expenses': float(totals['total_expenses']),
+            'net_profit': float(totals['net_profit']),
             'transactions': transactions,
-            'income_by_category': income_by_category,
-            'expenses_by_category': expenses_by_category,
+            'income_by_category': totals['income_by_category'],
+            'expenses_by_category': totals['expenses_by_category'],
         }
 
         return Response(response_data)
 
 
 class ReportPDFView(APIView):
-    def post(self, request):
-        report_type = request.data.get('report_type', 'basic')
-        start_date_str = request.data.get('start_date')
-        end_date_str = request.data.get('end_date')
-        type_filter = request.data.get('type')
-
-        queryset = Transaction.objects.all()
-
-        if type_filter:
-            queryset = queryset.filter(type=type_filter)
-
-        period = 'All Time'
-        if start_date_str and end_date_str:
-            try:
-                start_date = date.fromisoformat(start_date_str)
-                end_date = date.fromisoformat(end_date_str)
-                queryset = queryset.filter(date__range=[start_date, end_date])
-                period = f"{start_date_str} to {end_date_str}"
-            except ValueError:
-                return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
-        elif report_type == 'monthly':
-            now = timezone.now()
-            start_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month = start_month + timedelta(days=32)
-            end_month = next_month.replace(day=1) - timedelta(seconds=1)
-            queryset = queryset.filter(date__range=[start_month.date(), end_month.date()])
-            period = start_month.strftime('%Y-%m')
-
-        # Compute aggregates
-        total_income = queryset.filter(type='Income').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        total_expenses = queryset.filter(type='Expense').aggregate(Sum('amount'))['amount__sum'] or 0.0
-        net_profit = total_income - total_expenses
+    """
+    Render the financial report as a PDF listing every matching transaction.
 
-        # Category breakdowns
-        income_breakdown = list(
-            queryset.filter(type='Income')
-            .values('category')
-            .annotate(total=Sum('amount'))
-            .order_by('-total')
-        )
-        expenses_breakdown = list(
-            queryset.filter(type='Expense')
-            .values('category')
-            .annotate(total=Sum('amount'))
-            .order_by('-total')
-        )
-
-        income_by_category = {item['category']: float(item['total']) for item in income_breakdown if item['total']}
-        expenses_by_category = {item['category']: float(item['total']) for item in expenses_breakdown if item['total']}
-
-        # Serialize transactions (limit to 20 for PDF)
-        transactions = TransactionSerializer(queryset.order_by('-date')[:20], many=True).data
-
-        # Generate PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Title
-        story.append(Paragraph(f"{report_type.upper().replace('_', ' ')} Report", styles['Title']))
-        story.append(Spacer(1, 12))
-
-        # Period
-        story.append(Paragraph(f"Period: {period}", styles['Heading2']))
-        story.append(Spacer(1, 6))
-
-        # Totals
-        totals_data = [
-            ['Metric', 'Amount'],
-            ['Total Income', f"${total_income:.2f}"],
-            ['Total Expenses', f"${total_expenses:.2f}"],
-            ['Net Profit', f"${net_profit:.2f}"],
-        ]
-        totals_table = Table(totals_data)
-        totals_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        story.append(totals_table)
-        story.append(Spacer(1, 12))
-
-        # Income Breakdown
-        if income_by_category:
-            story.append(Paragraph("Income by Category", styles['Heading2']))
-            income_data = [['Category', 'Amount']] + [[cat, f"${amt:.2f}"] for cat, amt in income_by_category.items()]
-            income_table = Table(income_data)
-            income_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.green),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            story.append(income_table)
-            story.append(Spacer(1, 12))
-
-        # Expenses Breakdown
-        if expenses_by_category:
-            story.append(Paragraph("Expenses by Category", styles['Heading2']))
-            expenses_data = [['Category', 'Amount']] + [[cat, f"${amt:.2f}"] for cat, amt in expenses_by_category.items()]
-            expenses_table = Table(expenses_data)
-            expenses_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.red),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            story.append(expenses_table)
-            story.append(Spacer(1, 12))
-
-        # Transactions (limited)
-        if transactions:
-            story.append(Paragraph("Recent Transactions", styles['Heading2']))
-            tx_data = [['Description', 'Amount', 'Date']] + [
-                [t.get('description', 'N/A'), f"${float(t.get('amount', 0)):.2f}", t.get('date', 'N/A')]
-                for t in transactions
-            ]
-            tx_table = Table(tx_data, colWidths=[3*inch, inch, inch])
-            tx_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            story.append(tx_table)
-
-        doc.build(story)
-        buffer.seek(0)
+    Parameters come from the query string (GET) or the body (POST). Rendered
+    PDFs are cached on disk by content key and served with an ``ETag``, so a
+    repeat download is a file send or a 304. Send ``"background": true`` to get
+    a 202 with a job id instead and download the file from ``ReportPDFJobView``
+    once it is ready.
+    """
 
+    def get(self, request):
+        return self.render_pdf(request, request.query_params)
+
+    def post(self, request):
+        return self.render_pdf(request, request.data)
+
+    def render_pdf(self, request, data):
+        report_type = data.get('report_type', 'basic')
+        params = {key: data.get(key) for key in REPORT_PARAMS if data.get(key)}
+        try:
+            get_report_queryset(params)
+        except ValueError:
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+
+        if str(data.get('background', '')).lower() in ('1', 'true'):
+            job_id = start_report_job(params)
+            return Response({
+                'job_id': job_id,
+                'status': 'pending',
+                'status_url': request.build_absolute_uri(reverse('report-pdf-job', args=[job_id])),
+            }, status=202)
+
+        key = report_key(params)
+        etag = f'"{key}"'
+        conditional = get_conditional_response(request, etag=etag)
+        if conditional is not None:
+            conditional['ETag'] = etag
+            return conditional
+
+        report, _ = open_report_pdf(params, key)
         filename = f"{report_type}_financial_report.pdf"
-        return FileResponse(buffer, as_attachment=True, filename=filename, content_type='application/pdf')
+        response = FileResponse(report, as_attachment=True, filename=filename, content_type='application/pdf')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class ReportPDFJobView(APIView):
+    """Poll a background PDF report: 202 while rendering, the file once done."""
+
+    def get(self, request, job_id):
+        status, path = get_job_status(job_id)
+        if status is None:
+            return Response({'error': 'Report job not found.'}, status=404)
+        if status == 'pending':
+            return Response({'job_id': job_id, 'status': status}, status=202)
+        if status == 'failed':
+            error = 'The report could not be generated. Try again later or contact an administrator.'
+            return Response({'job_id': job_id, 'status': status, 'error': error}, status=500)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename='financial_report.pdf', content_type='application/pdf')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class ImsBackendConfig(AppConfig):
+    name = 'ims_backend'
+    verbose_name = 'IMS backend'
+
+    def ready(self):
+        from .db import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid='ims_backend.configure_sqlite')
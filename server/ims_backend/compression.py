@@ -0,0 +1,147 @@
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types worth compressing; PDFs, XLSX files and images already are.
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/msgpack',
+    'application/javascript',
+    'application/xml',
+)
+# Server-Sent Events must reach the client event by event, never buffered
+# inside a compressor.
+EXCLUDED_TYPES = ('text/event-stream',)
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    codings = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def choose_encoding(header):
+    """Pick ``br`` or ``gzip`` from an ``Accept-Encoding`` header, or ``None``."""
+    codings = parse_accept_encoding(header)
+    available = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = codings.get(coding, codings.get('*', 0.0))
+        # Ties keep the earlier (better compressing) coding
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding):
+        self._brotli = encoding == 'br'
+        if self._brotli:
+            self._compressor = brotli.Compressor(quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+        else:
+            # wbits 31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        if self._brotli:
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self):
+        if self._brotli:
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress_bytes(data, encoding):
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_iterator(iterator, encoding):
+    # The compressor buffers internally and output is yielded as it fills,
+    # so a CSV export is not turned into one tiny deflate block per row.
+    compressor = Compressor(encoding)
+    for chunk in iterator:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_iterator(iterator, encoding):
+    compressor = Compressor(encoding)
+    async for chunk in iterator:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli (when installed) or gzip, as negotiated by
+    ``Accept-Encoding``. Buffered responses shorter than
+    COMPRESSION_MIN_LENGTH bytes are sent as is; streaming responses such as
+    the CSV exports are compressed on the fly. Event streams and responses
+    that are already compressed are left alone.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type in EXCLUDED_TYPES or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_LENGTH', 500):
+            return response
+
+        # The body now depends on Accept-Encoding whether or not we compress it
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_iterator(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_iterator(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressed = compress_bytes(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The encoded body differs byte for byte, so a strong ETag becomes weak (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
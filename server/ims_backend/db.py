@@ -0,0 +1,52 @@
+from django.conf import settings
+
+# Connection setup for SQLite, run on every new connection (see apps.py).
+# WAL lets readers proceed while a writer holds the lock, synchronous=NORMAL is
+# durable under WAL except for the last commits on power loss, and
+# busy_timeout makes a blocked connection wait for the lock instead of failing
+# at once with "database is locked". Write transactions take the lock up front
+# through OPTIONS['transaction_mode'] = 'IMMEDIATE', so two deferred
+# transactions can never deadlock when both try to upgrade to a write lock.
+#
+# journal_mode is stored in the database file itself, so the first connection
+# converts a file to WAL once and for good; the checked-in db.sqlite3 is kept
+# in WAL mode so that opening it leaves the file unchanged. Any other file
+# (DB_NAME) is converted the first time the server or a manage.py command
+# opens it. Its -wal/-shm companions are ignored by git. Set
+# SQLITE_PRAGMAS = {'journal_mode': None} to keep a file's current mode.
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,  # milliseconds
+    'mmap_size': 256 * 1024 * 1024,  # bytes
+    'cache_size': -64 * 1024,  # negative values are KiB, so 64 MiB per connection
+    'temp_store': 'MEMORY',
+}
+
+
+def get_sqlite_pragmas(overrides=None):
+    """
+    Default pragmas overlaid with ``settings.SQLITE_PRAGMAS`` and then
+    ``overrides`` (a database's own ``SQLITE_PRAGMAS`` entry); a ``None``
+    value skips that pragma.
+    """
+    pragmas = {**DEFAULT_SQLITE_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {}), **(overrides or {})}
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def apply_sqlite_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """``connection_created`` receiver that tunes SQLite connections and leaves other backends alone."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_sqlite_pragmas(connection.settings_dict.get('SQLITE_PRAGMAS'))
+    if connection.is_in_memory_db():
+        # In-memory databases (the test runner's) have no journal file to switch
+        pragmas.pop('journal_mode', None)
+        pragmas.pop('mmap_size', None)
+    with connection.cursor() as cursor:
+        apply_sqlite_pragmas(cursor, pragmas)
@@ -0,0 +1,80 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Read/write splitting for heavy read-only views (reports, summaries, exports).
+#
+# Views opt in with ``replica_reads``; everything else, and every write, keeps
+# using the default database. Once a request has written, its later reads go
+# to the default database too (read-your-writes), and
+# ``ReplicaStickinessMiddleware`` keeps the client there for
+# REPLICA_STICKY_SECONDS so the replica has time to catch up.
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+_pinned = contextvars.ContextVar('pinned_to_primary', default=False)
+
+STICKY_COOKIE = 'db_pinned'
+
+
+def get_replica_alias():
+    """The configured replica alias, or ``None`` when no replica is set up."""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def replica_reads():
+    """Send reads made inside the block (or decorated function) to the replica."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and not _pinned.get():
+            return get_replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the default database and is never migrated itself
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Scope the router's state to one request. A request that writes sets a
+    short-lived cookie, and requests carrying it read from the default database.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sticky = request.COOKIES.get(STICKY_COOKIE) == '1'
+        pinned_token = _pinned.set(sticky)
+        replica_token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+            if _pinned.get() and not sticky and get_replica_alias():
+                response.set_cookie(
+                    STICKY_COOKIE, '1',
+                    max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 10),
+                    httponly=True, samesite='Lax',
+                )
+            return response
+        finally:
+            _use_replica.reset(replica_token)
+            _pinned.reset(pinned_token)
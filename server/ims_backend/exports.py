@@ -0,0 +1,106 @@
+import csv
+import json
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import FileResponse, StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+try:
+    from openpyxl import Workbook
+except Exception:
+    Workbook = None
+
+# Streaming CSV/XLSX exports shared by the student, employee and finance apps.
+# Rows are read with QuerySet.iterator() (a server-side cursor on PostgreSQL,
+# chunked fetches elsewhere), so memory use does not grow with the export size.
+EXPORT_FORMATS = ('csv', 'xlsx')
+CHUNK_SIZE = 2000
+# Spreadsheet apps evaluate text starting with these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """File-like object whose ``write`` hands the line back to the csv writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if isinstance(value, str):
+        # Stored text such as a name of "=HYPERLINK(...)" must stay text when opened
+        return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def select_columns(request, available, default):
+    """Resolve ``?columns=a,b`` against the ``available`` label -> field mapping."""
+    requested = request.query_params.get('columns')
+    if not requested:
+        return list(default)
+    columns = [column.strip() for column in requested.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise ValidationError({'columns': f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(available)}"})
+    return columns
+
+
+def iter_rows(queryset, fields):
+    for row in queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        yield [_cell(value) for value in row]
+
+
+def stream_csv(queryset, columns, available):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in iter_rows(queryset, [available[column] for column in columns]):
+        yield writer.writerow(row)
+
+
+def write_xlsx(queryset, columns, available):
+    """Write the rows to a temporary XLSX file; openpyxl's write-only mode keeps memory flat."""
+    if Workbook is None:
+        raise ValidationError({'file_format': 'openpyxl package is not installed, XLSX export is unavailable.'})
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    for row in iter_rows(queryset, [available[column] for column in columns]):
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def export_response(request, queryset, available, default, filename):
+    """
+    Build a download of ``queryset`` in the ``?file_format=`` requested (CSV by
+    default) with the ``?columns=`` selected from ``available``.
+    """
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        raise ValidationError({'file_format': f"Must be one of: {', '.join(EXPORT_FORMATS)}"})
+    columns = select_columns(request, available, default)
+    # Resolve the database now: CSV rows are read after the view has returned,
+    # outside any replica_reads() block the view ran in
+    queryset = queryset.using(queryset.db)
+
+    if file_format == 'xlsx':
+        return FileResponse(
+            write_xlsx(queryset, columns, available),
+            as_attachment=True,
+            filename=f'{filename}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    response = StreamingHttpResponse(stream_csv(queryset, columns, available), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from ims_backend.db_router import get_replica_alias
+
+
+class Command(BaseCommand):
+    help = 'Copy the default SQLite database to the replica file with the online backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='Keep refreshing every N seconds (default: copy once)')
+
+    def get_paths(self):
+        alias = get_replica_alias()
+        if alias is None:
+            raise CommandError('No replica database is configured (set DB_REPLICA_NAME).')
+        source, target = settings.DATABASES[DEFAULT_DB_ALIAS], settings.DATABASES[alias]
+        for database in (source, target):
+            if database['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('refresh_sqlite_replica only copies between SQLite databases.')
+        return str(source['NAME']), str(target['NAME'])
+
+    def refresh(self, source_path, target_path):
+        # Copy into a temporary file and rename it over the replica, so readers
+        # only ever open a complete snapshot
+        part = f'{target_path}.part'
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(part)
+        try:
+            source.backup(target)
+            # Replica connections are read-only and must not create WAL files
+            # next to a file that gets replaced underneath them
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+            source.close()
+        os.replace(part, target_path)
+
+    def handle(self, *args, **options):
+        source_path, target_path = self.get_paths()
+        while True:
+            started = time.monotonic()
+            self.refresh(source_path, target_path)
+            self.stdout.write(self.style.SUCCESS(f'Refreshed {target_path} in {time.monotonic() - started:.2f}s.'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from Employee.models import Employee
+from finance.models import Transaction
+from ims_backend import seeding
+from settings.models import ActivityLog, Notification
+from student.models import Student
+
+
+def _next_index(model):
+    # Seeded unique fields are numbered from the highest existing id, so a
+    # second run adds rows instead of colliding with the first
+    return model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic students, employees, transactions, activity logs and notifications for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--employees', type=int, default=300)
+        parser.add_argument('--transactions', type=int, default=50000)
+        parser.add_argument('--activity-logs', type=int, default=100000)
+        parser.add_argument('--notifications', type=int, default=20000)
+        parser.add_argument('--users', type=int, default=20, help='Users the activity logs and notifications are spread over')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable data sets')
+
+    def get_users(self, count):
+        """The staff user ``benchmark`` (API token only) plus ``count - 1`` regular users."""
+        users = []
+        for index in range(count):
+            username = f'benchmark{index}' if index else 'benchmark'
+            user, created = User.objects.get_or_create(
+                username=username, defaults={'email': f'{username}@example.com', 'is_staff': not index},
+            )
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+            users.append(user)
+        token, _ = Token.objects.get_or_create(user=users[0])
+        return users, token
+
+    def handle(self, *args, **options):
+        for name in ('students', 'employees', 'transactions', 'activity_logs', 'notifications'):
+            if options[name] < 0:
+                raise CommandError(f"--{name.replace('_', '-')} must not be negative")
+        for name in ('users', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1")
+
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        users, token = self.get_users(options['users'])
+
+        steps = [
+            ('students', Student, lambda count, start: seeding.seed_students(count, start, rng, batch_size)),
+            ('employees', Employee, lambda count, start: seeding.seed_employees(count, start, rng, batch_size)),
+            ('transactions', Transaction, lambda count, start: seeding.seed_transactions(count, start, rng, batch_size)),
+            ('activity_logs', ActivityLog, lambda count, start: seeding.seed_activity_logs(count, users, start, rng, batch_size)),
+            ('notifications', Notification, lambda count, start: seeding.seed_notifications(count, users, start, rng, batch_size)),
+        ]
+        for name, model, seed in steps:
+            count = options[name]
+            if not count:
+                continue
+            started = time.monotonic()
+            seed(count, _next_index(model))
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"Created {count} {name.replace('_', ' ')} in {elapsed:.2f}s ({count / max(elapsed, 1e-6):.0f} rows/s).")
+
+        self.stdout.write(self.style.SUCCESS(f'Done. Staff user "benchmark" has API token {token.key}'))
+        # Rows were bulk inserted, so running servers only see them once their
+        # in-process caches expire
+        self.stdout.write('Restart running servers to drop cached departments and dashboard snapshots.')
@@ -0,0 +1,227 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Opt-in request profiling (PROFILING['ENABLED']).
+#
+# ``ProfilingMiddleware`` times every request and the SQL it runs on each
+# database alias, plus the time spent rendering DRF responses, and feeds the
+# figures to the process-wide ``recorder``. The recorder keeps the last
+# PROFILING['SAMPLE_SIZE'] requests of each route (method plus URL pattern)
+# for percentiles, and running totals for the Prometheus counters. Figures are
+# per worker process, like the dashboard summary snapshot.
+slow_logger = logging.getLogger('ims_backend.slow_requests')
+
+DEFAULT_PROFILING = {
+    'ENABLED': False,
+    'SAMPLE_SIZE': 1000,
+    'SLOW_REQUEST_MS': 500,
+    'MAX_LOGGED_QUERIES': 50,
+    'SLOW_LOG_FILE': None,
+}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (sample field, JSON key, Prometheus metric, Prometheus scale, help text)
+METRICS = (
+    ('duration', 'duration_ms', 'ims_request_duration_seconds', 0.001, 'Request duration.'),
+    ('queries', 'queries', 'ims_request_queries', 1, 'Database queries per request.'),
+    ('sql', 'sql_ms', 'ims_request_sql_seconds', 0.001, 'Time spent in SQL per request.'),
+    ('serialize', 'serialize_ms', 'ims_request_serialize_seconds', 0.001, 'Time spent rendering the response body.'),
+    ('size', 'response_bytes', 'ims_response_size_bytes', 1, 'Response body size.'),
+)
+
+
+def get_profiling_config():
+    return {**DEFAULT_PROFILING, **getattr(settings, 'PROFILING', {})}
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class RouteStats:
+    """Rolling window of samples for one route, plus totals since start-up."""
+
+    def __init__(self, sample_size):
+        self.samples = deque(maxlen=sample_size)
+        self.count = 0
+        self.totals = {field: 0 for field, *_ in METRICS}
+        self.slowest_query = None
+
+    def add(self, sample, slowest_query):
+        self.samples.append(sample)
+        self.count += 1
+        for field in self.totals:
+            self.totals[field] += sample[field]
+        if slowest_query and (self.slowest_query is None or slowest_query['ms'] > self.slowest_query['ms']):
+            self.slowest_query = slowest_query
+
+    def summary(self):
+        summary = {'count': self.count, 'window': len(self.samples)}
+        for field, key, *_ in METRICS:
+            ordered = sorted(sample[field] for sample in self.samples)
+            summary[key] = {
+                **{f'p{round(q * 100)}': round(percentile(ordered, q), 2) for q in QUANTILES},
+                'max': round(ordered[-1], 2) if ordered else 0,
+            }
+        summary['slowest_query'] = self.slowest_query
+        return summary
+
+
+class ProfileRecorder:
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, method, route, sample, slowest_query=None):
+        key = (method, route)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats(get_profiling_config()['SAMPLE_SIZE'])
+            stats.add(sample, slowest_query)
+
+    def snapshot(self):
+        """Per-route summaries, slowest p95 first."""
+        with self._lock:
+            routes = [
+                {'method': method, 'route': route, **stats.summary()}
+                for (method, route), stats in self._routes.items()
+            ]
+        routes.sort(key=lambda item: item['duration_ms']['p95'], reverse=True)
+        return routes
+
+    def prometheus(self):
+        """The snapshot in the Prometheus text exposition format (summaries)."""
+        with self._lock:
+            items = [
+                (method, route, stats.summary(), dict(stats.totals), stats.count)
+                for (method, route), stats in self._routes.items()
+            ]
+        lines = []
+        for field, key, metric, scale, help_text in METRICS:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} summary')
+            for method, route, summary, totals, count in items:
+                labels = f'method="{_escape_label(method)}",route="{_escape_label(route)}"'
+                for q in QUANTILES:
+                    value = summary[key][f'p{round(q * 100)}'] * scale
+                    lines.append(f'{metric}{{{labels},quantile="{q}"}} {value:g}')
+                lines.append(f'{metric}_sum{{{labels}}} {totals[field] * scale:g}')
+                lines.append(f'{metric}_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+recorder = ProfileRecorder()
+
+
+class QueryTimer:
+    """``execute_wrapper`` callable counting and timing the queries of one request."""
+
+    def __init__(self, max_logged):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = None
+        self.logged = []
+        self.max_logged = max_logged
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total += elapsed
+            alias = context['connection'].alias
+            if self.slowest is None or elapsed > self.slowest['ms']:
+                self.slowest = {'sql': sql, 'ms': round(elapsed, 2), 'alias': alias}
+            if len(self.logged) < self.max_logged:
+                self.logged.append((alias, elapsed, sql))
+
+
+class ProfilingMiddleware:
+    """
+    Record query count, SQL time, the slowest query, render time and response
+    size for each request (see ``recorder``), and log requests slower than
+    PROFILING['SLOW_REQUEST_MS'] with their SQL to ``ims_backend.slow_requests``.
+    Removed from the stack unless PROFILING['ENABLED'] is set.
+    """
+
+    def __init__(self, get_response):
+        config = get_profiling_config()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        if config['SLOW_LOG_FILE']:
+            # The log handler opens its file lazily; make sure it has somewhere to go
+            Path(config['SLOW_LOG_FILE']).parent.mkdir(parents=True, exist_ok=True)
+        self.get_response = get_response
+        self.slow_ms = config['SLOW_REQUEST_MS']
+        self.max_logged = config['MAX_LOGGED_QUERIES']
+
+    def __call__(self, request):
+        timer = QueryTimer(self.max_logged)
+        request._profile_render = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        route = match.route if match else '<unmatched>'
+        sample = {
+            'duration': duration,
+            'queries': timer.count,
+            'sql': timer.total,
+            'serialize': request._profile_render,
+            # Streaming bodies (CSV/XLSX exports) are produced after this point
+            'size': 0 if response.streaming else len(response.content),
+        }
+        recorder.record(request.method, route, sample, timer.slowest)
+        if duration >= self.slow_ms:
+            self.log_slow_request(request, response, sample, timer)
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs just before DRF renders the response; the callback runs just after
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._profile_render += (time.perf_counter() - started) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, response, sample, timer):
+        lines = [
+            f'{request.method} {request.get_full_path()} {response.status_code} '
+            f'{sample["duration"]:.1f}ms queries={sample["queries"]} sql={sample["sql"]:.1f}ms '
+            f'serialize={sample["serialize"]:.1f}ms bytes={sample["size"]}'
+        ]
+        lines += [f'  [{alias}] {elapsed:.1f}ms {sql}' for alias, elapsed, sql in timer.logged]
+        if timer.count > len(timer.logged):
+            lines.append(f'  ... {timer.count - len(timer.logged)} more queries')
+        slow_logger.warning('\n'.join(lines))
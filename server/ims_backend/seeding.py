@@ -0,0 +1,195 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from Employee.models import Department, Employee
+from Employee.signals import EMPLOYEES_VERSION
+from finance.models import Transaction
+from finance.signals import TRANSACTIONS_VERSION
+from settings.models import ActivityLog, Notification
+from settings.versioning import record_change
+from student.models import Student
+from student.signals import STUDENTS_VERSION
+
+# Synthetic data for the query budget tests and the load benchmarks.
+#
+# Rows are built in memory and written with bulk_create, so model save()
+# methods and post_save signals do not run; the ``seed_*`` functions stamp the
+# new rows into their collection's change feed afterwards, and the caller is
+# responsible for clearing in-process caches (departments, dashboard summary).
+# ``start`` offsets the unique fields so repeated runs add rows instead of
+# colliding with earlier ones.
+FIRST_NAMES = ['Aline', 'Eric', 'Grace', 'Jean', 'Diane', 'Patrick', 'Claudine', 'Olivier', 'Sandrine', 'Emmanuel', 'Yvonne', 'David']
+LAST_NAMES = ['Uwase', 'Habimana', 'Mukamana', 'Niyonzima', 'Ingabire', 'Mugisha', 'Uwimana', 'Nshimiyimana', 'Iradukunda', 'Kamanzi']
+COURSES = {
+    'IoT Development': ['Embedded C', 'Sensors', 'Networking', 'Arduino Projects'],
+    'Software Development': ['Python', 'Django', 'React', 'Databases'],
+    'Data Science': ['Statistics', 'Pandas', 'Machine Learning', 'Visualization'],
+}
+GRADES = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C']
+MONTHS = ['2024-01', '2024-02', '2024-03', '2024-04', '2024-05', '2024-06']
+POSITIONS = {
+    'academic': ['Instructor', 'Senior Instructor', 'Lab Assistant'],
+    'catering': ['Chef', 'Kitchen Assistant'],
+    'finance': ['Accountant', 'Cashier'],
+    'discipline_welfare': ['Counselor', 'Welfare Officer'],
+}
+INCOME_CATEGORIES = ['Salary', 'Education', 'Other']
+EXPENSE_CATEGORIES = ['Rent', 'Utilities', 'Groceries', 'Transportation', 'Entertainment', 'Healthcare', 'Other']
+METHODS = ['Bank Transfer', 'Mobile Money', 'Cash', 'School Payment']
+
+
+def _name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def build_student(index, rng):
+    program = rng.choice(list(COURSES))
+    courses = rng.sample(COURSES[program], 3)
+    present, absent, late = rng.randint(40, 110), rng.randint(0, 15), rng.randint(0, 10)
+    total_fees = Decimal(rng.choice([600, 900, 1200]))
+    paid = Decimal(rng.randrange(0, int(total_fees) + 1, 50))
+    return Student(
+        name=_name(rng),
+        email=f'student{index}@example.com',
+        phone=f'078{index:07d}'[-10:],
+        program=program,
+        year=rng.choice(['2023', '2024', '2025']),
+        status=rng.choices(['Active', 'Inactive', 'On Leave', 'Pending'], weights=[80, 8, 7, 5])[0],
+        address='KG 11 Ave, Kigali',
+        emergencyContact=f'{_name(rng)} 0788000000',
+        gpa=Decimal(rng.randint(200, 400)) / 100,
+        enrollmentDate=date(2023, 1, 9) + timedelta(days=rng.randint(0, 700)),
+        courses=courses,
+        idNumber=f'STU{index:07d}',
+        studentType=rng.choice(['Internee', 'Trainee']),
+        paymentStatus='Paid' if paid == total_fees else ('Pending' if not paid else 'Partial'),
+        totalFees=total_fees,
+        paidAmount=paid,
+        remainingAmount=total_fees - paid,
+        enrollmentType=rng.choice(['Full-time', 'Part-time']),
+        performance=rng.choice(['Excellent', 'Good', 'Average', 'Poor']),
+        cumulative_gpa=Decimal(rng.randint(200, 400)) / 100,
+        completed_credits=rng.randint(0, 60),
+        grades={course: rng.choice(GRADES) for course in courses},
+        assignments={'completed': rng.randint(5, 15), 'total': 15, 'averageScore': round(rng.uniform(55, 98), 1)},
+        achievements=[{'title': 'Hackathon finalist', 'date': '2024-05-01', 'points': 50}] if rng.random() < 0.3 else [],
+        projects=[{'name': f'{course} capstone', 'status': rng.choice(['completed', 'in progress'])} for course in courses[:2]],
+        extracurricular=[{'activity': rng.choice(['Robotics club', 'Debate', 'Football']), 'role': 'Member'}],
+        totalPoints=rng.randint(0, 500),
+        totalProjects=2,
+        certifications=rng.randint(0, 3),
+        overallAttendance=int(present / (present + absent + late) * 100),
+        presentDays=present,
+        absentDays=absent,
+        lateDays=late,
+        currentStreak=rng.randint(0, 20),
+        lastAttendance=date(2024, 6, 28),
+        monthlyData={
+            month: {'present': rng.randint(15, 22), 'absent': rng.randint(0, 3), 'late': rng.randint(0, 2), 'excused': 0}
+            for month in MONTHS
+        },
+        feedback=[{'author': 'Mentor', 'comment': 'Consistent progress on projects.', 'rating': rng.randint(3, 5)}],
+    )
+
+
+def build_employee(index, departments, rng):
+    department = rng.choice(departments)
+    return Employee(
+        employeeId=f'EMP{index:03d}',
+        idNumber=f'1199{index:012d}',
+        name=_name(rng),
+        email=f'employee{index}@example.com',
+        phone=f'072{index:07d}'[-10:],
+        position=rng.choice(POSITIONS.get(department.name, ['Officer'])),
+        department=department,
+        salary=Decimal(rng.randrange(250000, 1500000, 5000)),
+        address='KN 5 Rd, Kigali',
+        status=rng.choices(['active', 'on_leave', 'resigned'], weights=[90, 7, 3])[0],
+    )
+
+
+def build_transaction(index, rng):
+    income = rng.random() < 0.4
+    category = rng.choice(INCOME_CATEGORIES if income else EXPENSE_CATEGORIES)
+    return Transaction(
+        type='Income' if income else 'Expense',
+        status=rng.choices(['Completed', 'Pending', 'Failed'], weights=[85, 12, 3])[0],
+        category=category,
+        description=f'{category} {"receipt" if income else "payment"} #{index}',
+        amount=Decimal(rng.randrange(1000, 500000)) / 100,
+        date=date(2024, 1, 1) + timedelta(days=rng.randint(0, 364)),
+        method=rng.choice(METHODS),
+    )
+
+
+def build_activity_log(index, users, rng):
+    activity_type = rng.choice(['create', 'update', 'delete', 'restore'])
+    item_type = rng.choice(['student', 'employee', 'transaction'])
+    return ActivityLog(
+        user=rng.choice(users) if users else None,
+        activity_type=activity_type,
+        description=f'{activity_type.title()}d {item_type} #{index}',
+        item_type=item_type,
+        item_id=str(rng.randint(1, 5000)),
+        metadata={'source': 'seed', 'index': index},
+        ip_address='127.0.0.1',
+        user_agent='seed_benchmark_data',
+    )
+
+
+def build_notification(index, users, rng):
+    return Notification(
+        user=rng.choice(users),
+        title=f'Reminder #{index}',
+        message='Attendance for this week has not been submitted yet.',
+        read=rng.random() < 0.6,
+    )
+
+
+def _indexes(start, count):
+    # 1-based, so the first seeded employee is EMP001 like one created through the API
+    return range(start + 1, start + count + 1)
+
+
+def _bulk_create(model, objects, batch_size):
+    with transaction.atomic():
+        return model.objects.bulk_create(objects, batch_size=batch_size)
+
+
+def seed_departments():
+    return [Department.objects.get_or_create(name=name)[0] for name, _ in Department.DEPARTMENT_CHOICES]
+
+
+def seed_students(count, start=0, rng=None, batch_size=500):
+    rng = rng or random.Random(0)
+    created = _bulk_create(Student, [build_student(index, rng) for index in _indexes(start, count)], batch_size)
+    record_change(STUDENTS_VERSION, Student.objects.filter(change_seq=0))
+    return created
+
+
+def seed_employees(count, start=0, rng=None, batch_size=500):
+    rng = rng or random.Random(0)
+    departments = seed_departments()
+    created = _bulk_create(Employee, [build_employee(index, departments, rng) for index in _indexes(start, count)], batch_size)
+    record_change(EMPLOYEES_VERSION, Employee.objects.filter(change_seq=0))
+    return created
+
+
+def seed_transactions(count, start=0, rng=None, batch_size=500):
+    rng = rng or random.Random(0)
+    created = _bulk_create(Transaction, [build_transaction(index, rng) for index in _indexes(start, count)], batch_size)
+    record_change(TRANSACTIONS_VERSION, Transaction.objects.filter(change_seq=0))
+    return created
+
+
+def seed_activity_logs(count, users, start=0, rng=None, batch_size=500):
+    rng = rng or random.Random(0)
+    return _bulk_create(ActivityLog, [build_activity_log(index, users, rng) for index in _indexes(start, count)], batch_size)
+
+
+def seed_notifications(count, users, start=0, rng=None, batch_size=500):
+    rng = rng or random.Random(0)
+    return _bulk_create(Notification, [build_notification(index, users, rng) for index in _indexes(start, count)], batch_size)
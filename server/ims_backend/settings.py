@@ -11,8 +11,11 @@ For the full list of settings and their values, see
 """
 
 from pathlib import Path
+import importlib.util
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Load environment variables from .env file if available
 try:
     from dotenv import load_dotenv
@@ -54,11 +57,14 @@ INSTALLED_APPS = [
     'finance',
     'student',
     'settings',
-    'dashboard'
+    'dashboard',
+    'ims_backend',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'ims_backend.profiling.ProfilingMiddleware',
+    'ims_backend.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +72,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'ims_backend.db_router.ReplicaStickinessMiddleware',
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -93,12 +100,87 @@ WSGI_APPLICATION = 'ims_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# Selected with DB_ENGINE=sqlite (default) or DB_ENGINE=postgresql plus
+# DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT. Connections are kept for
+# DB_CONN_MAX_AGE seconds and checked before reuse. On PostgreSQL,
+# DB_POOL=true uses psycopg's connection pool instead (DB_POOL_MIN_SIZE,
+# DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT); the pool replaces persistent connections.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DB_POOL = os.environ.get('DB_POOL', 'false').lower() == 'true'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'ims'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+            'OPTIONS': {},
+        }
+    }
+    if DB_POOL:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+            'OPTIONS': {
+                # Take the write lock when a transaction starts instead of on its first write
+                'transaction_mode': 'IMMEDIATE',
+                # Seconds to wait for a lock; keep in line with PRAGMA busy_timeout
+                'timeout': 20,
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported DB_ENGINE {DB_ENGINE!r}; use 'sqlite' or 'postgresql'.")
+
+# Optional read replica for the report, summary and export views (see
+# ims_backend.db_router). On PostgreSQL set DB_REPLICA_HOST (and optionally
+# DB_REPLICA_PORT/DB_REPLICA_NAME); on SQLite set DB_REPLICA_NAME to a
+# snapshot file refreshed with `manage.py refresh_sqlite_replica --interval 60`.
+if DB_ENGINE == 'sqlite' and os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ['DB_REPLICA_NAME'],
+        # Reconnect per request so a refreshed snapshot is picked up
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {'timeout': 20},
+        # The snapshot is replaced wholesale, so keep it out of WAL mode and read-only
+        'SQLITE_PRAGMAS': {'journal_mode': None, 'query_only': 'ON'},
+        'TEST': {'MIRROR': 'default'},
     }
-}
+elif DB_ENGINE != 'sqlite' and os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['ims_backend.db_router.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+
+# Seconds a client that just wrote keeps reading from the default database.
+REPLICA_STICKY_SECONDS = 10
+
+# Per-connection SQLite pragmas, overriding ims_backend.db.DEFAULT_SQLITE_PRAGMAS
+# (WAL, synchronous=NORMAL, busy_timeout, mmap_size, cache_size). Set a pragma
+# to None to leave SQLite's default.
+SQLITE_PRAGMAS = {}
 
 
 # Password validation
@@ -144,18 +226,131 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Cache
+# Process-local by default; set REDIS_URL to share cached tokens and settings
+# between worker processes.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a resolved API token stays cached by CachedTokenAuthentication.
+AUTH_TOKEN_CACHE_TTL = 60
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'settings.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
-    ]
+    ],
+    # JSON goes through orjson (see ims_backend.renderers); clients may ask
+    # for MessagePack with `Accept: application/msgpack` when msgpack is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'ims_backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'ims_backend.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+if importlib.util.find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('ims_backend.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('ims_backend.renderers.MessagePackParser')
+
 # Gemini (Google) generative AI configuration - do NOT hardcode secrets here.
 # Set the environment variable `GEMINI_API_KEY` on the host or in your deployment.
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 # Default model name (can be overridden via env)
 # Using gemini-2.5-flash which is the recommended model for most use cases
 GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
+
+# Activity log entries are buffered and written in batches off the request path.
+# Set ENABLED to False to write each entry synchronously (e.g. in tests).
+ACTIVITY_LOG_BUFFER = {
+    'ENABLED': os.environ.get('ACTIVITY_LOG_BUFFER_ENABLED', 'true').lower() == 'true',
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_QUEUE_SIZE': 5000,
+}
+
+# Activity log entries older than the retention period are moved to compressed
+# daily archive files by `manage.py archive_activity_logs`.
+ACTIVITY_LOG_RETENTION_DAYS = int(os.environ.get('ACTIVITY_LOG_RETENTION_DAYS', 90))
+ACTIVITY_LOG_ARCHIVE_DIR = BASE_DIR / 'archive' / 'activity_logs'
+
+# Seconds before the in-process dashboard snapshot is reloaded from the database.
+DASHBOARD_SUMMARY_TTL = 60
+
+# Responses are brotli/gzip compressed from this many bytes (see ims_backend.compression).
+COMPRESSION_MIN_LENGTH = 500
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Seconds between keep-alive comments on idle Server-Sent Events connections.
+SSE_HEARTBEAT_INTERVAL = 15
+
+# Seconds a user's settings stay in the cache; PATCH writes through immediately.
+USER_SETTINGS_CACHE_TTL = 300
+
+# Trash bin items older than this are removed by `manage.py purge_trash`.
+TRASH_RETENTION_DAYS = int(os.environ.get('TRASH_RETENTION_DAYS', 30))
+
+# Background PDF report jobs are rendered here and removed after REPORT_JOB_TTL seconds.
+REPORT_JOB_DIR = BASE_DIR / 'archive' / 'report_jobs'
+REPORT_JOB_TTL = 24 * 60 * 60
+
+# Rendered report PDFs are cached here by content key; least recently used
+# files are evicted past REPORT_CACHE_MAX_BYTES (0 disables the cache).
+REPORT_CACHE_DIR = BASE_DIR / 'archive' / 'report_cache'
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+
+# Opt-in request profiling (see ims_backend.profiling): per-route percentiles
+# of latency, query count, SQL and render time and response size, served to
+# staff at /api/settings/profiling/ and /api/settings/profiling/metrics/
+# (Prometheus). Requests slower than SLOW_REQUEST_MS are written with their
+# SQL to SLOW_LOG_FILE.
+PROFILING = {
+    'ENABLED': os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true',
+    # Requests per route kept for the percentiles
+    'SAMPLE_SIZE': 1000,
+    'SLOW_REQUEST_MS': int(os.environ.get('PROFILING_SLOW_REQUEST_MS', 500)),
+    'MAX_LOGGED_QUERIES': 50,
+    'SLOW_LOG_FILE': BASE_DIR / 'archive' / 'slow_requests.log',
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'timestamped': {'format': '%(asctime)s %(message)s'},
+    },
+    'handlers': {
+        'slow_requests': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'formatter': 'timestamped',
+            'filename': PROFILING['SLOW_LOG_FILE'],
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'ims_backend.slow_requests': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
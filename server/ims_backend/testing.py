@@ -0,0 +1,162 @@
+import os
+import random
+import re
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from Employee import cache as department_cache
+from dashboard import summary
+from student.models import Student
+from . import seeding
+
+# Query and response-time budgets for the API.
+#
+# Each app's tests.py subclasses QueryBudgetTestCase and calls assertBudget()
+# for its routes against a realistically sized data set, so a view that starts
+# issuing a query per row fails instead of slowing down in production.
+# Budgets are upper bounds taken from the current implementation; lower them
+# when a view gets cheaper. A failure prints the request's SQL one statement
+# per line with literals masked, so two runs can be compared with diff. Set
+# QUERY_BUDGET_LOG_DIR to also write every checked request's SQL to
+# <dir>/<test id>.sql, and QUERY_BUDGET_TIME_SCALE to stretch the time
+# budgets on slow machines.
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+DEFAULT_TIME_BUDGET_MS = 500
+
+
+class FakeTransactionClassifier:
+    def classify_transaction(self, transaction_data, max_retries=1):
+        transaction_type = 'Income' if transaction_data.get('category') in ('Salary', 'Education') else 'Expense'
+        return {'type': transaction_type, 'status': 'Completed'}
+
+
+class FakeStudentEvaluator:
+    model_name = 'models/stub'
+
+    def generate_evaluation(self, student, max_retries=1):
+        return {
+            'generated_at': '2024-01-01T00:00:00+00:00',
+            'model': self.model_name,
+            'result': {'summary': f'{student.name} is making steady progress.', 'strengths': [], 'recommendations': []},
+            'raw_text': '{}',
+        }
+
+
+def format_queries(queries):
+    """One masked SQL statement per line, numbered, for diffing between runs."""
+    return '\n'.join(
+        f'{number:03d} [{alias}] {LITERALS.sub("?", query["sql"])}'
+        for number, (alias, query) in enumerate(queries, 1)
+    )
+
+
+@override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False}, PROFILING={'ENABLED': False})
+class QueryBudgetTestCase(TestCase):
+    """
+    Seeds ``students``/``employees``/``transactions``/``activity_logs``/
+    ``notifications`` rows once per class and authenticates every request as
+    a staff user. Gemini is replaced by deterministic fakes, and the caches
+    are cleared before each test so budgets measure the cold path.
+    """
+    students = 150
+    employees = 60
+    transactions = 400
+    activity_logs = 300
+    notifications = 60
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(2024)
+        cls.user = User.objects.create_user('budget', email='budget@example.com', password='budget-pass', is_staff=True)
+        cls.other_users = [User.objects.create_user(f'staff{index}', password='budget-pass') for index in range(1, 6)]
+        cls.token = Token.objects.create(user=cls.user)
+        users = [cls.user, *cls.other_users]
+        seeding.seed_students(cls.students, rng=rng)
+        seeding.seed_employees(cls.employees, rng=rng)
+        seeding.seed_transactions(cls.transactions, rng=rng)
+        seeding.seed_activity_logs(cls.activity_logs, users, rng=rng)
+        seeding.seed_notifications(cls.notifications, [cls.user], rng=rng)
+        cls.student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+
+    def setUp(self):
+        cache.clear()
+        department_cache.invalidate()
+        summary.invalidate()
+        for target, fake in (
+            ('finance.views.TransactionAIClassifier', FakeTransactionClassifier),
+            ('student.ai_service.StudentAIEvaluator', FakeStudentEvaluator),
+        ):
+            patcher = mock.patch(target, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
+
+    def request(self, method, path, data=None, **extra):
+        """Send a request, reading streamed bodies so their queries are counted too."""
+        uploads = isinstance(data, dict) and any(hasattr(value, 'read') for value in data.values())
+        if method != 'get' and not uploads:
+            extra.setdefault('content_type', 'application/json')
+        response = getattr(self.client, method)(path, data, **extra)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+        return response
+
+    def assertBudget(self, method, path, queries, ms=DEFAULT_TIME_BUDGET_MS, status=200, data=None, commit=False, **extra):
+        """
+        Request ``path`` and check it answers with ``status`` in at most
+        ``queries`` queries and ``ms`` milliseconds. With ``commit``, the
+        on_commit callbacks the request queued run as a real commit would run
+        them, and their queries count too. Returns the response.
+        """
+        with ExitStack() as stack:
+            captures = [
+                (alias, stack.enter_context(CaptureQueriesContext(connections[alias])))
+                for alias in sorted(self.databases)
+            ]
+            if commit:
+                stack.enter_context(self.captureOnCommitCallbacks(execute=True))
+            started = time.perf_counter()
+            response = self.request(method, path, data, **extra)
+            elapsed = (time.perf_counter() - started) * 1000
+
+        executed = [(alias, query) for alias, capture in captures for query in capture.captured_queries]
+        label = f'{method.upper()} {path}'
+        log = format_queries(executed)
+        self._write_query_log(label, log)
+
+        self.assertEqual(
+            response.status_code, status,
+            f'{label} returned {response.status_code}: {getattr(response, "content", b"")[:500]!r}',
+        )
+        self.assertLessEqual(
+            len(executed), queries,
+            f'\n{label} ran {len(executed)} queries, budget is {queries}:\n{log}',
+        )
+        time_budget = ms * float(os.environ.get('QUERY_BUDGET_TIME_SCALE', 1))
+        self.assertLessEqual(
+            elapsed, time_budget,
+            f'\n{label} took {elapsed:.0f}ms, budget is {time_budget:.0f}ms ({len(executed)} queries):\n{log}',
+        )
+        return response
+
+    def _write_query_log(self, label, log):
+        log_dir = os.environ.get('QUERY_BUDGET_LOG_DIR')
+        if not log_dir:
+            return
+        path = Path(log_dir) / f'{self.id()}.sql'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The first request of a test starts the file afresh
+        mode = 'a' if getattr(self, '_query_log_started', False) else 'w'
+        self._query_log_started = True
+        with open(path, mode) as handle:
+            handle.write(f'-- {label}\n{log}\n\n')
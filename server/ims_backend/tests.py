@@ -0,0 +1,340 @@
+import contextvars
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+import zlib
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from . import compression, db_router, profiling, renderers, seeding
+from .db import get_sqlite_pragmas
+
+
+class SQLitePragmaTests(SimpleTestCase):
+    def connect(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        default = connections['default']
+        settings_dict = {**default.settings_dict, 'NAME': str(Path(directory.name) / 'pragmas.sqlite3'), **options}
+        connection = default.__class__(settings_dict, alias='pragmas')
+        self.addCleanup(connection.close)
+        return connection
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_file_databases_are_tuned(self):
+        connection = self.connect()
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 20000)
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)  # NORMAL
+
+    def test_none_keeps_sqlite_default(self):
+        connection = self.connect(SQLITE_PRAGMAS={'journal_mode': None})
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'delete')
+
+    def test_overrides(self):
+        with self.settings(SQLITE_PRAGMAS={'busy_timeout': 5000, 'temp_store': None}):
+            pragmas = get_sqlite_pragmas({'synchronous': 'FULL'})
+        self.assertEqual((pragmas['busy_timeout'], pragmas['synchronous']), (5000, 'FULL'))
+        self.assertNotIn('temp_store', pragmas)
+
+
+@mock.patch.object(db_router, 'get_replica_alias', return_value='replica')
+class ReplicaRouterTests(SimpleTestCase):
+    router = db_router.ReplicaRouter()
+
+    def run_isolated(self, function, *args):
+        # The router keeps its state in context variables, which writes made by
+        # other tests outside a request may have set; start clean and leave no trace
+        def run():
+            db_router._pinned.set(False)
+            db_router._use_replica.set(False)
+            return function(*args)
+        return contextvars.copy_context().run(run)
+
+    def test_reads_follow_the_block_until_a_write(self, get_replica_alias):
+        def route():
+            routes = [self.router.db_for_read(None)]
+            with db_router.replica_reads():
+                routes.append(self.router.db_for_read(None))
+                routes.append(self.router.db_for_write(None))
+                routes.append(self.router.db_for_read(None))
+            return routes
+
+        self.assertEqual(self.run_isolated(route), [None, 'replica', 'default', None])
+
+    def test_replica_is_never_migrated(self, get_replica_alias):
+        self.assertIs(self.router.allow_migrate('replica', 'student'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'student'))
+
+    def test_middleware_pins_clients_that_wrote(self, get_replica_alias):
+        def view(request):
+            with db_router.replica_reads():
+                if request.method == 'POST':
+                    self.router.db_for_write(None)
+                return HttpResponse(self.router.db_for_read(None) or 'default')
+
+        middleware = db_router.ReplicaStickinessMiddleware(view)
+        factory = RequestFactory()
+
+        response = self.run_isolated(middleware, factory.post('/'))
+        self.assertEqual(response.cookies[db_router.STICKY_COOKIE].value, '1')
+        read = self.run_isolated(middleware, factory.get('/'))
+        self.assertEqual(read.content, b'replica')
+        self.assertNotIn(db_router.STICKY_COOKIE, read.cookies)
+
+        pinned = factory.get('/')
+        pinned.COOKIES[db_router.STICKY_COOKIE] = '1'
+        self.assertEqual(self.run_isolated(middleware, pinned).content, b'default')
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def load(self, **environ):
+        """DATABASES as ims_backend.settings builds it from ``environ``."""
+        env = {key: value for key, value in os.environ.items() if not key.startswith('DB_')}
+        script = 'import json, ims_backend.settings as s; print(json.dumps(s.DATABASES, default=str))'
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, env={**env, **environ},
+            capture_output=True, text=True,
+        )
+        return result.returncode, json.loads(result.stdout) if result.returncode == 0 else result.stderr
+
+    def test_sqlite_default(self):
+        _, databases = self.load()
+        default = databases['default']
+        self.assertEqual(default['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual((default['CONN_MAX_AGE'], default['OPTIONS']['transaction_mode']), (60, 'IMMEDIATE'))
+        self.assertNotIn('replica', databases)
+
+    def test_postgresql_pool_and_replica(self):
+        _, databases = self.load(
+            DB_ENGINE='postgresql', DB_NAME='ims', DB_HOST='db.internal', DB_POOL='true', DB_POOL_MAX_SIZE='20',
+            DB_REPLICA_HOST='replica.internal',
+        )
+        default = databases['default']
+        self.assertEqual(default['ENGINE'], 'django.db.backends.postgresql')
+        # The pool replaces persistent connections
+        self.assertEqual(default['CONN_MAX_AGE'], 0)
+        self.assertEqual(default['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20, 'timeout': 10.0})
+        self.assertEqual((databases['replica']['HOST'], databases['replica']['NAME']), ('replica.internal', 'ims'))
+
+    def test_unknown_engine(self):
+        returncode, stderr = self.load(DB_ENGINE='oracle')
+        self.assertNotEqual(returncode, 0)
+        self.assertIn('Unsupported DB_ENGINE', stderr)
+
+
+class RendererTests(SimpleTestCase):
+    data = {
+        'amount': Decimal('12.50'),
+        'date': date(2024, 1, 2),
+        'created_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        'updated_at': datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+        'naive': datetime(2024, 1, 2, 3, 4, 5, 123456),
+        'time': time(3, 4, 5, 123456),
+        'id': uuid.UUID(int=1),
+        'label': gettext_lazy('Active'),
+        'text': 'line\u2028separator',
+        2024: ['non-string key'],
+        'big': 2 ** 70,
+    }
+
+    def test_orjson_matches_drf(self):
+        expected = json.loads(JSONRenderer().render(self.data))
+        rendered = renderers.ORJSONRenderer().render(self.data)
+        self.assertEqual(json.loads(rendered), expected)
+        self.assertIn(b'\\u2028', rendered)
+        self.assertEqual(renderers.ORJSONRenderer().render(None), b'')
+
+    def test_orjson_rejects_non_finite_floats(self):
+        for value in (float('nan'), float('inf')):
+            data = {'rows': [{'gpa': value}, {'note': None}]}
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(data)
+            with self.assertRaises(ValueError):
+                renderers.ORJSONRenderer().render(data)
+        self.assertEqual(renderers.ORJSONRenderer().render({'gpa': 3.5, 'note': None}), b'{"gpa":3.5,"note":null}')
+
+    def test_orjson_parser(self):
+        parser = renderers.ORJSONParser()
+        self.assertEqual(parser.parse(BytesIO(b'{"ids": [1, 2]}')), {'ids': [1, 2]})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"ids": [1, 2'))
+
+    def test_msgpack_round_trip(self):
+        data = {key: value for key, value in self.data.items() if key != 'big'}
+        packed = renderers.MessagePackRenderer().render(data)
+        unpacked = renderers.MessagePackParser().parse(BytesIO(packed))
+        # Types MessagePack lacks come out as they do in JSON
+        expected = json.loads(JSONRenderer().render(data))
+        for key in ('amount', 'date', 'created_at', 'id', 'label'):
+            self.assertEqual(unpacked[key], expected[key], key)
+        self.assertEqual(unpacked[2024], ['non-string key'])
+        with self.assertRaises(ParseError):
+            renderers.MessagePackParser().parse(BytesIO(packed + b'\x00'))
+
+
+class CompressionTests(SimpleTestCase):
+    def respond(self, response, accept_encoding='gzip, br'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return compression.CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def json_response(self, size=2000):
+        response = HttpResponse(b'{"rows": [%s]}' % b','.join([b'1'] * size), content_type='application/json')
+        response['ETag'] = '"v1"'
+        return response
+
+    def test_choose_encoding(self):
+        self.assertEqual(compression.choose_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(compression.choose_encoding('br;q=0.5, gzip'), 'gzip')
+        self.assertEqual(compression.choose_encoding('*'), 'br')
+        self.assertIsNone(compression.choose_encoding('gzip;q=0, identity'))
+        self.assertIsNone(compression.choose_encoding(''))
+
+    def test_gzip_weakens_etag_and_varies(self):
+        original = self.json_response().content
+        response = self.respond(self.json_response(), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(zlib.decompress(response.content, 31), original)
+
+    def test_uncompressed_responses_still_vary(self):
+        response = self.respond(self.json_response(), 'identity')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual((response['ETag'], response['Vary']), ('"v1"', 'Accept-Encoding'))
+
+    def test_skipped_responses(self):
+        small = self.respond(self.json_response(size=10))
+        pdf = self.respond(HttpResponse(b'%PDF' * 1000, content_type='application/pdf'))
+        events = StreamingHttpResponse(iter(['event: summary\ndata: {}\n\n']), content_type='text/event-stream')
+        for response in (small, pdf, self.respond(events)):
+            self.assertNotIn('Content-Encoding', response)
+            self.assertNotIn('Vary', response)
+
+    def test_streaming_responses(self):
+        rows = [f'{index},Student {index}\n'.encode() for index in range(1000)]
+        response = self.respond(StreamingHttpResponse(iter(rows), content_type='text/csv'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+        self.assertEqual(zlib.decompress(b''.join(response.streaming_content), 31), b''.join(rows))
+
+
+class CompressedRevalidationTests(TestCase):
+    def test_weak_etag_revalidates(self):
+        seeding.seed_students(3)
+        plain = self.client.get('/student/api/students/')
+        response = self.client.get('/student/api/students/', HTTP_ACCEPT_ENCODING='br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        self.assertLessEqual({'accept', 'accept-encoding'}, set(response['Vary'].lower().replace(' ', '').split(',')))
+
+        # Weak comparison: the compressed copy's ETag revalidates either representation
+        not_modified = self.client.get('/student/api/students/', HTTP_ACCEPT_ENCODING='br', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+
+class ProfileRecorderTests(SimpleTestCase):
+    def sample(self, duration, queries=1):
+        return {'duration': duration, 'queries': queries, 'sql': duration / 2, 'serialize': 1, 'size': 100}
+
+    def test_percentiles_over_the_window(self):
+        recorder = profiling.ProfileRecorder()
+        with self.settings(PROFILING={'SAMPLE_SIZE': 100}):
+            for duration in range(1, 201):
+                recorder.record('GET', 'slow/', self.sample(duration))
+            recorder.record('GET', 'fast/', self.sample(1), {'sql': 'SELECT 1', 'ms': 0.5, 'alias': 'default'})
+
+        slow, fast = recorder.snapshot()
+        self.assertEqual((slow['route'], slow['count'], slow['window']), ('slow/', 200, 100))
+        self.assertEqual(slow['duration_ms'], {'p50': 150, 'p95': 195, 'p99': 199, 'max': 200})
+        self.assertEqual(fast['slowest_query']['sql'], 'SELECT 1')
+        recorder.reset()
+        self.assertEqual(recorder.snapshot(), [])
+
+    def test_prometheus(self):
+        recorder = profiling.ProfileRecorder()
+        recorder.record('GET', 'a"b/', self.sample(20, queries=3))
+        recorder.record('GET', 'a"b/', self.sample(40, queries=5))
+        text = recorder.prometheus()
+        self.assertIn('# TYPE ims_request_duration_seconds summary', text)
+        self.assertIn('ims_request_duration_seconds{method="GET",route="a\\"b/",quantile="0.5"} 0.02\n', text)
+        self.assertIn('ims_request_duration_seconds_sum{method="GET",route="a\\"b/"} 0.06\n', text)
+        self.assertIn('ims_request_queries_count{method="GET",route="a\\"b/"} 2\n', text)
+
+
+@override_settings(PROFILING={'ENABLED': True, 'SLOW_REQUEST_MS': 60000, 'SLOW_LOG_FILE': None})
+class ProfilingMiddlewareTests(TestCase):
+    path = '/student/api/students/'
+
+    def setUp(self):
+        profiling.recorder.reset()
+        self.addCleanup(profiling.recorder.reset)
+        seeding.seed_students(3)
+        self.staff = User.objects.create_user('profiler', is_staff=True)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.staff).key}'
+
+    def routes(self):
+        return {(route['method'], route['route']): route for route in profiling.recorder.snapshot()}
+
+    def test_records_each_route(self):
+        self.client.get(self.path)
+        self.client.get(self.path)
+        stats = self.routes()[('GET', 'student/api/students/')]
+        self.assertEqual(stats['count'], 2)
+        self.assertGreater(stats['queries']['max'], 0)
+        self.assertGreater(stats['response_bytes']['p50'], 0)
+        self.assertIn('student_student', stats['slowest_query']['sql'])
+
+    def test_stats_endpoints(self):
+        self.client.get(self.path)
+        body = self.client.get('/api/settings/profiling/').json()
+        self.assertIs(body['enabled'], True)
+        self.assertIn('student/api/students/', {route['route'] for route in body['routes']})
+        metrics = self.client.get('/api/settings/profiling/metrics/')
+        self.assertTrue(metrics['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'route="student/api/students/"', metrics.content)
+
+        self.assertEqual(self.client.delete('/api/settings/profiling/').status_code, 204)
+        # Only the DELETE itself, recorded after it returned
+        self.assertEqual(list(self.routes()), [('DELETE', 'api/settings/profiling/')])
+
+        member = User.objects.create_user('profiled-member')
+        token = Token.objects.create(user=member)
+        response = self.client.get('/api/settings/profiling/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 403)
+
+    def test_slow_requests_are_logged_with_their_sql(self):
+        with self.settings(PROFILING={'ENABLED': True, 'SLOW_REQUEST_MS': 0, 'SLOW_LOG_FILE': None}):
+            self.client.handler.load_middleware()
+            with self.assertLogs('ims_backend.slow_requests', 'WARNING') as logs:
+                self.client.get(self.path)
+        message = logs.output[0]
+        self.assertIn(f'GET {self.path} 200', message)
+        self.assertIn('FROM "student_student"', message)
+
+    @override_settings(PROFILING={'ENABLED': False})
+    def test_disabled(self):
+        self.client.get(self.path)
+        self.assertEqual(profiling.recorder.snapshot(), [])
@@ -0,0 +1,189 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, transaction
+
+from .models import ActivityLog
+from .signals import activities_logged
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_CONFIG = {
+    'ENABLED': True,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_QUEUE_SIZE': 5000,
+}
+WRITE_ATTEMPTS = 3
+
+ACTIVITY_ICONS = {
+    'create': 'fas fa-plus text-green-600',
+    'update': 'fas fa-edit text-blue-600',
+    'delete': 'fas fa-trash text-red-600',
+    'restore': 'fas fa-undo text-yellow-600',
+    'login': 'fas fa-sign-in-alt text-green-600',
+    'logout': 'fas fa-sign-out-alt text-gray-600',
+    'other': 'fas fa-info-circle text-gray-600'
+}
+
+
+def get_activity_icon(activity_type):
+    return ACTIVITY_ICONS.get(activity_type, ACTIVITY_ICONS['other'])
+
+
+def get_buffer_config():
+    return {**DEFAULT_BUFFER_CONFIG, **getattr(settings, 'ACTIVITY_LOG_BUFFER', {})}
+
+
+def write_activities(entries):
+    """Insert ``entries`` with one ``bulk_create`` and notify ``activities_logged`` listeners."""
+    if not entries:
+        return []
+    config = get_buffer_config()
+    if len(entries) == 1:
+        entries[0].save()
+    else:
+        ActivityLog.objects.bulk_create(entries, batch_size=config['BATCH_SIZE'])
+    activities_logged.send(sender=ActivityLog, activities=entries)
+    return entries
+
+
+class ActivityLogWriter:
+    """
+    Collects activity entries in a bounded queue and writes them in batches from
+    a daemon thread. When the queue is full the entry is written synchronously
+    by the caller, so nothing is dropped under load.
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Worker processes forked after the first enqueue need their own thread
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            config = get_buffer_config()
+            self._queue = queue.Queue(maxsize=config['MAX_QUEUE_SIZE'])
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, entries):
+        self._ensure_started()
+        overflow = []
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                overflow.append(entry)
+        if overflow:
+            logger.warning('Activity log queue is full, writing %d entries synchronously', len(overflow))
+            write_activities(overflow)
+
+    def _next_batch(self, batch_size, flush_interval):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + flush_interval
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            config = get_buffer_config()
+            batch = self._next_batch(config['BATCH_SIZE'], config['FLUSH_INTERVAL'])
+            try:
+                self._write_with_retry(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_with_retry(self, batch):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            close_old_connections()
+            try:
+                write_activities(batch)
+                return
+            except OperationalError:
+                # Usually a locked database; back off and let the writer holding it finish
+                if attempt == WRITE_ATTEMPTS:
+                    logger.exception('Failed to write %d activity log entries', len(batch))
+                    return
+                time.sleep(0.1 * attempt)
+            except Exception:
+                logger.exception('Failed to write %d activity log entries', len(batch))
+                return
+
+    def flush(self):
+        """Write everything still queued from the calling thread."""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            write_activities(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+writer = ActivityLogWriter()
+atexit.register(writer.flush)
+
+
+def record_activities(entries):
+    """
+    Queue unsaved ``ActivityLog`` instances for writing once the current
+    transaction commits. Falls back to an immediate write when buffering is
+    disabled in ``ACTIVITY_LOG_BUFFER``.
+    """
+    entries = list(entries)
+    if not entries:
+        return entries
+    if not get_buffer_config()['ENABLED']:
+        return write_activities(entries)
+    transaction.on_commit(lambda: writer.enqueue(entries))
+    return entries
+
+
+def log_activity(user=None, activity_type='other', description='', item_type=None, item_id=None,
+                 metadata=None, ip_address=None, user_agent=None, sync=False):
+    """
+    Record a single activity entry. By default the entry is buffered and written
+    in the background; pass ``sync=True`` when the caller needs the saved row.
+    """
+    entry = ActivityLog(
+        user=user,
+        activity_type=activity_type,
+        description=description,
+        item_type=item_type,
+        item_id=item_id,
+        metadata=metadata if metadata is not None else {},
+        ip_address=ip_address,
+        user_agent=user_agent,
+    )
+    if sync:
+        write_activities([entry])
+    else:
+        record_activities([entry])
+    return entry
@@ -0,0 +1,49 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+
+def _token_key(key):
+    # Hash the token so raw credentials never end up in a shared cache
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def _user_key(user_id):
+    # Holds the user's hashed token key, so their entry can be evicted by user id
+    return f'auth-token-user:{user_id}'
+
+
+def invalidate_token(key):
+    cache.delete(_token_key(key))
+
+
+def invalidate_user(user_id):
+    token_key = cache.get(_user_key(user_id))
+    if token_key:
+        cache.delete_many([token_key, _user_key(user_id)])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF's ``TokenAuthentication`` that keeps the
+    resolved ``(user, token)`` pair in Django's cache for
+    ``AUTH_TOKEN_CACHE_TTL`` seconds instead of joining token and user on
+    every request. Token deletes and user saves evict the entry.
+
+    Queryset updates such as ``User.objects.filter(...).update(is_active=False)``
+    send no signals, so the cached user stays authenticated until the entry
+    expires; call ``invalidate_user()`` for each affected user after them.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = _token_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        ttl = getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60)
+        cache.set_many({cache_key: (user, token), _user_key(user.pk): cache_key}, ttl)
+        return user, token
@@ -0,0 +1,98 @@
+import copy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import UserSettings
+
+DEFAULT_SETTINGS = {
+    "notifications": {
+        "emailNotifications": True,
+        "pushNotifications": True,
+        "smsNotifications": False,
+        "marketingEmails": False,
+    },
+    "privacy": {
+        "profileVisibility": "public",
+        "dataSharing": False,
+        "analytics": True,
+    },
+    "appearance": {
+        "theme": "system",
+        "language": "en",
+        "timezone": "UTC",
+        "dateFormat": "MM/DD/YYYY",
+    },
+    "security": {
+        "twoFactorAuth": False,
+        "sessionTimeout": 30,
+        "passwordExpiry": 90,
+    },
+}
+
+
+def _key(user_id):
+    return f'user-settings:{user_id}'
+
+
+def _ttl():
+    return getattr(settings, 'USER_SETTINGS_CACHE_TTL', 300)
+
+
+def with_defaults(settings_data):
+    """Overlay stored settings on the defaults without persisting the result."""
+    merged = copy.deepcopy(DEFAULT_SETTINGS)
+    for section, values in (settings_data or {}).items():
+        if isinstance(values, dict) and isinstance(merged.get(section), dict):
+            merged[section].update(values)
+        else:
+            merged[section] = values
+    return merged
+
+
+def get_stored_settings(user_id):
+    """
+    Return the user's stored ``settings_data`` (``{}`` when no row exists yet),
+    reading the database only on a cache miss.
+    """
+    data = cache.get(_key(user_id))
+    if data is None:
+        data = UserSettings.objects.filter(user_id=user_id).values_list('settings_data', flat=True).first() or {}
+        cache.set(_key(user_id), data, _ttl())
+    return copy.deepcopy(data)
+
+
+def save_settings(user_id, settings_data):
+    """Write ``settings_data`` with a single upsert and refresh the cache with it."""
+    user_settings, _ = UserSettings.objects.update_or_create(user_id=user_id, defaults={'settings_data': settings_data})
+    _cache_on_commit(user_id, settings_data)
+    return user_settings
+
+
+def update_settings(user_id, update):
+    """
+    Apply ``update(settings_data)`` to the stored settings and save them.
+
+    Read-modify-write paths must not start from the cached copy: it is per
+    process, so it can miss a write made through another worker, and saving
+    it would put the older sections back. The row is read locked inside the
+    transaction instead. Returns the updated ``settings_data``.
+    """
+    with transaction.atomic(savepoint=False):
+        user_settings = UserSettings.objects.select_for_update().filter(user_id=user_id).first()
+        if user_settings is None:
+            user_settings = UserSettings(user_id=user_id, settings_data={})
+        update(user_settings.settings_data)
+        user_settings.save()
+        _cache_on_commit(user_id, user_settings.settings_data)
+    return user_settings.settings_data
+
+
+def _cache_on_commit(user_id, settings_data):
+    data = copy.deepcopy(settings_data)
+    transaction.on_commit(lambda: cache.set(_key(user_id), data, _ttl()))
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
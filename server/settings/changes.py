@@ -0,0 +1,91 @@
+import heapq
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Tombstone
+
+
+class ChangeFeedView(APIView):
+    """
+    ``?since=<cursor>`` change feed for a synced collection (see
+    ``settings.versioning.ChangeTrackingMixin``).
+
+    Changes come in ``(change_seq, id)`` order: ``upsert`` entries carry the
+    serialized row, ``delete`` entries stand for soft-deleted rows and
+    tombstones of purged ones. Without ``since`` the feed starts from scratch
+    and lists live rows only. Keep requesting with ``since=next_cursor`` while
+    ``has_more`` is true; later calls return only what changed in between.
+    """
+    model = None
+    serializer_class = None
+    version_name = None
+    soft_delete = True
+    default_limit = 500
+    max_limit = 2000
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def parse_cursor(self, value):
+        if not value:
+            return None
+        try:
+            seq, _, pk = value.partition('.')
+            return int(seq), int(pk or 0)
+        except ValueError:
+            raise ValidationError({'since': 'Invalid cursor.'})
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        return max(1, min(limit, self.max_limit))
+
+    def get(self, request):
+        position = self.parse_cursor(request.query_params.get('since'))
+        limit = self.get_limit(request)
+
+        rows = self.get_queryset()
+        tombstones = []
+        if position is None:
+            if self.soft_delete:
+                rows = rows.filter(is_deleted=False)
+        else:
+            seq, pk = position
+            rows = rows.filter(Q(change_seq__gt=seq) | Q(change_seq=seq, pk__gt=pk))
+            tombstones = (
+                Tombstone.objects.filter(collection=self.version_name)
+                .filter(Q(change_seq__gt=seq) | Q(change_seq=seq, object_id__gt=pk))
+                .order_by('change_seq', 'object_id')
+                .values_list('change_seq', 'object_id')[:limit + 1]
+            )
+        rows = rows.order_by('change_seq', 'pk')[:limit + 1]
+
+        changes = list(heapq.merge(
+            ((row.change_seq, row.pk, row) for row in rows),
+            ((seq, pk, None) for seq, pk in tombstones),
+            key=lambda change: change[:2],
+        ))
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        upserts = [row for _, _, row in changes if row is not None and not (self.soft_delete and row.is_deleted)]
+        data = iter(self.serializer_class(upserts, many=True).data)
+        results = []
+        for seq, pk, row in changes:
+            if row is None or (self.soft_delete and row.is_deleted):
+                results.append({'op': 'delete', 'id': pk, 'change_seq': seq})
+            else:
+                results.append({'op': 'upsert', 'id': pk, 'change_seq': seq, 'data': next(data)})
+
+        if changes:
+            next_cursor = f'{changes[-1][0]}.{changes[-1][1]}'
+        elif position is not None:
+            next_cursor = f'{position[0]}.{position[1]}'
+        else:
+            next_cursor = '0'
+        return Response({'changes': results, 'next_cursor': next_cursor, 'has_more': has_more})
@@ -0,0 +1,51 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .versioning import get_version_state
+
+# Conditional GET for collection endpoints, driven by the collection's data
+# version (see versioning.py) instead of the response body: a request whose
+# If-None-Match still matches gets a 304 after a single version lookup, before
+# any row is loaded or serialized. Last-Modified is informational only; with
+# one-second resolution it cannot tell apart two writes in the same second,
+# so If-Modified-Since never produces a 304 here.
+
+
+def collection_etag(request, version):
+    """ETag for ``request`` against collection ``version``; path, query and Accept all change the body."""
+    key = f"{version}|{request.get_full_path()}|{request.headers.get('Accept', '')}"
+    return '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+
+
+def versioned_response(request, name, render):
+    """
+    Answer a GET on collection ``name`` with a 304 when the client's ETag is
+    current, otherwise return ``render()`` with ``ETag`` and ``Last-Modified``.
+    """
+    version, updated_at = get_version_state(name)
+    etag = collection_etag(request, version)
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Clients may reuse their copy only after revalidating it
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+class VersionedGetMixin:
+    """Conditional GET for generic views; set ``version_name`` to the collection's data version."""
+    version_name = None
+
+    def get(self, request, *args, **kwargs):
+        return versioned_response(request, self.version_name, lambda: super(VersionedGetMixin, self).get(request, *args, **kwargs))
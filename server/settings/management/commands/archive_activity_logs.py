@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from settings.models import ActivityLog
+from settings.archive import archive_activity_logs, get_archive_dir, get_retention_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Move activity log entries older than the retention period into compressed daily archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Retention period in days (defaults to ACTIVITY_LOG_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows archived per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many entries would be archived')
+        parser.add_argument('--vacuum', action='store_true', help='Compact the database after archiving')
+
+    def handle(self, *args, **options):
+        days = options.get('days')
+        if days is not None and days < 0:
+            self.stderr.write(self.style.ERROR('--days must not be negative'))
+            return
+
+        cutoff = get_retention_cutoff(days)
+        count = archive_activity_logs(cutoff, batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        if options['dry_run']:
+            self.stdout.write(f'{count} entries older than {cutoff:%Y-%m-%d} would be archived.')
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {count} entries older than {cutoff:%Y-%m-%d} to {get_archive_dir()}'))
+
+        if options['vacuum'] and count:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(f'VACUUM ANALYZE {ActivityLog._meta.db_table}')
+                elif connection.vendor == 'sqlite':
+                    cursor.execute('VACUUM')
+            self.stdout.write(self.style.SUCCESS('Database compacted.'))
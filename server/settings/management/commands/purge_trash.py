@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from settings.models import TrashBin
+from settings.trash import purge_trash_items
+
+
+class Command(BaseCommand):
+    help = 'Permanently delete trash bin items older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Retention period in days (defaults to TRASH_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Trash items purged per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many items would be purged')
+
+    def handle(self, *args, **options):
+        days = options.get('days')
+        if days is None:
+            days = getattr(settings, 'TRASH_RETENTION_DAYS', 30)
+        if days < 0:
+            self.stderr.write(self.style.ERROR('--days must not be negative'))
+            return
+
+        cutoff = timezone.now() - timedelta(days=days)
+        expired = TrashBin.objects.filter(deleted_at__lt=cutoff).order_by('deleted_at', 'id')
+
+        if options['dry_run']:
+            self.stdout.write(f'{expired.count()} trash items older than {cutoff:%Y-%m-%d} would be purged.')
+            return
+
+        purged = 0
+        while True:
+            batch = list(expired[:options['batch_size']])
+            if not batch:
+                break
+            purged += purge_trash_items(batch)
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} trash items older than {cutoff:%Y-%m-%d}.'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settings', '0004_alter_trashbin_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read', 'created_at'], name='settings_no_user_id_232105_idx'),
+        ),
+    ]
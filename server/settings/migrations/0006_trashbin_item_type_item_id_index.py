@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settings', '0005_notification_user_read_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trashbin',
+            index=models.Index(fields=['item_type', 'item_id'], name='settings_tr_item_ty_560a88_idx'),
+        ),
+    ]
@@ -27,6 +27,9 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'read', 'created_at']),
+        ]
 
 class TrashBin(models.Model):
     ITEM_TYPES = [
@@ -48,6 +51,9 @@ class TrashBin(models.Model):
 
     class Meta:
         ordering = ['-deleted_at']
+        indexes = [
+            models.Index(fields=['item_type', 'item_id']),
+        ]
 
 class ActivityLog(models.Model):
     ACTIVITY_TYPES = [
@@ -79,3 +85,27 @@ class ActivityLog(models.Model):
             models.Index(fields=['activity_type', 'created_at']),
             models.Index(fields=['user', 'created_at']),
         ]
+
+class DataVersion(models.Model):
+    """Counter bumped on every write to a named data set, used to key caches and ETags."""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class Tombstone(models.Model):
+    """Marks a row removed from a synced collection for the ``?since=`` change feeds."""
+    collection = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.collection} {self.object_id} deleted at #{self.change_seq}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['collection', 'change_seq']),
+        ]
@@ -11,6 +11,11 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = ['id', 'title', 'message', 'read', 'created_at']
 
+class NotificationBroadcastSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    message = serializers.CharField()
+    user_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+
 class TrashBinSerializer(serializers.ModelSerializer):
     class Meta:
         model = TrashBin
@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from rest_framework.authtoken.models import Token
+
+from .models import UserSettings
+from . import cache as settings_cache
+from . import authentication
+
+# Sent with ``activities=[ActivityLog, ...]`` once a batch of activity entries
+# has been written. Bulk inserts skip post_save, so listeners that need to see
+# every activity entry should connect here instead.
+activities_logged = Signal()
+
+# Sent with ``notifications=[Notification, ...]`` after a bulk fan-out, which
+# does not send post_save for the rows it creates.
+notifications_created = Signal()
+
+# Sent with ``sender=<model>`` and ``pks=[...]`` after a queryset ``update()``
+# or ``bulk_create`` changed rows without sending per-row save signals.
+bulk_updated = Signal()
+
+
+@receiver(post_save, sender=UserSettings)
+@receiver(post_delete, sender=UserSettings)
+def invalidate_settings_cache(sender, instance, **kwargs):
+    settings_cache.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache(sender, instance, **kwargs):
+    authentication.invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_token_cache(sender, instance, **kwargs):
+    # Covers deactivation as well as profile edits the cached user would miss
+    authentication.invalidate_user(instance.pk)
@@ -1,3 +1,482 @@
-from django.test import TestCase
+import os
+import queue
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from ims_backend import seeding
+from ims_backend.testing import QueryBudgetTestCase
+from student.models import Student
+from student.signals import STUDENTS_VERSION
+from . import activity, authentication
+from . import cache as settings_cache
+from .archive import archive_activity_logs, get_retention_cutoff
+from .models import ActivityLog, Notification, Tombstone, TrashBin, UserSettings
+from .signals import activities_logged, notifications_created
+from .versioning import get_version
+
+
+class ActivityBufferTests(TestCase):
+    def setUp(self):
+        # A writer without its background thread, so the test decides when entries are written
+        self.writer = activity.ActivityLogWriter()
+        self.writer._queue = queue.Queue(maxsize=2)
+        self.writer._pid = os.getpid()
+        for patcher in (mock.patch.object(self.writer, '_ensure_started'), mock.patch.object(activity, 'writer', self.writer)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.batches = []
+
+        def receiver(activities, **kwargs):
+            self.batches.append(len(activities))
+
+        activities_logged.connect(receiver)
+        self.addCleanup(activities_logged.disconnect, receiver)
+
+    def entries(self, count):
+        return [ActivityLog(activity_type='other', description=f'Entry {index}') for index in range(count)]
+
+    def test_queued_on_commit_and_written_on_flush(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            activity.record_activities(self.entries(2))
+        self.assertEqual(self.writer._queue.qsize(), 0)
+        callbacks[0]()
+        self.assertEqual(ActivityLog.objects.count(), 0)
+        self.writer.flush()
+        self.assertEqual(ActivityLog.objects.count(), 2)
+        self.assertEqual(self.batches, [2])
+
+    def test_full_queue_writes_synchronously(self):
+        with self.assertLogs('settings.activity', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+            activity.record_activities(self.entries(5))
+        self.assertEqual(ActivityLog.objects.count(), 3)
+        self.writer.flush()
+        self.assertEqual(ActivityLog.objects.count(), 5)
+        self.assertEqual(self.batches, [3, 2])
+
+    @override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False})
+    def test_disabled_writes_immediately(self):
+        entry = activity.log_activity(activity_type='create', description='Created a student')
+        self.assertIsNotNone(entry.pk)
+        self.assertEqual(self.batches, [1])
+
+
+class ActivityArchiveTests(TestCase):
+    def setUp(self):
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        override = self.settings(ACTIVITY_LOG_ARCHIVE_DIR=archive_dir.name, ACTIVITY_LOG_RETENTION_DAYS=90)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.staff = User.objects.create_user('archive-staff', is_staff=True)
+        self.member = User.objects.create_user('archive-member')
+
+    def log(self, user, activity_type, days_ago):
+        entry = ActivityLog.objects.create(user=user, activity_type=activity_type, description=f'{activity_type} {days_ago}')
+        ActivityLog.objects.filter(pk=entry.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return entry
+
+    def search(self, user, query=''):
+        token = Token.objects.get_or_create(user=user)[0]
+        response = self.client.get(f'/api/settings/activities/archive/{query}', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_round_trip(self):
+        old = [self.log(self.staff, 'create', 100), self.log(self.member, 'delete', 95)]
+        recent = self.log(self.staff, 'update', 10)
+
+        self.assertEqual(archive_activity_logs(get_retention_cutoff(), batch_size=1), 2)
+        self.assertEqual(list(ActivityLog.objects.values_list('id', flat=True)), [recent.pk])
+
+        # The default window ends at the retention cutoff, where the newest archived entries are
+        body = self.search(self.staff)
+        self.assertEqual(body['end_date'], get_retention_cutoff().date().isoformat())
+        self.assertEqual([record['id'] for record in body['results']], [old[1].pk, old[0].pk])
+        self.assertEqual(body['results'][0]['user'], 'archive-member')
+
+        self.assertEqual([record['id'] for record in self.search(self.staff, '?activity_type=create')['results']], [old[0].pk])
+        self.assertEqual([record['id'] for record in self.search(self.member)['results']], [old[1].pk])
+
+    def test_invalid_window(self):
+        token = Token.objects.create(user=self.staff)
+        for query in (
+            '?end_date=yesterday', '?start_date=2024-02-01&end_date=2024-01-01', '?limit=many',
+            '?start_date=0001-01-01&end_date=9999-12-31', '?start_date=2024-01-01&end_date=2025-01-01', '?end_date=0001-01-01',
+        ):
+            response = self.client.get(f'/api/settings/activities/archive/{query}', HTTP_AUTHORIZATION=f'Token {token.key}')
+            self.assertEqual(response.status_code, 400, query)
+        # A whole (leap) year is the widest window
+        self.assertEqual(self.search(self.staff, '?start_date=2024-01-01&end_date=2024-12-31')['count'], 0)
+
+
+class ActivityPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('pager')
+        self.other = User.objects.create_user('other-pager')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.user).key}'
+        entries = [
+            ActivityLog.objects.create(user=self.user, activity_type='update', description=f'Entry {index}')
+            for index in range(7)
+        ]
+        ActivityLog.objects.create(user=self.other, activity_type='update', description='Not mine')
+        # Pages must break ties on created_at by id
+        ActivityLog.objects.filter(pk__in=[entry.pk for entry in entries[3:]]).update(created_at=timezone.now())
+
+    def test_pages_are_continuous(self):
+        expected = list(ActivityLog.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True))
+        seen = []
+        path = '/api/settings/activities/?page_size=3'
+        while path:
+            body = self.client.get(path).json()
+            seen += [entry['id'] for entry in body['results']]
+            if len(seen) == 3:
+                # New entries go to the front and do not shift later pages
+                ActivityLog.objects.create(user=self.user, activity_type='create', description='Late entry')
+            path = body['next']
+        self.assertEqual(seen, expected)
+
+    def test_filters(self):
+        ActivityLog.objects.create(user=self.user, activity_type='delete', item_type='student', item_id='9')
+        body = self.client.get('/api/settings/activities/?activity_type=delete&item_type=student').json()
+        self.assertEqual([entry['item_id'] for entry in body['results']], ['9'])
+        self.assertIsNone(body['next'])
+        # Only staff can read other users' history
+        body = self.client.get('/api/settings/activities/?user=all').json()
+        self.assertNotIn('other-pager', {entry['user'] for entry in body['results']})
+
+    def test_invalid_parameters(self):
+        for query in ('cursor=abc', 'cursor=bm90LWEtY3Vyc29y', 'start_date=2024-13-01'):
+            response = self.client.get(f'/api/settings/activities/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+
+@override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False})
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('notify-admin', is_staff=True)
+        self.users = [User.objects.create_user(f'notify{index}') for index in range(3)]
+        User.objects.create_user('notify-inactive', is_active=False)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.admin).key}'
+
+    def test_unread_count_and_mark_all_read(self):
+        for index in range(3):
+            Notification.objects.create(user=self.admin, title=f'Notice {index}', message='Hello', read=index == 0)
+        Notification.objects.create(user=self.users[0], title='Not mine', message='Hello')
+
+        self.assertEqual(self.client.get('/api/settings/notifications/unread-count/').json(), {'unread': 2})
+        self.assertEqual(len(self.client.get('/api/settings/notifications/?read=false').json()['results']), 2)
+        self.assertEqual(len(self.client.put('/api/settings/notifications/').json()), 2)
+        self.assertEqual(self.client.get('/api/settings/notifications/unread-count/').json(), {'unread': 0})
+        self.assertTrue(Notification.objects.filter(user=self.users[0], read=False).exists())
+
+    def test_broadcast(self):
+        sent = []
+
+        def receiver(notifications, **kwargs):
+            sent.extend(notifications)
+
+        notifications_created.connect(receiver)
+        self.addCleanup(notifications_created.disconnect, receiver)
+        data = {'title': 'Maintenance', 'message': 'Offline tonight.'}
+
+        response = self.client.post('/api/settings/notifications/broadcast/', data, content_type='application/json')
+        self.assertEqual(response.json(), {'created': 4})
+        self.assertEqual(len(sent), 4)
+        self.assertFalse(Notification.objects.filter(user__is_active=False).exists())
+
+        data['user_ids'] = [self.users[1].pk]
+        response = self.client.post('/api/settings/notifications/broadcast/', data, content_type='application/json')
+        self.assertEqual(response.json(), {'created': 1})
+
+        member_token = Token.objects.create(user=self.users[0])
+        response = self.client.post('/api/settings/notifications/broadcast/', data, content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Token {member_token.key}')
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False})
+class UserSettingsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('settings-user', first_name='Settings')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.user).key}'
+
+    def test_stored_settings_are_cached(self):
+        UserSettings.objects.create(user=self.user, settings_data={'appearance': {'theme': 'dark'}})
+        self.assertEqual(settings_cache.get_stored_settings(self.user.pk), {'appearance': {'theme': 'dark'}})
+        with self.assertNumQueries(0):
+            settings_data = settings_cache.get_stored_settings(self.user.pk)
+        # Callers get a copy they may modify
+        settings_data['appearance']['theme'] = 'light'
+        self.assertEqual(settings_cache.get_stored_settings(self.user.pk)['appearance']['theme'], 'dark')
+
+        merged = settings_cache.with_defaults(settings_data)
+        self.assertEqual(merged['appearance']['language'], 'en')
+        self.assertEqual(merged['appearance']['theme'], 'light')
+
+    def test_writes_refresh_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch('/api/settings/', {'settings_data': {'appearance': {'theme': 'dark'}}},
+                                         content_type='application/json')
+        self.assertEqual(response.json()['settings_data']['appearance']['theme'], 'dark')
+        with self.assertNumQueries(0):
+            self.assertEqual(settings_cache.get_stored_settings(self.user.pk), {'appearance': {'theme': 'dark'}})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/settings/user/', {'name': 'Ada Lovelace', 'phone': '0788000000'},
+                              content_type='application/json')
+        profile = self.client.get('/api/settings/user/').json()
+        self.assertEqual((profile['name'], profile['phone']), ('Ada Lovelace', '0788000000'))
+
+        # Writes outside the views evict the entry
+        UserSettings.objects.get(user=self.user).delete()
+        self.assertEqual(settings_cache.get_stored_settings(self.user.pk), {})
+
+    def test_profile_update_starts_from_the_database(self):
+        UserSettings.objects.create(user=self.user, settings_data={'appearance': {'theme': 'light'}})
+        settings_cache.get_stored_settings(self.user.pk)
+        # Another worker's write, which this process's cache has not seen
+        UserSettings.objects.filter(user=self.user).update(settings_data={'appearance': {'theme': 'dark'}})
+
+        response = self.client.patch('/api/settings/user/', {'phone': '0788000000'}, content_type='application/json')
+        self.assertEqual(response.json()['phone'], '0788000000')
+        self.assertEqual(
+            UserSettings.objects.get(user=self.user).settings_data,
+            {'appearance': {'theme': 'dark'}, 'profile': {'phone': '0788000000'}},
+        )
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('token-user')
+        self.token = Token.objects.create(user=self.user)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {self.token.key}'
+
+    def assertAuthenticated(self, expected=True):
+        status_code = self.client.get('/api/settings/notifications/unread-count/').status_code
+        self.assertEqual(status_code, 200 if expected else 401)
+
+    def test_cached_without_raw_key(self):
+        backend = authentication.CachedTokenAuthentication()
+        backend.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.authenticate_credentials(self.token.key), (self.user, self.token))
+        stored = cache.get(authentication._user_key(self.user.pk))
+        self.assertNotIn(self.token.key, stored)
+        self.assertEqual(stored, authentication._token_key(self.token.key))
+
+    def test_deactivation_evicts(self):
+        self.assertAuthenticated()
+        self.user.is_active = False
+        self.user.save()
+        self.assertAuthenticated(False)
+
+    def test_queryset_update_needs_explicit_eviction(self):
+        self.assertAuthenticated()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertAuthenticated()
+        authentication.invalidate_user(self.user.pk)
+        self.assertAuthenticated(False)
+
+    def test_token_delete_evicts(self):
+        self.assertAuthenticated()
+        self.token.delete()
+        self.assertAuthenticated(False)
+
+
+@override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False})
+class TrashBulkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('trash-user')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.user).key}'
+        self.students = seeding.seed_students(4)
+        response = self.client.post('/student/api/students/bulk/delete/', {'ids': [student.pk for student in self.students]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.trash = {int(item.item_id): item.pk for item in TrashBin.objects.filter(user=self.user)}
+
+    def post(self, path, data):
+        return self.client.post(f'/api/settings/trash/{path}/', data, content_type='application/json')
+
+    def test_restore(self):
+        restored = [self.students[0].pk, self.students[1].pk]
+        response = self.post('restore', {'ids': [self.trash[pk] for pk in restored]})
+        self.assertEqual(response.json(), {'restored': 2})
+        self.assertEqual(set(Student.objects.filter(is_deleted=False).values_list('pk', flat=True)), set(restored))
+        self.assertEqual(TrashBin.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(ActivityLog.objects.filter(activity_type='restore').count(), 2)
+
+    def test_purge(self):
+        response = self.post('purge', {'ids': [self.trash[self.students[0].pk]]})
+        self.assertEqual(response.json(), {'purged': 1})
+        self.assertFalse(Student.objects.filter(pk=self.students[0].pk).exists())
+
+        response = self.post('purge', {'all': True})
+        self.assertEqual(response.json(), {'purged': 3})
+        self.assertFalse(Student.objects.exists())
+        self.assertFalse(TrashBin.objects.exists())
+        self.assertEqual(Tombstone.objects.filter(collection=STUDENTS_VERSION).count(), 4)
+
+    def test_other_users_items_are_untouched(self):
+        other = User.objects.create_user('other-trash-user')
+        token = Token.objects.create(user=other)
+        response = self.client.post('/api/settings/trash/purge/', {'all': True}, content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.json(), {'purged': 0})
+        self.assertEqual(Student.objects.count(), 4)
+
+    def test_invalid_ids(self):
+        for data in ({'ids': ['abc']}, {'ids': [None]}, {'ids': []}, {'ids': '1,2'}, {}):
+            for path in ('purge', 'restore'):
+                self.assertEqual(self.post(path, data).status_code, 400, (path, data))
+        self.assertEqual(Student.objects.count(), 4)
+
+
+class ChangeFeedTests(TestCase):
+    path = '/student/api/students/changes/'
+
+    def setUp(self):
+        self.students = seeding.seed_students(4)
+
+    def changes(self, since=None, **params):
+        if since is not None:
+            params['since'] = since
+        response = self.client.get(self.path, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_since_cursor(self):
+        feed = self.changes()
+        self.assertEqual([change['op'] for change in feed['changes']], ['upsert'] * 4)
+        self.assertFalse(feed['has_more'])
+        cursor = feed['next_cursor']
+
+        edited, soft_deleted, purged = self.students[:3]
+        edited.name = 'Renamed Student'
+        edited.save(update_fields=['name'])
+        soft_deleted.is_deleted = True
+        soft_deleted.save()
+        Student.objects.get(pk=purged.pk).delete()
+
+        feed = self.changes(cursor)
+        self.assertEqual(
+            [(change['op'], change['id']) for change in feed['changes']],
+            [('upsert', edited.pk), ('delete', soft_deleted.pk), ('delete', purged.pk)],
+        )
+        self.assertEqual(feed['changes'][0]['data']['name'], 'Renamed Student')
+        seqs = [change['change_seq'] for change in feed['changes']]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(Student.objects.get(pk=edited.pk).change_seq, seqs[0])
+
+        feed = self.changes(feed['next_cursor'])
+        self.assertEqual(feed['changes'], [])
+
+    def test_pages(self):
+        seen, cursor = [], '0'
+        while True:
+            feed = self.changes(cursor, limit=3)
+            seen += [change['id'] for change in feed['changes']]
+            cursor = feed['next_cursor']
+            if not feed['has_more']:
+                break
+        self.assertEqual(seen, [student.pk for student in self.students])
+
+    def test_failed_save_takes_no_sequence_number(self):
+        cursor = self.changes()['next_cursor']
+        version = get_version(STUDENTS_VERSION)
+        student = self.students[0]
+        student.email = self.students[1].email
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            student.save()
+        self.assertEqual(get_version(STUDENTS_VERSION), version)
+        self.assertEqual(self.changes(cursor)['changes'], [])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.path, {'since': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(self.path, {'limit': 'all'}).status_code, 400)
+
+
+class VersionedResponseTests(TestCase):
+    path = '/student/api/students/'
+
+    def setUp(self):
+        seeding.seed_students(2)
+
+    def test_etag_decides(self):
+        response = self.client.get(self.path)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(self.client.get(self.path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.path, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT='text/html').status_code, 200)
+
+        # A write within the same second leaves Last-Modified as it was, but not the ETag
+        seeding.seed_students(1, start=2)
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(self.client.get(self.path, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+        self.assertEqual(self.client.get(self.path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+class SettingsQueryBudgetTests(QueryBudgetTestCase):
+    def trash_students(self, count):
+        self.request('post', '/student/api/students/bulk/delete/', {'ids': self.student_ids[:count]})
+        return list(TrashBin.objects.filter(user=self.user).values_list('id', flat=True))
+
+    def test_user_settings(self):
+        self.assertBudget('get', '/api/settings/', 2)
+        self.assertBudget('patch', '/api/settings/', 7, data={'settings_data': {'theme': 'dark'}})
+
+    def test_user_profile(self):
+        self.assertBudget('get', '/api/settings/user/', 2)
+        self.assertBudget('patch', '/api/settings/user/', 10, data={'name': 'Budget User', 'phone': '0788000000'})
+
+    def test_notifications(self):
+        response = self.assertBudget('get', '/api/settings/notifications/', 2)
+        self.assertIn('next', response.json())
+        self.assertBudget('get', '/api/settings/notifications/?read=false', 1)
+        self.assertBudget('get', '/api/settings/notifications/unread-count/', 1)
+
+    def test_mark_notifications_read(self):
+        notification = Notification.objects.filter(user=self.user).first()
+        self.assertBudget('patch', f'/api/settings/notifications/{notification.pk}/', 3, data={'read': True})
+        self.assertBudget('put', '/api/settings/notifications/', 3)
+
+    def test_broadcast(self):
+        data = {'title': 'Maintenance', 'message': 'The system will be offline tonight.'}
+        self.assertBudget('post', '/api/settings/notifications/broadcast/', 6, status=201, data=data)
+
+    def test_trash(self):
+        trash_ids = self.trash_students(50)
+        self.assertBudget('get', '/api/settings/trash/', 1)
+        self.assertBudget('delete', f'/api/settings/trash/{trash_ids[0]}/', 10, status=204)
+        self.assertBudget('post', '/api/settings/trash/restore/', 12, data={'ids': trash_ids[1:25]})
+        self.assertBudget('post', '/api/settings/trash/purge/', 10, data={'all': True})
+
+    def test_trash_create(self):
+        data = {'item_type': 'other', 'item_id': 'note-1', 'item_data': {'text': 'Draft'}}
+        self.assertBudget('post', '/api/settings/trash/', 2, status=201, data=data)
+
+    def test_activities(self):
+        self.assertBudget('get', '/api/settings/activities/', 2)
+        self.assertBudget('get', '/api/settings/activities/?user=all&item_type=student', 1)
+        data = {'activity_type': 'other', 'description': 'Opened the reports page'}
+        self.assertBudget('post', '/api/settings/activities/', 1, status=201, data=data)
+
+    def test_activity_archive(self):
+        with tempfile.TemporaryDirectory() as archive_dir, self.settings(ACTIVITY_LOG_ARCHIVE_DIR=archive_dir):
+            self.assertBudget('get', '/api/settings/activities/archive/?start_date=2024-01-01&end_date=2024-01-31', 1)
+
+    def test_profiling(self):
+        self.assertBudget('get', '/api/settings/profiling/', 1)
+        self.assertBudget('get', '/api/settings/profiling/metrics/', 0)
@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.utils import timezone
+
+from student.models import Student
+from Employee.models import Employee
+
+from .activity import record_activities
+from .models import ActivityLog, TrashBin
+from .signals import bulk_updated
+from .versioning import batch_deletions
+
+# Trash item types backed by a soft-deleted model row
+TRASH_MODELS = {
+    'student': Student,
+    'employee': Employee,
+}
+
+
+def _group_by_type(trash_items):
+    grouped = {}
+    for item in trash_items:
+        grouped.setdefault(item.item_type, []).append(item)
+    return grouped
+
+
+def _pk(item):
+    try:
+        return int(item.item_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def purge_trash_items(trash_items, user=None):
+    """
+    Permanently delete the records behind ``trash_items`` and the trash entries
+    themselves, with one delete per item type. Returns the number of trash
+    entries removed.
+    """
+    trash_items = list(trash_items)
+    if not trash_items:
+        return 0
+
+    activities = []
+    with transaction.atomic(), batch_deletions():
+        for item_type, items in _group_by_type(trash_items).items():
+            model = TRASH_MODELS.get(item_type)
+            if model is None:
+                continue
+            pks = [pk for pk in map(_pk, items) if pk is not None]
+            existing = dict(model.objects.filter(pk__in=pks).values_list('pk', 'name'))
+            model.objects.filter(pk__in=existing).delete()  # Hard delete
+            for item in items:
+                name = existing.get(_pk(item))
+                if name is None:
+                    continue  # Record already deleted or doesn't exist
+                activities.append(ActivityLog(
+                    user=user,
+                    activity_type='delete',
+                    description=f"Permanently deleted {item_type}: {name}",
+                    item_type=item_type,
+                    item_id=item.item_id,
+                    metadata={'permanent_delete': True, 'item_data': item.item_data}
+                ))
+
+        TrashBin.objects.filter(pk__in=[item.pk for item in trash_items]).delete()
+        record_activities(activities)
+    return len(trash_items)
+
+
+def restore_records(model, item_type, pks, user=None):
+    """
+    Undo the soft delete of ``model`` rows ``pks`` with one ``update()``, drop
+    their trash entries and log one activity entry per restored row. Returns
+    the number of restored rows.
+    """
+    with transaction.atomic():
+        deleted = model.objects.filter(pk__in=pks, is_deleted=True)
+        names = dict(deleted.values_list('pk', 'name'))
+        if not names:
+            return 0
+        restored = deleted.update(is_deleted=False, updated_at=timezone.now())
+        TrashBin.objects.filter(item_type=item_type, item_id__in=[str(pk) for pk in names]).delete()
+        bulk_updated.send(sender=model, pks=list(names))
+        record_activities(
+            ActivityLog(
+                user=user,
+                activity_type='restore',
+                description=f"Restored {item_type}: {name}",
+                item_type=item_type,
+                item_id=str(pk),
+                metadata={'name': name}
+            )
+            for pk, name in names.items()
+        )
+    return restored
+
+
+def restore_trash_items(trash_items, user=None):
+    """
+    Restore the records behind ``trash_items`` with one ``update()`` per item
+    type and drop the trash entries. Returns the number of restored records.
+    """
+    trash_items = [item for item in trash_items if item.can_restore and item.item_type in TRASH_MODELS]
+    if not trash_items:
+        return 0
+
+    restored = 0
+    with transaction.atomic():
+        for item_type, items in _group_by_type(trash_items).items():
+            pks = [pk for pk in map(_pk, items) if pk is not None]
+            restored += restore_records(TRASH_MODELS[item_type], item_type, pks, user=user)
+        TrashBin.objects.filter(pk__in=[item.pk for item in trash_items]).delete()
+    return restored
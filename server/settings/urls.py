@@ -1,12 +1,23 @@
 from django.urls import path
-from .views import UserSettingsView, UserProfileView, NotificationView, TrashBinView, ActivityLogView
+from .views import (
+    UserSettingsView, UserProfileView, NotificationView, NotificationUnreadCountView, NotificationBroadcastView,
+    TrashBinView, TrashPurgeView, TrashRestoreView, ActivityLogView, ActivityArchiveView,
+    ProfilingStatsView, ProfilingMetricsView,
+)
 
 urlpatterns = [
     path('', UserSettingsView.as_view(), name='user-settings'),
     path('user/', UserProfileView.as_view(), name='user-profile'),
     path('notifications/', NotificationView.as_view(), name='notifications'),
     path('notifications/<int:pk>/', NotificationView.as_view(), name='notification-detail'),
+    path('notifications/unread-count/', NotificationUnreadCountView.as_view(), name='notification-unread-count'),
+    path('notifications/broadcast/', NotificationBroadcastView.as_view(), name='notification-broadcast'),
     path('trash/', TrashBinView.as_view(), name='trash-bin'),
     path('trash/<int:pk>/', TrashBinView.as_view(), name='trash-bin-detail'),
+    path('trash/purge/', TrashPurgeView.as_view(), name='trash-bin-purge'),
+    path('trash/restore/', TrashRestoreView.as_view(), name='trash-bin-restore'),
     path('activities/', ActivityLogView.as_view(), name='activity-log'),
+    path('activities/archive/', ActivityArchiveView.as_view(), name='activity-archive'),
+    path('profiling/', ProfilingStatsView.as_view(), name='profiling-stats'),
+    path('profiling/metrics/', ProfilingMetricsView.as_view(), name='profiling-metrics'),
 ]
@@ -0,0 +1,141 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion, Tombstone
+
+# Version counters for data sets whose derived output (report PDFs, ETags) is
+# cached. Counters live in the database so every worker process sees a bump
+# made by any other, and the bump commits or rolls back with the write itself.
+#
+# For the synced collections the counter doubles as the change sequence: each
+# change stamps the rows it touched (``change_seq``) or a ``Tombstone`` with
+# the new value in the same transaction as the write. Single-row saves take
+# their number in ``ChangeTrackingMixin.save()`` and write it with the row;
+# deletes run inside Django's delete transaction, and ``bulk_updated`` senders
+# are expected to be inside theirs. The counter row stays locked until that
+# transaction commits, so sequence numbers become visible in order and a
+# client that has seen N never later finds a change below N.
+_pending_deletions = contextvars.ContextVar('pending_deletions', default=None)
+
+
+def get_version(name):
+    return DataVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+
+def get_version_state(name):
+    """``(version, updated_at)`` for ``name``; ``(0, None)`` before its first bump."""
+    return DataVersion.objects.filter(name=name).values_list('version', 'updated_at').first() or (0, None)
+
+
+def bump_version(name):
+    """Increment ``name``'s counter and return the new value."""
+    with transaction.atomic(savepoint=False):
+        version = _increment(name)
+        if version is None:
+            _, created = DataVersion.objects.get_or_create(name=name, defaults={'version': 1})
+            if created:
+                return 1
+            version = _increment(name)
+        return version
+
+
+def _increment(name):
+    """Add one to an existing counter; the new value, or None if ``name`` has no row yet."""
+    now = timezone.now()
+    if not connection.features.can_return_columns_from_insert:
+        if not DataVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=now):
+            return None
+        return DataVersion.objects.filter(name=name).values_list('version', flat=True).get()
+    # SQLite (3.35+) and PostgreSQL take UPDATE ... RETURNING, which saves
+    # the read-back on every write to a tracked collection
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {quote(DataVersion._meta.db_table)} SET {quote("version")} = {quote("version")} + 1, '
+            f'{quote("updated_at")} = %s WHERE {quote("name")} = %s RETURNING {quote("version")}',
+            [connection.ops.adapt_datetimefield_value(now), name],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def record_change(name, queryset, **fields):
+    """Bump ``name`` and stamp the rows of ``queryset`` (plus any ``fields``) with the new ``change_seq``."""
+    with transaction.atomic(savepoint=False):
+        seq = bump_version(name)
+        queryset.update(change_seq=seq, **fields)
+    return seq
+
+
+def record_deletions(name, pks):
+    """Bump ``name`` once and leave a tombstone for each hard-deleted row in ``pks``."""
+    with transaction.atomic(savepoint=False):
+        seq = bump_version(name)
+        Tombstone.objects.bulk_create(Tombstone(collection=name, object_id=pk, change_seq=seq) for pk in pks)
+    return seq
+
+
+@contextmanager
+def batch_deletions():
+    """
+    Write the tombstones for deletes made inside the block together when it
+    exits, instead of bumping the counter once per deleted row. Use inside the
+    transaction doing the deletes.
+    """
+    pending = {}
+    token = _pending_deletions.set(pending)
+    try:
+        yield
+    finally:
+        _pending_deletions.reset(token)
+    for name, pks in pending.items():
+        record_deletions(name, pks)
+
+
+class ChangeTrackingMixin:
+    """
+    Model mixin for the synced collections. ``save()`` takes the next number
+    of the ``version_name`` counter and writes it as ``change_seq`` together
+    with the row, in one transaction, so a save that fails leaves neither
+    the row nor its place in the feed behind.
+    """
+    version_name = None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if not update_fields:
+                return super().save(*args, **kwargs)
+            kwargs['update_fields'] = {*update_fields, 'change_seq'}
+        with transaction.atomic(savepoint=False):
+            self.change_seq = bump_version(self.version_name)
+            super().save(*args, **kwargs)
+
+
+def track_changes(model, name):
+    """
+    Keep ``model``'s change feed and version ``name`` current alongside
+    ``ChangeTrackingMixin``: ``bulk_updated`` sends stamp the rows, deletes
+    leave tombstones.
+    """
+    from django.db.models.signals import post_delete
+
+    from .signals import bulk_updated
+
+    def on_bulk_update(sender, pks, **kwargs):
+        record_change(name, model.objects.filter(pk__in=pks))
+
+    def on_delete(sender, instance, **kwargs):
+        pending = _pending_deletions.get()
+        if pending is not None:
+            pending.setdefault(name, []).append(instance.pk)
+        else:
+            record_deletions(name, [instance.pk])
+
+    uid = f'track_changes:{model._meta.label}'
+    bulk_updated.connect(on_bulk_update, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
@@ -1,74 +1,60 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import status
-from .models import UserSettings, Notification, TrashBin, ActivityLog
-from .serializers import UserSettingsSerializer, NotificationSerializer, TrashBinSerializer
-from student.models import Student
-from Employee.models import Employee
+from rest_framework.exceptions import ValidationError
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.db import transaction
+from django.utils import timezone
+from datetime import date, datetime, time, timedelta
+from .models import Notification, TrashBin, ActivityLog
+from .activity import log_activity, get_activity_icon
+from . import cache as settings_cache
+from .archive import get_retention_cutoff, search_archives
+from .pagination import CreatedAtCursorPagination
+from .trash import purge_trash_items, restore_trash_items
+from .serializers import UserSettingsSerializer, NotificationSerializer, NotificationBroadcastSerializer, TrashBinSerializer
+from .signals import notifications_created
+from ims_backend.profiling import get_profiling_config, recorder
 
 class UserSettingsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user_settings, created = UserSettings.objects.get_or_create(user=request.user)
-        if created or not user_settings.settings_data or len(user_settings.settings_data) == 0:
-            user_settings.settings_data = {
-                "notifications": {
-                    "emailNotifications": True,
-                    "pushNotifications": True,
-                    "smsNotifications": False,
-                    "marketingEmails": False,
-                },
-                "privacy": {
-                    "profileVisibility": "public",
-                    "dataSharing": False,
-                    "analytics": True,
-                },
-                "appearance": {
-                    "theme": "system",
-                    "language": "en",
-                    "timezone": "UTC",
-                    "dateFormat": "MM/DD/YYYY",
-                },
-                "security": {
-                    "twoFactorAuth": False,
-                    "sessionTimeout": 30,
-                    "passwordExpiry": 90,
-                },
-            }
-            user_settings.save()
-        serializer = UserSettingsSerializer(user_settings)
-        return Response(serializer.data)
+        # Served from the per-user cache; defaults are merged in, never written
+        settings_data = settings_cache.get_stored_settings(request.user.id)
+        return Response({'settings_data': settings_cache.with_defaults(settings_data)})
 
     def patch(self, request):
-        user_settings, created = UserSettings.objects.get_or_create(user=request.user)
-        serializer = UserSettingsSerializer(user_settings, data=request.data, partial=True)
+        serializer = UserSettingsSerializer(data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-
-            # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                activity_type='update',
-                description='Updated user settings',
-                item_type='settings',
-                item_id=str(user_settings.id),
-                metadata={'changes': request.data}
-            )
-
-            return Response(serializer.data)
+            settings_data = serializer.validated_data.get('settings_data')
+            if settings_data is None:
+                settings_data = settings_cache.get_stored_settings(request.user.id)
+            else:
+                user_settings = settings_cache.save_settings(request.user.id, settings_data)
+
+                # Log activity
+                log_activity(
+                    user=request.user,
+                    activity_type='update',
+                    description='Updated user settings',
+                    item_type='settings',
+                    item_id=str(user_settings.id),
+                    metadata={'changes': request.data}
+                )
+
+            return Response({'settings_data': settings_cache.with_defaults(settings_data)})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        user = request.user
-        user_settings, _ = UserSettings.objects.get_or_create(user=user)
-        profile_data = user_settings.settings_data.get('profile', {})
-        data = {
+    def build_profile(self, user, settings_data):
+        profile_data = settings_data.get('profile', {})
+        return {
             'name': user.get_full_name() or user.username,
             'email': user.email,
             'role': 'Administrator',
@@ -77,35 +63,40 @@ class UserProfileView(APIView):
             'department': profile_data.get('department', ''),
             'joinDate': user.date_joined.strftime('%B %Y') if user.date_joined else 'January 2023',
         }
-        return Response(data)
+
+    def get(self, request):
+        settings_data = settings_cache.get_stored_settings(request.user.id)
+        return Response(self.build_profile(request.user, settings_data))
 
     def patch(self, request):
         user = request.user
-        user_settings, _ = UserSettings.objects.get_or_create(user=user)
-        profile_data = user_settings.settings_data.get('profile', {})
 
-        # Update User model fields
+        # Update User model fields, saved together below
+        user_fields = []
         if 'name' in request.data:
             user.first_name = request.data['name'].split(' ')[0] if ' ' in request.data['name'] else request.data['name']
             user.last_name = request.data['name'].split(' ', 1)[1] if ' ' in request.data['name'] else ''
-            user.save()
+            user_fields += ['first_name', 'last_name']
         if 'email' in request.data:
             user.email = request.data['email']
-            user.save()
+            user_fields.append('email')
 
         # Update custom fields in UserSettings
-        if 'phone' in request.data:
-            profile_data['phone'] = request.data['phone']
-        if 'department' in request.data:
-            profile_data['department'] = request.data['department']
-        if 'avatar' in request.data:
-            profile_data['avatar'] = request.data['avatar']
+        profile_fields = {field: request.data[field] for field in ('phone', 'department', 'avatar') if field in request.data}
 
-        user_settings.settings_data['profile'] = profile_data
-        user_settings.save()
+        def update_profile(settings_data):
+            settings_data.setdefault('profile', {}).update(profile_fields)
+
+        with transaction.atomic():
+            if user_fields:
+                user.save(update_fields=user_fields)
+            if profile_fields:
+                settings_data = settings_cache.update_settings(user.id, update_profile)
+            else:
+                settings_data = settings_cache.get_stored_settings(user.id)
 
         # Log activity
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user,
             activity_type='update',
             description='Updated user profile',
@@ -114,17 +105,22 @@ class UserProfileView(APIView):
             metadata={'changes': request.data}
         )
 
-        # Return updated data
-        updated_data = self.get(request).data
-        return Response(updated_data)
+        return Response(self.build_profile(user, settings_data))
 
 class NotificationView(APIView):
     permission_classes = [IsAuthenticated]
 
+    pagination_class = CreatedAtCursorPagination
+
     def get(self, request):
-        notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-        serializer = NotificationSerializer(notifications, many=True)
-        return Response(serializer.data)
+        notifications = Notification.objects.filter(user=request.user)
+        read = request.query_params.get('read')
+        if read in ('true', 'false'):
+            notifications = notifications.filter(read=(read == 'true'))
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(notifications, request, view=self)
+        serializer = NotificationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def patch(self, request, pk=None):
         try:
@@ -141,12 +137,55 @@ class NotificationView(APIView):
         return Response({"detail": "Invalid data."}, status=status.HTTP_400_BAD_REQUEST)
 
     def put(self, request):
-        # Mark all notifications as read
-        notifications = Notification.objects.filter(user=request.user, read=False)
+        # Mark all notifications as read and return the ones that changed
+        unread_ids = list(Notification.objects.filter(user=request.user, read=False).values_list('id', flat=True))
+        notifications = Notification.objects.filter(id__in=unread_ids)
         notifications.update(read=True)
         serializer = NotificationSerializer(notifications, many=True)
         return Response(serializer.data)
 
+
+class NotificationUnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Answered from the (user, read, created_at) index alone
+        unread = Notification.objects.filter(user=request.user, read=False).count()
+        return Response({'unread': unread})
+
+
+class NotificationBroadcastView(APIView):
+    """Send the same notification to every active user, or to ``user_ids``."""
+    permission_classes = [IsAdminUser]
+    batch_size = 500
+
+    def post(self, request):
+        serializer = NotificationBroadcastSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        title = serializer.validated_data['title']
+        message = serializer.validated_data['message']
+
+        users = User.objects.filter(is_active=True)
+        if 'user_ids' in serializer.validated_data:
+            users = users.filter(id__in=serializer.validated_data['user_ids'])
+
+        notifications = [
+            Notification(user_id=user_id, title=title, message=message)
+            for user_id in users.values_list('id', flat=True).iterator()
+        ]
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=self.batch_size)
+        notifications_created.send(sender=Notification, notifications=notifications)
+
+        log_activity(
+            user=request.user,
+            activity_type='create',
+            description=f"Broadcast notification to {len(notifications)} users: {title}",
+            item_type='notification',
+            metadata={'title': title, 'recipients': len(notifications)}
+        )
+        return Response({'created': len(notifications)}, status=status.HTTP_201_CREATED)
+
 class TrashBinView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -167,57 +206,90 @@ class TrashBinView(APIView):
     def delete(self, request, pk):
         try:
             trash_item = TrashBin.objects.get(pk=pk, user=request.user)
-
-            # Permanently delete the actual record based on item_type
-            if trash_item.item_type == 'student':
-                try:
-                    student = Student.objects.get(pk=trash_item.item_id)
-                    student_name = student.name
-                    student.delete()  # Hard delete
-
-                    # Log activity
-                    ActivityLog.objects.create(
-                        user=request.user,
-                        activity_type='delete',
-                        description=f"Permanently deleted student: {student_name}",
-                        item_type='student',
-                        item_id=trash_item.item_id,
-                        metadata={'permanent_delete': True, 'item_data': trash_item.item_data}
-                    )
-                except Student.DoesNotExist:
-                    pass  # Student already deleted or doesn't exist
-
-            elif trash_item.item_type == 'employee':
-                try:
-                    employee = Employee.objects.get(pk=trash_item.item_id)
-                    employee_name = employee.name
-                    employee.delete()  # Hard delete
-
-                    # Log activity
-                    ActivityLog.objects.create(
-                        user=request.user,
-                        activity_type='delete',
-                        description=f"Permanently deleted employee: {employee_name}",
-                        item_type='employee',
-                        item_id=trash_item.item_id,
-                        metadata={'permanent_delete': True, 'item_data': trash_item.item_data}
-                    )
-                except Employee.DoesNotExist:
-                    pass  # Employee already deleted or doesn't exist
-
-            # Delete the trash bin entry
-            trash_item.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
         except TrashBin.DoesNotExist:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        purge_trash_items([trash_item], user=request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TrashBulkView(APIView):
+    """Shared handling for ``{"ids": [...]}`` / ``{"all": true}`` bulk trash requests."""
+    permission_classes = [IsAuthenticated]
+
+    def get_trash_items(self, request):
+        trash_items = TrashBin.objects.filter(user=request.user)
+        if request.data.get('all') is True:
+            return trash_items
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({'ids': 'Provide a non-empty list of trash item ids, or "all": true.'})
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            raise ValidationError({'ids': 'Trash item ids must be integers.'})
+        return trash_items.filter(pk__in=ids)
+
+
+class TrashPurgeView(TrashBulkView):
+    def post(self, request):
+        purged = purge_trash_items(self.get_trash_items(request), user=request.user)
+        return Response({'purged': purged})
+
+
+class TrashRestoreView(TrashBulkView):
+    def post(self, request):
+        restored = restore_trash_items(self.get_trash_items(request), user=request.user)
+        return Response({'restored': restored})
 
 class ActivityLogView(APIView):
+    """
+    Activity history, newest first, paginated with an opaque ``cursor``.
+
+    Filters: ``activity_type``, ``item_type``, ``item_id``, ``start_date`` and
+    ``end_date`` (YYYY-MM-DD, inclusive). Staff may pass ``user=all`` or
+    ``user=<id>`` to read other users' history.
+    """
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self, request):
+        params = request.query_params
+        activities = ActivityLog.objects.select_related('user')
+
+        user_param = params.get('user')
+        if request.user.is_staff and user_param == 'all':
+            pass
+        elif request.user.is_staff and user_param:
+            try:
+                activities = activities.filter(user_id=int(user_param))
+            except ValueError:
+                raise ValidationError({'user': 'Must be "all" or a user id.'})
+        else:
+            activities = activities.filter(user=request.user)
+
+        for field in ('activity_type', 'item_type', 'item_id'):
+            if params.get(field):
+                activities = activities.filter(**{field: params[field]})
+
+        # Compare against datetimes rather than created_at__date so the
+        # (…, created_at) indexes can be used for the range
+        try:
+            if params.get('start_date'):
+                start = date.fromisoformat(params['start_date'])
+                activities = activities.filter(created_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+            if params.get('end_date'):
+                end = date.fromisoformat(params['end_date']) + timedelta(days=1)
+                activities = activities.filter(created_at__lt=timezone.make_aware(datetime.combine(end, time.min)))
+        except ValueError:
+            raise ValidationError({'error': 'Invalid date format. Use YYYY-MM-DD.'})
+        return activities
 
     def get(self, request):
-        activities = ActivityLog.objects.filter(user=request.user).order_by('-created_at')[:50]
+        paginator = self.pagination_class()
+        activities = paginator.paginate_queryset(self.get_queryset(request), request, view=self)
         data = []
         for activity in activities:
+            timestamp = activity.created_at.strftime('%Y-%m-%d %H:%M:%S')
             data.append({
                 'id': activity.id,
                 'activity_type': activity.activity_type,
@@ -225,18 +297,18 @@ class ActivityLogView(APIView):
                 'item_type': activity.item_type,
                 'item_id': activity.item_id,
                 'metadata': activity.metadata,
-                'created_at': activity.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'timestamp': activity.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'created_at': timestamp,
+                'timestamp': timestamp,
                 'user': activity.user.username if activity.user else 'System',
-                'icon': self.get_activity_icon(activity.activity_type),
+                'icon': get_activity_icon(activity.activity_type),
                 'type': activity.item_type or 'system'
             })
-        return Response(data)
+        return paginator.get_paginated_response(data)
 
     def post(self, request):
         data = request.data.copy()
         data['user'] = request.user.id
-        activity_log = ActivityLog.objects.create(
+        activity_log = log_activity(
             user=request.user,
             activity_type=data.get('activity_type'),
             description=data.get('description'),
@@ -244,7 +316,8 @@ class ActivityLogView(APIView):
             item_id=data.get('item_id'),
             metadata=data.get('metadata', {}),
             ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT')
+            user_agent=request.META.get('HTTP_USER_AGENT'),
+            sync=True
         )
         return Response({
             'id': activity_log.id,
@@ -253,14 +326,72 @@ class ActivityLogView(APIView):
             'created_at': activity_log.created_at.strftime('%Y-%m-%d %H:%M:%S')
         }, status=status.HTTP_201_CREATED)
 
-    def get_activity_icon(self, activity_type):
-        icon_map = {
-            'create': 'fas fa-plus text-green-600',
-            'update': 'fas fa-edit text-blue-600',
-            'delete': 'fas fa-trash text-red-600',
-            'restore': 'fas fa-undo text-yellow-600',
-            'login': 'fas fa-sign-in-alt text-green-600',
-            'logout': 'fas fa-sign-out-alt text-gray-600',
-            'other': 'fas fa-info-circle text-gray-600'
+
+class ActivityArchiveView(APIView):
+    """
+    Read-only search over archived activity entries, e.g.
+    ``?start_date=2025-01-01&end_date=2025-01-31``. Without dates it searches
+    the 30 days before the retention cutoff, the newest entries the archive holds.
+    A search covers at most ``max_days`` days, since each day is a file to open.
+    """
+    permission_classes = [IsAuthenticated]
+    max_limit = 1000
+    max_days = 366
+
+    def get(self, request):
+        try:
+            end_date = date.fromisoformat(request.query_params.get('end_date', get_retention_cutoff().date().isoformat()))
+            start_date = date.fromisoformat(request.query_params.get('start_date', (end_date - timedelta(days=30)).isoformat()))
+        except (ValueError, OverflowError):
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+        if start_date > end_date:
+            return Response({'error': 'start_date must not be after end_date.'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= self.max_days:
+            return Response(
+                {'error': f'Search at most {self.max_days} days at a time.'}, status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = min(int(request.query_params.get('limit', 100)), self.max_limit)
+        except ValueError:
+            return Response({'error': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        filters = {
+            'activity_type': request.query_params.get('activity_type'),
+            'item_type': request.query_params.get('item_type'),
+            'item_id': request.query_params.get('item_id'),
         }
-        return icon_map.get(activity_type, 'fas fa-info-circle text-gray-600')
+        # Staff can search everyone's history, other users only their own
+        if not request.user.is_staff:
+            filters['user_id'] = request.user.id
+
+        results = search_archives(start_date, end_date, limit=limit, **filters)
+        return Response({
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'count': len(results),
+            'results': results,
+        })
+
+
+class ProfilingStatsView(APIView):
+    """Per-route latency, query and response size percentiles from ``ims_backend.profiling``."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'enabled': get_profiling_config()['ENABLED'],
+            'routes': recorder.snapshot(),
+        })
+
+    def delete(self, request):
+        recorder.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProfilingMetricsView(APIView):
+    """The same figures in the Prometheus text format, for scraping."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(recorder.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,239 @@
+import codecs
+import csv
+import json
+import zipfile
+from datetime import datetime
+
+from django.db import IntegrityError, models, transaction
+from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+
+from settings.activity import log_activity
+from settings.signals import bulk_updated
+
+from .models import Student
+from .serializers import StudentSerializer
+
+try:
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+except Exception:
+    openpyxl = None
+
+MAX_REPORTED_ERRORS = 1000
+UNIQUE_FIELDS = ('email', 'idNumber')
+JSON_FIELDS = {field.name for field in Student._meta.get_fields() if isinstance(field, models.JSONField)}
+
+
+class StudentImportSerializer(StudentSerializer):
+    """
+    ``StudentSerializer`` without the per-row uniqueness queries; the importer
+    checks ``email`` and ``idNumber`` against sets loaded once up front.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in UNIQUE_FIELDS:
+            fields[name].validators = [v for v in fields[name].validators if not isinstance(v, UniqueValidator)]
+        return fields
+
+
+def _clean_value(name, value):
+    if isinstance(value, str):
+        value = value.strip()
+        if value == '':
+            return None
+        if name in JSON_FIELDS and value[0] in '[{':
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                return value
+    if isinstance(value, datetime) and value.time() == datetime.min.time():
+        return value.date()
+    return value
+
+
+def _clean_row(row):
+    # Blank cells fall back to model defaults instead of failing validation
+    cleaned = {}
+    for name, value in row.items():
+        if not name:
+            continue
+        value = _clean_value(name.strip(), value)
+        if value is not None:
+            cleaned[name.strip()] = value
+    return cleaned
+
+
+class RowError:
+    """Yielded by the row iterators in place of a row that could not be read."""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def _decode_lines(fileobj, bad_lines):
+    # Lines are decoded one at a time, so an invalid byte only spoils the row
+    # it is in; the numbers of such lines are added to ``bad_lines``
+    for line_number, line in enumerate(fileobj, start=1):
+        if line_number == 1:
+            line = line.removeprefix(codecs.BOM_UTF8)
+        try:
+            yield line.decode('utf-8')
+        except UnicodeDecodeError:
+            bad_lines.add(line_number)
+            yield line.decode('utf-8', errors='replace')
+
+
+def iter_csv_rows(fileobj):
+    bad_lines = set()
+    reader = csv.DictReader(_decode_lines(fileobj, bad_lines))
+    try:
+        if not reader.fieldnames:
+            return
+    except csv.Error as exc:
+        raise ValueError(f'Could not read the header row: {exc}')
+    if bad_lines:
+        raise ValueError('The header row is not valid UTF-8. Save the file as UTF-8 CSV and try again.')
+
+    while True:
+        first_line = reader.line_num + 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            yield RowError(f'Line {reader.line_num}: {exc}')
+            continue
+        if bad_lines.intersection(range(first_line, reader.line_num + 1)):
+            yield RowError('Row is not valid UTF-8 text.')
+        else:
+            yield row
+
+
+def iter_xlsx_rows(fileobj):
+    if openpyxl is None:
+        raise ValueError('openpyxl package is not installed, XLSX files cannot be imported')
+    try:
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError):
+        # Not a zip archive, or one without the parts of a workbook
+        raise ValueError('Unreadable XLSX file')
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(header).strip() if header is not None else '' for header in next(rows, [])]
+        for values in rows:
+            if values is None or all(value is None for value in values):
+                continue
+            yield dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    if filename.lower().endswith('.xlsx'):
+        return iter_xlsx_rows(fileobj)
+    if filename.lower().endswith('.csv'):
+        return iter_csv_rows(fileobj)
+    raise ValueError('Unsupported file type. Upload a .csv or .xlsx file.')
+
+
+class StudentImporter:
+    """
+    Validates student rows one at a time with the ``StudentSerializer`` rules
+    and inserts valid rows with ``bulk_create`` in chunks of ``batch_size``.
+    The report keeps at most ``MAX_REPORTED_ERRORS`` row errors, and
+    unreadable rows are reported like invalid ones. The whole file is
+    validated before any transaction opens, so a large upload does not hold
+    the database write lock while it is parsed; the inserts then run in one
+    short transaction, so an unexpected error never leaves part of a file
+    imported.
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, user=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.user = user
+        # One serializer instance is reused so fields are built once, not per row
+        self.serializer = StudentImportSerializer()
+        self.total_rows = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def _error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def _insert(self, pending):
+        if self.dry_run or not pending:
+            self.created += len(pending)
+            return
+        try:
+            with transaction.atomic():
+                students = Student.objects.bulk_create([student for _, student in pending])
+        except IntegrityError:
+            # Something raced us to an email/idNumber; insert one by one to find the rows
+            students = []
+            for row_number, student in pending:
+                try:
+                    with transaction.atomic():
+                        student.save()
+                    students.append(student)
+                except IntegrityError as exc:
+                    self._error(row_number, {'non_field_errors': [str(exc)]})
+        self.created += len(students)
+        bulk_updated.send(sender=Student, pks=[student.pk for student in students])
+
+    def run(self, rows):
+        existing = {name: set(Student.objects.values_list(name, flat=True)) for name in UNIQUE_FIELDS}
+        pending = []
+
+        # Row 1 is the header, so data rows are numbered from 2 as in a spreadsheet
+        for row_number, row in enumerate(rows, start=2):
+            self.total_rows += 1
+            if isinstance(row, RowError):
+                self._error(row_number, {'non_field_errors': [row.message]})
+                continue
+            try:
+                data = self.serializer.run_validation(_clean_row(row))
+            except serializers.ValidationError as exc:
+                self._error(row_number, exc.detail)
+                continue
+
+            duplicates = {
+                name: [f'A student with this {name} already exists.']
+                for name in UNIQUE_FIELDS if data[name] in existing[name]
+            }
+            if duplicates:
+                self._error(row_number, duplicates)
+                continue
+            for name in UNIQUE_FIELDS:
+                existing[name].add(data[name])
+
+            pending.append((row_number, Student(**data)))
+
+        with transaction.atomic():
+            for start in range(0, len(pending), self.batch_size):
+                self._insert(pending[start:start + self.batch_size])
+
+        if self.created and not self.dry_run:
+            log_activity(
+                user=self.user,
+                activity_type='create',
+                description=f"Imported {self.created} students",
+                item_type='student',
+                metadata={'created': self.created, 'failed': self.failed, 'total_rows': self.total_rows}
+            )
+        return self.report()
+
+    def report(self):
+        return {
+            'dry_run': self.dry_run,
+            'total_rows': self.total_rows,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
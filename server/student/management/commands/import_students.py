@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from student.importer import StudentImporter, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'Import students from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file with one student per row')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows inserted per bulk insert')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating students')
+        parser.add_argument('--report', help='Write the full JSON report to this path')
+
+    def handle(self, *args, **options):
+        importer = StudentImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], 'rb') as fh:
+                report = importer.run(iter_rows(fh, options['path']))
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors'][:20]:
+            self.stderr.write(self.style.ERROR(f"Row {error['row']}: {json.dumps(error['errors'])}"))
+        if report['failed'] > 20:
+            self.stderr.write(f"... and {report['failed'] - 20} more rows with errors")
+
+        if options['report']:
+            with open(options['report'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created']} of {report['total_rows']} rows ({report['failed']} failed)."
+        ))
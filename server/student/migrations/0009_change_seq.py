@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0008_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
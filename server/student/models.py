@@ -2,7 +2,11 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
 
-class Student(models.Model):
+from settings.versioning import ChangeTrackingMixin
+
+class Student(ChangeTrackingMixin, models.Model):
+    version_name = 'students'
+
     PROGRAM_CHOICES = [
         ('IoT Development', 'IoT Development'),
         ('Software Development', 'Software Development'),
@@ -120,6 +124,9 @@ class Student(models.Model):
     ai_evaluation_history = models.JSONField(default=list, blank=True)  # Track previous evaluations
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Position in the collection's change feed, stamped on save and by settings.versioning.record_change
+    change_seq = models.BigIntegerField(default=0, editable=False, db_index=True)
     is_deleted = models.BooleanField(default=False)
 
     def __str__(self):
@@ -0,0 +1,8 @@
+from settings.versioning import track_changes
+
+from .models import Student
+
+# Data version and change feed of the student collection
+STUDENTS_VERSION = Student.version_name
+
+track_changes(Student, STUDENTS_VERSION)
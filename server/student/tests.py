@@ -1,3 +1,223 @@
-from django.test import TestCase
+import codecs
+import io
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from ims_backend import seeding
+from ims_backend.testing import QueryBudgetTestCase
+from settings.models import ActivityLog, TrashBin
+from settings.signals import bulk_updated
+from .importer import StudentImporter, iter_rows
+from .models import Student
+
+
+@override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False})
+class StudentBulkTests(TestCase):
+    def setUp(self):
+        self.ids = [student.pk for student in seeding.seed_students(5)]
+
+    def send(self, method, path, data):
+        return getattr(self.client, method)(f'/student/api/students/bulk/{path}', data, content_type='application/json')
+
+    def test_update(self):
+        signalled = []
+
+        def receiver(pks, **kwargs):
+            signalled.extend(pks)
+
+        bulk_updated.connect(receiver, sender=Student)
+        self.addCleanup(bulk_updated.disconnect, receiver, sender=Student)
+
+        response = self.send('patch', '', {'ids': self.ids[:3], 'patch': {'status': 'On Leave'}})
+        self.assertEqual(response.json(), {'updated': 3})
+        self.assertEqual(Student.objects.filter(status='On Leave', pk__in=self.ids[:3]).count(), 3)
+        self.assertEqual(sorted(signalled), self.ids[:3])
+        self.assertEqual(ActivityLog.objects.filter(activity_type='update', metadata__bulk=True).count(), 3)
+
+    def test_update_rejects_per_student_fields(self):
+        for patch in ({'email': 'same@example.com'}, {'paidAmount': '100.00'}, {'status': 'Graduated'}, {}):
+            response = self.send('patch', '', {'ids': self.ids, 'patch': patch})
+            self.assertEqual(response.status_code, 400, patch)
+
+    def test_delete_and_restore(self):
+        response = self.send('post', 'delete/', {'ids': self.ids[:2]})
+        self.assertEqual(response.json(), {'deleted': 2})
+        self.assertEqual(set(TrashBin.objects.values_list('item_id', flat=True)), {str(pk) for pk in self.ids[:2]})
+        # Already deleted students are skipped
+        self.assertEqual(self.send('post', 'delete/', {'ids': self.ids[:2]}).json(), {'deleted': 0})
+
+        response = self.send('post', 'restore/', {'ids': self.ids[:3]})
+        self.assertEqual(response.json(), {'restored': 2})
+        self.assertFalse(Student.objects.filter(is_deleted=True).exists())
+        self.assertFalse(TrashBin.objects.exists())
+
+    def test_invalid_ids(self):
+        for ids in (['abc'], [], '1,2', list(range(1001))):
+            for method, path in (('post', 'delete/'), ('post', 'restore/')):
+                self.assertEqual(self.send(method, path, {'ids': ids}).status_code, 400, (path, ids))
+
+
+@override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': False})
+class StudentImportTests(TestCase):
+    header = b'name,email,idNumber,program,enrollmentDate\n'
+
+    def row(self, index):
+        return f'Imported {index},imported{index}@example.com,IMP{index:05d},IoT Development,2024-09-02\n'.encode()
+
+    def upload(self, content, name='students.csv'):
+        upload = SimpleUploadedFile(name, content, content_type='text/csv')
+        return self.client.post('/student/api/students/import/', {'file': upload})
+
+    def test_import(self):
+        response = self.upload(codecs.BOM_UTF8 + self.header + b''.join(self.row(index) for index in range(3)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['created'], response.json()['failed']), (3, 0))
+        self.assertEqual(Student.objects.count(), 3)
+        self.assertTrue(ActivityLog.objects.filter(description='Imported 3 students').exists())
+
+    def test_unreadable_rows_are_reported(self):
+        rows = [self.row(index) for index in range(700)]
+        rows[600] = rows[600].replace(b'Imported', b'Imp\xe9rted')
+        # Larger than csv.field_size_limit()
+        rows[650] = b'Broken,' + b'x' * 200000 + b',BRK00001,IoT Development,2024-09-02\n'
+        response = self.upload(self.header + b''.join(rows))
+
+        self.assertEqual(response.status_code, 207)
+        report = response.json()
+        self.assertEqual((report['total_rows'], report['created'], report['failed']), (700, 698, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [602, 652])
+        self.assertEqual(report['errors'][0]['errors'], {'non_field_errors': ['Row is not valid UTF-8 text.']})
+        self.assertEqual(Student.objects.count(), 698)
+        self.assertTrue(ActivityLog.objects.filter(description='Imported 698 students').exists())
+
+    def test_invalid_rows_are_reported(self):
+        content = self.header + self.row(1) + self.row(1) + b'No Email,,IMP99999,IoT Development,2024-09-02\n'
+        report = self.upload(content).json()
+        self.assertEqual((report['created'], report['failed']), (1, 2))
+        self.assertIn('email', report['errors'][0]['errors'])
+
+    def test_rows_are_validated_before_the_transaction(self):
+        depths = []
+
+        def rows():
+            for index in range(3):
+                depths.append(len(connection.atomic_blocks))
+                yield {'name': f'Imported {index}', 'email': f'imported{index}@example.com', 'idNumber': f'IMP{index:05d}',
+                       'program': 'IoT Development', 'enrollmentDate': '2024-09-02'}
+
+        baseline = len(connection.atomic_blocks)
+        self.assertEqual(StudentImporter(batch_size=2).run(rows())['created'], 3)
+        self.assertEqual(depths, [baseline] * 3)
+
+    def test_unexpected_error_rolls_back(self):
+        rows = b''.join(self.row(index) for index in range(20))
+        with mock.patch('student.importer.bulk_updated.send', side_effect=[None, RuntimeError('boom')]):
+            with self.assertRaises(RuntimeError):
+                StudentImporter(batch_size=10).run(iter_rows(io.BytesIO(self.header + rows), 'students.csv'))
+        self.assertFalse(Student.objects.exists())
+
+    def test_unreadable_files(self):
+        not_a_workbook = io.BytesIO()
+        with zipfile.ZipFile(not_a_workbook, 'w') as archive:
+            archive.writestr('students.csv', self.header)
+        for name, content in (
+            ('students.txt', self.header),
+            ('students.csv', b'n\xe9me,email\n'),
+            ('students.xlsx', b'not a zip file at all'),
+            ('students.xlsx', not_a_workbook.getvalue()),
+        ):
+            response = self.upload(content, name)
+            self.assertEqual(response.status_code, 400, name)
+            self.assertIn('error', response.json())
+        self.assertEqual(self.upload(b'').json()['total_rows'], 0)
+
+
+class StudentQueryBudgetTests(QueryBudgetTestCase):
+    def new_student(self, index):
+        return {
+            'name': f'Budget Student {index}',
+            'email': f'budget{index}@example.com',
+            'idNumber': f'BUD{index:05d}',
+            'program': 'Data Science',
+            'enrollmentDate': '2024-09-02',
+        }
+
+    def test_list(self):
+        response = self.assertBudget('get', '/student/api/students/', 3)
+        self.assertEqual(len(response.json()), self.students)
+
+    def test_list_filtered(self):
+        self.assertBudget('get', '/student/api/students/?program=Data%20Science&status=Active', 3)
+
+    def test_list_not_modified(self):
+        etag = self.request('get', '/student/api/students/')['ETag']
+        self.assertBudget('get', '/student/api/students/', 1, status=304, HTTP_IF_NONE_MATCH=etag)
+
+    def test_create(self):
+        self.assertBudget('post', '/student/api/students/', 6, status=201, data=self.new_student(1))
+
+    def test_detail(self):
+        self.assertBudget('get', f'/student/api/students/{self.student_ids[0]}/', 3)
+
+    def test_update(self):
+        self.assertBudget('patch', f'/student/api/students/{self.student_ids[0]}/', 6, data={'status': 'On Leave'})
+
+    def test_update_fee_payment(self):
+        # An internee paying fees also records a finance transaction
+        student = Student.objects.filter(studentType='Internee', remainingAmount__gt=0).first()
+        self.assertBudget('patch', f'/student/api/students/{student.pk}/', 11, data={'paidAmount': str(student.totalFees)})
+
+    def test_delete(self):
+        self.assertBudget('delete', f'/student/api/students/{self.student_ids[0]}/', 6, status=204)
+
+    def test_changes(self):
+        self.assertBudget('get', '/student/api/students/changes/', 2)
+        self.assertBudget('get', '/student/api/students/changes/?since=0&limit=100', 2)
+
+    def test_bulk_update(self):
+        data = {'ids': self.student_ids[:100], 'patch': {'status': 'Inactive'}}
+        self.assertBudget('patch', '/student/api/students/bulk/', 8, data=data)
+
+    def test_bulk_delete_and_restore(self):
+        data = {'ids': self.student_ids[:100]}
+        self.assertBudget('post', '/student/api/students/bulk/delete/', 9, data=data)
+        self.assertBudget('post', '/student/api/students/bulk/restore/', 8, data=data)
+
+    def test_import(self):
+        rows = ['name,email,idNumber,program,enrollmentDate']
+        rows += [f'Imported {index},imported{index}@example.com,IMP{index:05d},IoT Development,2024-09-02' for index in range(100)]
+        upload = SimpleUploadedFile('students.csv', '\n'.join(rows).encode(), content_type='text/csv')
+        response = self.assertBudget('post', '/student/api/students/import/', 16, data={'file': upload})
+        self.assertEqual(response.json()['created'], 100)
+
+    def test_export(self):
+        self.assertBudget('get', '/student/api/students/export/', 2)
+        self.assertBudget('get', '/student/api/students/export/?file_format=xlsx', 1, ms=1500)
+
+    def test_summary(self):
+        self.assertBudget('get', '/student/api/students/summary/', 9)
+
+    def test_activities(self):
+        self.assertBudget('get', '/student/api/students/activities/', 2)
+
+    def test_attendance(self):
+        self.assertBudget('get', '/student/api/students/attendance/', 2)
+
+    def test_mark_attendance(self):
+        # Attendance is still saved student by student (three queries each), so this budget grows with the ids sent
+        data = {'date': '2024-07-01', 'status': 'present', 'student_ids': self.student_ids[:10]}
+        self.assertBudget('post', '/student/api/students/attendance/', 34, data=data)
+
+    def test_deleted_and_restore(self):
+        Student.objects.filter(pk__in=self.student_ids[:20]).update(is_deleted=True)
+        self.assertBudget('get', '/student/api/students/deleted/', 2)
+        self.assertBudget('patch', f'/student/api/students/{self.student_ids[0]}/restore/', 5)
+
+    def test_ai_evaluation(self):
+        path = f'/student/api/students/{self.student_ids[0]}/ai-evaluation/'
+        self.assertBudget('post', path, 5)
+        self.assertBudget('get', path, 1)
@@ -4,6 +4,12 @@ from . import views
 urlpatterns = [
     path('api/students/', views.StudentListCreateView.as_view(), name='student-list'),
     path('api/students/<int:pk>/', views.StudentDetailView.as_view(), name='student-detail'),
+    path('api/students/changes/', views.StudentChangesView.as_view(), name='student-changes'),
+    path('api/students/bulk/', views.StudentBulkUpdateView.as_view(), name='student-bulk-update'),
+    path('api/students/bulk/delete/', views.StudentBulkDeleteView.as_view(), name='student-bulk-delete'),
+    path('api/students/bulk/restore/', views.StudentBulkRestoreView.as_view(), name='student-bulk-restore'),
+    path('api/students/import/', views.StudentImportView.as_view(), name='student-import'),
+    path('api/students/export/', views.StudentExportView.as_view(), name='student-export'),
     path('api/students/summary/', views.StudentSummaryView.as_view(), name='student-summary'),
     path('api/students/activities/', views.StudentActivitiesView.as_view(), name='student-activities'),
     path('api/students/attendance/', views.StudentAttendanceView.as_view(), name='student-attendance'),
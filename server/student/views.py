@@ -1,22 +1,68 @@
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser, FormParser
+from django.db import transaction
 from django.db.models import Sum, Avg, Count
 from .models import Student
 from .serializers import StudentSerializer
+from .importer import StudentImporter, iter_rows
 from datetime import datetime
 from settings.models import ActivityLog, TrashBin
+from settings.activity import log_activity, record_activities
+from settings.signals import bulk_updated
+from settings.trash import restore_records
+from settings.changes import ChangeFeedView
+from settings.conditional import VersionedGetMixin
+from .signals import STUDENTS_VERSION
 from django.utils import timezone
+from ims_backend.db_router import replica_reads
+from ims_backend.exports import export_response
 
-class StudentListCreateView(generics.ListCreateAPIView):
+def get_student_trash_data(student):
+    return {
+        'id': student.id,
+        'name': student.name,
+        'idNumber': student.idNumber,
+        'program': student.program,
+        'email': student.email,
+        'gpa': str(student.gpa) if student.gpa else None,
+        'status': student.status,
+        'created_at': student.created_at.strftime('%Y-%m-%d %H:%M:%S') if student.created_at else None,
+    }
+
+
+STUDENT_FILTER_FIELDS = ('program', 'status', 'studentType', 'paymentStatus', 'year')
+
+STUDENT_EXPORT_COLUMNS = {field.name: field.name for field in Student._meta.concrete_fields if field.name != 'is_deleted'}
+STUDENT_EXPORT_DEFAULT = [
+    'id', 'idNumber', 'name', 'email', 'phone', 'program', 'year', 'status', 'studentType',
+    'enrollmentDate', 'gpa', 'overallAttendance', 'paymentStatus', 'totalFees', 'paidAmount', 'remainingAmount',
+]
+
+
+def filter_students(queryset, params):
+    """Exact-match filters shared by the student list and export, e.g. ``?program=Data Science``."""
+    for field in STUDENT_FILTER_FIELDS:
+        if params.get(field):
+            queryset = queryset.filter(**{field: params[field]})
+    return queryset
+
+
+class StudentListCreateView(VersionedGetMixin, generics.ListCreateAPIView):
+    version_name = STUDENTS_VERSION
     queryset = Student.objects.filter(is_deleted=False).order_by('-created_at')
     serializer_class = StudentSerializer
 
+    def get_queryset(self):
+        return filter_students(super().get_queryset(), self.request.query_params)
+
     def perform_create(self, serializer):
         student = serializer.save()
 
         # Log activity
-        ActivityLog.objects.create(
+        log_activity(
             user=self.request.user if self.request.user.is_authenticated else None,
             activity_type='create',
             description=f"Created new student: {student.name}",
@@ -32,7 +78,8 @@ class StudentListCreateView(generics.ListCreateAPIView):
             }
         )
 
-class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class StudentDetailView(VersionedGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    version_name = STUDENTS_VERSION
     queryset = Student.objects.filter(is_deleted=False)
     serializer_class = StudentSerializer
 
@@ -74,7 +121,7 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
                 )
 
                 # Log the transaction creation
-                ActivityLog.objects.create(
+                log_activity(
                     user=self.request.user if self.request.user.is_authenticated else None,
                     activity_type='create',
                     description=f'Created transaction for student fee payment: {updated_student.name}',
@@ -91,7 +138,7 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
             except Exception as e:
                 # Log error but don't fail the student update
-                ActivityLog.objects.create(
+                log_activity(
                     user=self.request.user if self.request.user.is_authenticated else None,
                     activity_type='error',
                     description=f'Failed to create transaction for student fee payment: {updated_student.name} - {str(e)}',
@@ -104,7 +151,7 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
                 )
 
         # Log activity
-        ActivityLog.objects.create(
+        log_activity(
             user=self.request.user if self.request.user.is_authenticated else None,
             activity_type='update',
             description=f"Updated student: {updated_student.name}",
@@ -122,16 +169,7 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_destroy(self, instance):
         # Store student data in trash before soft deleting
-        student_data = {
-            'id': instance.id,
-            'name': instance.name,
-            'idNumber': instance.idNumber,
-            'program': instance.program,
-            'email': instance.email,
-            'gpa': str(instance.gpa) if instance.gpa else None,
-            'status': instance.status,
-            'created_at': instance.created_at.strftime('%Y-%m-%d %H:%M:%S') if instance.created_at else None,
-        }
+        student_data = get_student_trash_data(instance)
 
         # Add to trash bin
         TrashBin.objects.create(
@@ -142,7 +180,7 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
         )
 
         # Log activity
-        ActivityLog.objects.create(
+        log_activity(
             user=self.request.user if self.request.user.is_authenticated else None,
             activity_type='delete',
             description=f"Deleted student: {instance.name}",
@@ -154,7 +192,147 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.is_deleted = True
         instance.save()
 
+class StudentChangesView(ChangeFeedView):
+    model = Student
+    serializer_class = StudentSerializer
+    version_name = STUDENTS_VERSION
+
+
+class StudentBulkView(APIView):
+    """Base for bulk student operations that take ``{"ids": [...]}``."""
+    max_ids = 1000
+
+    def get_ids(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({'ids': 'Provide a non-empty list of student ids.'})
+        if len(ids) > self.max_ids:
+            raise ValidationError({'ids': f'At most {self.max_ids} students can be changed at once.'})
+        try:
+            return [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            raise ValidationError({'ids': 'Student ids must be integers.'})
+
+    def get_user(self, request):
+        return request.user if request.user.is_authenticated else None
+
+
+class StudentBulkUpdateView(StudentBulkView):
+    """
+    Apply the same ``patch`` to many students with a single ``update()``.
+    Unique fields, uploads and ``paidAmount`` (which creates fee transactions
+    on single updates) must be changed per student.
+    """
+    excluded_fields = {'id', 'email', 'idNumber', 'avatar', 'paidAmount', 'is_deleted', 'created_at'}
+
+    def patch(self, request):
+        ids = self.get_ids(request)
+        patch = request.data.get('patch')
+        if not isinstance(patch, dict) or not patch:
+            raise ValidationError({'patch': 'Provide an object with the fields to change.'})
+        rejected = sorted(self.excluded_fields & patch.keys())
+        if rejected:
+            raise ValidationError({'patch': f"These fields cannot be bulk updated: {', '.join(rejected)}"})
+
+        serializer = StudentSerializer(data=patch, partial=True)
+        serializer.is_valid(raise_exception=True)
+        changes = serializer.validated_data
+        user = self.get_user(request)
+
+        with transaction.atomic():
+            students = Student.objects.filter(id__in=ids, is_deleted=False)
+            names = dict(students.values_list('id', 'name'))
+            updated = students.update(**changes, updated_at=timezone.now())
+            bulk_updated.send(sender=Student, pks=list(names))
+            record_activities(
+                ActivityLog(
+                    user=user,
+                    activity_type='update',
+                    description=f"Updated student: {name}",
+                    item_type='student',
+                    item_id=str(pk),
+                    metadata={'name': name, 'bulk': True, 'fields': sorted(changes)}
+                )
+                for pk, name in names.items()
+            )
+
+        return Response({'updated': updated})
+
+
+class StudentBulkDeleteView(StudentBulkView):
+    """Soft-delete many students, moving each one to the trash bin."""
+
+    def post(self, request):
+        ids = self.get_ids(request)
+        user = self.get_user(request)
+
+        with transaction.atomic():
+            students = list(Student.objects.filter(id__in=ids, is_deleted=False).only(
+                'id', 'name', 'idNumber', 'program', 'email', 'gpa', 'status', 'created_at'
+            ))
+            trash_data = {student.id: get_student_trash_data(student) for student in students}
+            TrashBin.objects.bulk_create([
+                TrashBin(user=user, item_type='student', item_id=str(pk), item_data=data)
+                for pk, data in trash_data.items()
+            ])
+            deleted = Student.objects.filter(id__in=trash_data).update(is_deleted=True, updated_at=timezone.now())
+            bulk_updated.send(sender=Student, pks=list(trash_data))
+            record_activities(
+                ActivityLog(
+                    user=user,
+                    activity_type='delete',
+                    description=f"Deleted student: {data['name']}",
+                    item_type='student',
+                    item_id=str(pk),
+                    metadata=data
+                )
+                for pk, data in trash_data.items()
+            )
+
+        return Response({'deleted': deleted})
+
+
+class StudentBulkRestoreView(StudentBulkView):
+    def post(self, request):
+        restored = restore_records(Student, 'student', self.get_ids(request), user=self.get_user(request))
+        return Response({'restored': restored})
+
+
+class StudentImportView(APIView):
+    """
+    Create students from an uploaded CSV/XLSX ``file`` (one student per row,
+    headers matching the student fields). ``?dry_run=true`` only validates.
+    """
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV or XLSX file in the "file" field.'}, status=400)
+
+        importer = StudentImporter(
+            dry_run=request.query_params.get('dry_run') == 'true',
+            user=request.user if request.user.is_authenticated else None,
+        )
+        try:
+            report = importer.run(iter_rows(upload, upload.name))
+        except ValueError as exc:
+            # Raised for unsupported or unreadable files before any row is inserted
+            return Response({'error': str(exc)}, status=400)
+        return Response(report, status=200 if importer.dry_run or not report['failed'] else 207)
+
+
+class StudentExportView(APIView):
+    """Stream students as CSV (or XLSX with ``?file_format=xlsx``), honouring the list filters."""
+
+    @replica_reads()
+    def get(self, request):
+        students = filter_students(Student.objects.filter(is_deleted=False), request.query_params).order_by('id')
+        return export_response(request, students, STUDENT_EXPORT_COLUMNS, STUDENT_EXPORT_DEFAULT, 'students')
+
+
 class StudentSummaryView(APIView):
+    @replica_reads()
     def get(self, request):
         students = Student.objects.filter(is_deleted=False)
         total_students = students.count()
@@ -250,52 +428,54 @@ class StudentAttendanceView(APIView):
             return Response({'error': 'Invalid status. Must be present, absent, late, or excused.'}, status=400)
 
         updated_count = 0
-        for student_id in student_ids:
-            try:
-                student = Student.objects.get(id=student_id, is_deleted=False)
-                # Update counters based on status
-                if status == 'present':
-                    student.presentDays += 1
-                    student.currentStreak += 1
-                elif status == 'absent':
-                    student.absentDays += 1
-                    student.currentStreak = 0
-                elif status == 'late':
-                    student.lateDays += 1
-                    student.currentStreak = 0
-                elif status == 'excused':
-                    student.excusedAbsences += 1
-                    student.currentStreak = 0
-
-                # Update last attendance date
-                student.lastAttendance = date
-
-                # Update monthly data
-                year_month = date.strftime('%Y-%m')
-                if year_month not in student.monthlyData:
-                    student.monthlyData[year_month] = {'present': 0, 'absent': 0, 'late': 0, 'excused': 0}
-                student.monthlyData[year_month][status] += 1
-
-                # Recalculate overall attendance percentage
-                total_days = (
-                    student.presentDays +
-                    student.absentDays +
-                    student.lateDays +
-                    student.excusedAbsences
-                )
-                if total_days > 0:
-                    student.overallAttendance = int((student.presentDays / total_days) * 100)
-                else:
-                    student.overallAttendance = 0
-
-                student.save()
-                updated_count += 1
-            except Student.DoesNotExist:
-                # Skip invalid student IDs
-                continue
+        # One transaction, so the dashboard recounts students once rather than per save
+        with transaction.atomic():
+            for student_id in student_ids:
+                try:
+                    student = Student.objects.get(id=student_id, is_deleted=False)
+                    # Update counters based on status
+                    if status == 'present':
+                        student.presentDays += 1
+                        student.currentStreak += 1
+                    elif status == 'absent':
+                        student.absentDays += 1
+                        student.currentStreak = 0
+                    elif status == 'late':
+                        student.lateDays += 1
+                        student.currentStreak = 0
+                    elif status == 'excused':
+                        student.excusedAbsences += 1
+                        student.currentStreak = 0
+
+                    # Update last attendance date
+                    student.lastAttendance = date
+
+                    # Update monthly data
+                    year_month = date.strftime('%Y-%m')
+                    if year_month not in student.monthlyData:
+                        student.monthlyData[year_month] = {'present': 0, 'absent': 0, 'late': 0, 'excused': 0}
+                    student.monthlyData[year_month][status] += 1
+
+                    # Recalculate overall attendance percentage
+                    total_days = (
+                        student.presentDays +
+                        student.absentDays +
+                        student.lateDays +
+                        student.excusedAbsences
+                    )
+                    if total_days > 0:
+                        student.overallAttendance = int((student.presentDays / total_days) * 100)
+                    else:
+                        student.overallAttendance = 0
+
+                    student.save()
+                    updated_count += 1
+                except Student.DoesNotExist:
+                    # Skip invalid student IDs
+                    continue
 
         # Log activity
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user if request.user.is_authenticated else None,
             activity_type='update',
             description=f"Marked attendance for {updated_count} students on {date_str}",
@@ -326,7 +506,7 @@ class RestoreStudentView(APIView):
             TrashBin.objects.filter(item_type='student', item_id=str(pk)).delete()
 
             # Log activity
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user if request.user.is_authenticated else None,
                 activity_type='restore',
                 description=f"Restored student: {student.name}",
@@ -406,7 +586,7 @@ class StudentAIEvaluationView(APIView):
             student.save()
 
             # Log activity
-            ActivityLog.objects.create(
+            log_activity(
                 user=request.user if request.user.is_authenticated else None,
                 activity_type='update',
                 description=f"Generated AI evaluation for student: {student.name}",